@@ -0,0 +1,79 @@
+from collections import deque
+from typing import Iterable, Iterator, Set, Tuple
+
+class AhoCorasick:
+    """
+    Aho-Corasick automaton that finds every occurrence of a set of literal
+    keywords in a single pass over the text, independent of how many
+    keywords there are
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = []            # keyword index -> keyword
+        self._goto = [{}]             # state -> {char: next state}
+        self._fail = [0]              # state -> failure state
+        self._output = [()]           # state -> keyword indices ending here
+        
+        seen = {}
+        for keyword in keywords:
+            if keyword and keyword not in seen:
+                seen[keyword] = len(self.keywords)
+                self.keywords.append(keyword)
+                self._add(keyword, seen[keyword])
+        self._build()
+    
+    def _add(self, keyword: str, index: int):
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (index,)
+    
+    def _build(self):
+        """Compute failure links breadth-first and merge outputs along them"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+    
+    def _states(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end offset, state) for every position that completes a keyword"""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                yield position + 1, state
+    
+    def finditer(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yield (start, end, keyword) for every occurrence, including overlapping ones"""
+        for end, state in self._states(text):
+            for index in self._output[state]:
+                keyword = self.keywords[index]
+                yield end - len(keyword), end, keyword
+    
+    def find_keywords(self, text: str) -> Set[str]:
+        """Return the set of distinct keywords occurring in text"""
+        found = set()
+        for _, state in self._states(text):
+            found.update(self._output[state])
+        return {self.keywords[index] for index in found}
+    
+    def __len__(self):
+        return len(self.keywords)
@@ -1,31 +1,235 @@
-from flask import Flask, request, jsonify, render_template, send_file
+from flask import Flask, Response, request, jsonify, render_template, send_file, g
 from flask_cors import CORS
 import os
 import io
-import tempfile
+import json
+import base64
+import asyncio
+import queue
+import threading
+import time
+from typing import List, Optional, Tuple
 from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestEntityTooLarge
 from config import Config
-from sarvam_client import SarvamAIClient
+from sarvam_client import AsyncSarvamAIClient, tts_cache_key
+from cache import TranslationCache, AudioCache
+from language_detector import ScriptLanguageDetector
+from upload_stream import MultipartFileStream, UploadStreamError, UploadTooLarge
+from audio_preprocess import AudioPreprocessor, PreprocessedAudio, find_ffmpeg
+from voice_stream import Endpointer, FfmpegStreamDecoder, pcm_to_wav
+from session_store import Session, SessionStore, MemorySessionBackend, RedisSessionBackend
+from audio_store import AudioStore
+from audio_bank import AudioBank
+from resilience import CircuitBreakers
+from pipeline import Pipeline
+from text_chunks import split_paragraphs
 from medical_ai import MedicalAI
+import metrics
+
+try:
+    from flask_sock import Sock, ConnectionClosed
+except ImportError:  # the voice WebSocket is only served with flask-sock installed
+    Sock = ConnectionClosed = None
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app) if Sock else None
+
+# Reject oversized bodies up front; multipart framing needs a little headroom
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_AUDIO_UPLOAD_BYTES + 64 * 1024
 
-# Initialize clients
-sarvam_client = None
+# Initialize clients; every route uses the async client (build_assets.py uses the sync one)
+async_sarvam_client = None
 medical_ai = MedicalAI()
 
+translation_cache = TranslationCache(
+    max_entries=Config.TRANSLATION_CACHE_MAX_ENTRIES,
+    max_bytes=Config.TRANSLATION_CACHE_MAX_BYTES,
+    ttl=Config.TRANSLATION_CACHE_TTL,
+    db_path=Config.TRANSLATION_CACHE_PATH or None
+)
+tts_cache = AudioCache(Config.TTS_CACHE_DIR, max_bytes=Config.TTS_CACHE_MAX_BYTES)
+audio_bank = AudioBank.load(Config.AUDIO_BANK_PATH)
+audio_store = AudioStore(
+    max_memory_bytes=Config.AUDIO_STORE_MEMORY_BYTES,
+    max_disk_bytes=Config.AUDIO_STORE_DISK_BYTES,
+    max_items=Config.AUDIO_STORE_MAX_ITEMS,
+    ttl=Config.AUDIO_STORE_TTL,
+    spill_dir=Config.AUDIO_STORE_SPILL_DIR or None
+)
+language_detector = ScriptLanguageDetector(min_confidence=Config.LOCAL_DETECT_MIN_CONFIDENCE) \
+    if Config.LOCAL_LANGUAGE_DETECTION else None
+circuit_breakers = CircuitBreakers(
+    window=Config.CIRCUIT_WINDOW,
+    min_calls=Config.CIRCUIT_MIN_CALLS,
+    failure_ratio=Config.CIRCUIT_FAILURE_RATIO,
+    slow_call_fraction=Config.CIRCUIT_SLOW_CALL_FRACTION,
+    open_seconds=Config.CIRCUIT_OPEN_SECONDS
+) if Config.CIRCUIT_BREAKER_ENABLED else None
+audio_preprocessor = AudioPreprocessor(
+    sample_rate=Config.AUDIO_PREPROCESS_SAMPLE_RATE,
+    trim_silence=Config.AUDIO_TRIM_SILENCE,
+    padding_ms=Config.AUDIO_VAD_PADDING_MS,
+    threshold_db=Config.AUDIO_VAD_THRESHOLD_DB,
+    ffmpeg_path=Config.FFMPEG_PATH or None
+) if Config.AUDIO_PREPROCESS else None
+
+def _session_backend():
+    """The configured session backend; sessions stay in process when Redis cannot be used"""
+    if Config.SESSION_BACKEND == 'redis':
+        try:
+            return RedisSessionBackend(Config.SESSION_REDIS_URL)
+        except RuntimeError as e:
+            print(f"Session store: {e}; keeping sessions in memory")
+    return MemorySessionBackend(max_sessions=Config.SESSION_MEMORY_MAX_SESSIONS,
+                                max_bytes=Config.SESSION_MEMORY_BYTES)
+
+session_store = SessionStore(
+    _session_backend(),
+    ttl=Config.SESSION_TTL,
+    max_session_bytes=Config.SESSION_MAX_BYTES,
+    max_turns=Config.SESSION_MAX_TURNS
+) if Config.SESSION_BACKEND != 'none' else None
+
+# Event loop shared by every request thread; owns the async client's connection pool
+_io_loop = None
+_io_loop_lock = threading.Lock()
+
 def init_sarvam_client():
     """Initialize Sarvam AI client"""
-    global sarvam_client
+    global async_sarvam_client
     api_key = Config.SARVAM_API_KEY
     if not api_key:
         print("Warning: SARVAM_API_KEY not found in environment variables")
         return False
     
-    sarvam_client = SarvamAIClient(api_key)
+    async_sarvam_client = AsyncSarvamAIClient(api_key, translation_cache=translation_cache,
+                                              tts_cache=tts_cache, audio_bank=audio_bank,
+                                              local_detector=language_detector,
+                                              circuit_breakers=circuit_breakers)
     return True
 
+def get_io_loop() -> asyncio.AbstractEventLoop:
+    """Start the shared I/O event loop thread on first use (after any fork)"""
+    global _io_loop
+    with _io_loop_lock:
+        if _io_loop is None:
+            _io_loop = asyncio.new_event_loop()
+            threading.Thread(target=_io_loop.run_forever, name='sarvam-io', daemon=True).start()
+    return _io_loop
+
+async def run_on_io_loop(coro):
+    """Await a coroutine on the shared I/O loop from an async view"""
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, get_io_loop()))
+
+def iterate_on_io_loop(async_iterator):
+    """Drive an async generator on the shared I/O loop from a streaming (sync) response"""
+    loop = get_io_loop()
+    try:
+        while True:
+            try:
+                yield asyncio.run_coroutine_threadsafe(async_iterator.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return
+    finally:
+        # Also runs when the client disconnects, cancelling work still in flight
+        asyncio.run_coroutine_threadsafe(async_iterator.aclose(), loop)
+
+def sse_event(event: str, data: dict) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def _cache_lookups():
+    """Hit and miss counters of every cache, read at scrape time"""
+    caches = {'translation': translation_cache.stats(), 'tts': tts_cache.stats()}
+    if audio_bank:
+        caches['audio_bank'] = audio_bank.stats()
+    if session_store:
+        caches['session'] = session_store.stats()
+    lookups = {}
+    for name, stats in caches.items():
+        lookups[(name, 'hit')] = stats['hits']
+        lookups[(name, 'miss')] = stats['misses']
+    return lookups
+
+def _upstream_calls_saved():
+    """Upstream calls avoided by local detection and by coalescing, read at scrape time"""
+    saved = {}
+    if language_detector:
+        saved[('local_detection',)] = language_detector.stats()['calls_saved']
+    single_flight = async_sarvam_client.coalescing_stats()['single_flight'] if async_sarvam_client else None
+    if single_flight:
+        saved[('single_flight',)] = single_flight['coalesced']
+    if session_store:
+        saved[('session_language',)] = session_store.stats()['detections_skipped']
+    return saved
+
+def _cache_hit_ratios():
+    lookups = _cache_lookups()
+    ratios = {}
+    for cache, result in lookups:
+        hits, misses = lookups[(cache, 'hit')], lookups[(cache, 'miss')]
+        ratios[(cache,)] = hits / (hits + misses) if hits + misses else 0.0
+    return ratios
+
+metrics.registry.callback('doctor_cache_lookups_total', 'Cache lookups by cache and result',
+                          ('cache', 'result'), _cache_lookups, kind='counter')
+metrics.registry.callback('doctor_cache_hit_ratio', 'Share of lookups served from each cache',
+                          ('cache',), _cache_hit_ratios)
+
+def _circuit_states():
+    """1 for every endpoint whose circuit is open or probing, read at scrape time"""
+    breakers = circuit_breakers.stats() if circuit_breakers else {}
+    return {(endpoint,): int(stats['state'] != 'closed') for endpoint, stats in breakers.items()}
+
+def _circuit_rejections():
+    breakers = circuit_breakers.stats() if circuit_breakers else {}
+    return {(endpoint,): stats['rejected'] for endpoint, stats in breakers.items()}
+
+def _preprocess_bytes():
+    stats = audio_preprocessor.stats() if audio_preprocessor else {'bytes_in': 0, 'bytes_out': 0}
+    return {('in',): stats['bytes_in'], ('out',): stats['bytes_out']}
+
+metrics.registry.callback('doctor_upstream_calls_saved_total', 'Sarvam AI calls avoided, by mechanism',
+                          ('mechanism',), _upstream_calls_saved, kind='counter')
+metrics.registry.callback('doctor_circuit_open', 'Whether calls to a Sarvam AI endpoint are failing fast',
+                          ('endpoint',), _circuit_states)
+metrics.registry.callback('doctor_circuit_rejected_total', 'Sarvam AI calls refused by an open circuit',
+                          ('endpoint',), _circuit_rejections, kind='counter')
+metrics.registry.callback('doctor_audio_preprocess_bytes_total',
+                          'Audio bytes received from clients (in) and uploaded for STT (out)',
+                          ('direction',), _preprocess_bytes, kind='counter')
+
+@app.before_request
+def _start_request_metrics():
+    if metrics.registry.enabled:
+        g.metrics_route = request.url_rule.rule if request.url_rule else 'unmatched'
+        g.metrics_started = time.perf_counter()
+        metrics.HTTP_IN_FLIGHT.inc(route=g.metrics_route)
+
+@app.after_request
+def _record_request_metrics(response):
+    # Streamed responses are timed to their first byte; the stream itself runs after this
+    if 'metrics_started' in g:
+        metrics.HTTP_DURATION.observe(time.perf_counter() - g.metrics_started, route=g.metrics_route,
+                                      method=request.method, status=response.status_code)
+    return response
+
+@app.teardown_request
+def _finish_request_metrics(error=None):
+    if 'metrics_route' in g:
+        metrics.HTTP_IN_FLIGHT.dec(route=g.pop('metrics_route'))
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Metrics in the Prometheus text exposition format"""
+    if not metrics.registry.enabled:
+        return jsonify({'error': 'Metrics are disabled'}), 404
+    return Response(metrics.registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     """Main page"""
@@ -39,11 +243,119 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'message': 'Multilingual AI Doctor Agent is running',
-        'sarvam_client_ready': sarvam_client is not None
+        'sarvam_client_ready': async_sarvam_client is not None,
+        'translation_cache': translation_cache.stats(),
+        'tts_cache': tts_cache.stats(),
+        'audio_bank': audio_bank.stats() if audio_bank else None,
+        'audio_store': audio_store.stats(),
+        'local_language_detection': language_detector.stats() if language_detector else None,
+        'coalescing': async_sarvam_client.coalescing_stats() if async_sarvam_client else None,
+        'response_corpus': medical_ai.corpus.stats() if medical_ai.corpus else None,
+        'circuit_breakers': circuit_breakers.stats() if circuit_breakers else None,
+        'audio_preprocessing': audio_preprocessor.stats() if audio_preprocessor else None,
+        'detect_hedging': async_sarvam_client.detect_hedge.stats()
+            if async_sarvam_client and async_sarvam_client.detect_hedge else None,
+        'voice_streaming': sock is not None,
+        'sessions': session_store.stats() if session_store else None
     })
 
+def log_emergency(query: str):
+    """Log which emergency keywords triggered the emergency path"""
+    matches = medical_ai.find_emergency_keywords(query)
+    if matches:
+        print(f"Emergency keywords matched: {matches}")
+
+async def _detect_language(text: str) -> str:
+    """Detect the language of text, offline when no client is configured"""
+    if async_sarvam_client:
+        return await async_sarvam_client.detect_language(text) or 'en'
+    if language_detector:
+        return language_detector.detect(text) or 'en'
+    return 'en'
+
+def _load_session(session_id: Optional[str], pipeline: Pipeline) -> Optional[Session]:
+    """
+    The caller's conversation session, or a new one; None when sessions are
+    disabled. Called on the request's own thread before any work reaches
+    the I/O loop, so a slow backend only delays this request.
+    """
+    if session_store is None:
+        return None
+    with pipeline.step('session'):
+        return session_store.load(session_id)
+
+def _preferred_language(session: Optional[Session], fields, key: str) -> Optional[str]:
+    """
+    The response language the request asks for, remembered in the session;
+    when the request leaves it out, the one remembered from earlier turns
+    """
+    if session is None:
+        return fields.get(key) or None
+    if key in fields:
+        session.response_language = fields.get(key) or None
+    return session.response_language
+
+def _session_language(text: str, session: Optional[Session]) -> Optional[str]:
+    """The language earlier turns established, so this one can skip detection"""
+    if session is None:
+        return None
+    return session_store.language_for(session, language_detector.classify(text) if language_detector else None)
+
+def _record_turn(session: Optional[Session], query: str, response: str, language: str):
+    """Remember a finished turn, with the symptoms it mentioned, in its session; blocks on the backend"""
+    if session is not None:
+        session_store.record_turn(session, query, response, language, medical_ai.detect_symptoms(query))
+
+async def _record_turn_async(session: Optional[Session], query: str, response: str, language: str,
+                             pipeline: Pipeline):
+    """Record a turn from the I/O loop without blocking it on the session backend"""
+    if session is not None:
+        await pipeline.run('session-save', asyncio.get_running_loop().run_in_executor(
+            None, _record_turn, session, query, response, language
+        ))
+
+async def _consult_pipeline(query: str, requested_language: str, pipeline: Pipeline,
+                            session: Optional[Session] = None):
+    """Detect, generate and translate a text consultation on the I/O loop"""
+    detection = None
+    try:
+        # Within a session the patient's language is already known
+        detected_language = _session_language(query, session)
+        if detected_language is None:
+            if not requested_language:
+                detected_language = await pipeline.run('detect', _detect_language(query))
+            else:
+                # The reply language is already known, so detection only feeds the
+                # response metadata and runs alongside generation and translation
+                detection = pipeline.start('detect', _detect_language(query))
+        
+        # Generate medical response, from the precomputed corpus where it covers the language
+        with pipeline.step('generate'):
+            log_emergency(query)
+            response, response_language = medical_ai.generate_localized_response(
+                query, requested_language or detected_language, session.symptoms if session else None
+            )
+        requested_language = requested_language or response_language
+        
+        # Translate response if it was generated in a different language than requested
+        if requested_language != response_language and async_sarvam_client:
+            translated_response = await pipeline.run('translate', async_sarvam_client.translate_text(
+                response,
+                requested_language,
+                response_language
+            ))
+            if translated_response:
+                response = translated_response
+        
+        if detection is not None:
+            detected_language = await detection
+        await _record_turn_async(session, query, response, detected_language, pipeline)
+        return response, detected_language, requested_language
+    finally:
+        await pipeline.cancel_pending()
+
 @app.route('/api/consult', methods=['POST'])
-def text_consultation():
+async def text_consultation():
     """Text-based medical consultation"""
     try:
         data = request.get_json()
@@ -54,129 +366,555 @@ def text_consultation():
         if not query:
             return jsonify({'error': 'Query cannot be empty'}), 400
         
-        # Detect language
-        detected_language = 'en'
-        if sarvam_client:
-            detected_language = sarvam_client.detect_language(query) or 'en'
-        
-        # Generate medical response
-        response = medical_ai.generate_medical_response(query, detected_language)
-        
-        # Translate response if requested language is different
-        requested_language = data.get('language', detected_language)
-        if requested_language != detected_language and sarvam_client:
-            translated_response = sarvam_client.translate_text(
-                response, 
-                requested_language, 
-                detected_language
-            )
-            if translated_response:
-                response = translated_response
+        pipeline = Pipeline()
+        session = _load_session(data.get('session_id'), pipeline)
+        response, detected_language, requested_language = await run_on_io_loop(
+            _consult_pipeline(query, _preferred_language(session, data, 'language'), pipeline, session)
+        )
         
-        return jsonify({
+        result = jsonify({
             'success': True,
             'response': response,
             'detected_language': detected_language,
             'response_language': requested_language,
-            'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown')
+            'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown'),
+            'session_id': session.id if session else None
         })
+        result.headers['Server-Timing'] = pipeline.server_timing()
+        return result
     
     except Exception as e:
         print(f"Error in text consultation: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+async def _consult_events(query: str, requested_language: str, pipeline: Pipeline,
+                          session: Optional[Session] = None):
+    """Yield (event, data) for a text consultation as each stage finishes"""
+    detection = None
+    try:
+        detected_language = _session_language(query, session)
+        if detected_language is not None or not requested_language:
+            if detected_language is None:
+                detected_language = await pipeline.run('detect', _detect_language(query))
+            yield 'language', {
+                'detected_language': detected_language,
+                'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown')
+            }
+        else:
+            detection = pipeline.start('detect', _detect_language(query))
+        
+        # Generate medical response, from the precomputed corpus where it covers the language
+        with pipeline.step('generate'):
+            log_emergency(query)
+            response, response_language = medical_ai.generate_localized_response(
+                query, requested_language or detected_language, session.symptoms if session else None
+            )
+        requested_language = requested_language or response_language
+        
+        translating = requested_language != response_language and async_sarvam_client is not None
+        paragraphs = split_paragraphs(response)
+        yield 'response', {
+            'response': response,
+            'language': response_language,
+            'paragraphs': paragraphs if translating else None
+        }
+        
+        # Translate paragraph by paragraph, all in flight at once, emitted in order
+        if translating:
+            translations = [
+                pipeline.start('translate', async_sarvam_client.translate_text(
+                    paragraph, requested_language, response_language
+                ), index=index)
+                for index, paragraph in enumerate(paragraphs)
+            ]
+            for index, translation in enumerate(translations):
+                yield 'translation', {
+                    'index': index,
+                    'total': len(paragraphs),
+                    'text': await translation or paragraphs[index],
+                    'language': requested_language
+                }
+        
+        if detection is not None:
+            detected_language = await detection
+            yield 'language', {
+                'detected_language': detected_language,
+                'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown')
+            }
+        
+        await _record_turn_async(session, query, response, detected_language, pipeline)
+        yield 'done', {
+            'detected_language': detected_language,
+            'response_language': requested_language,
+            'session_id': session.id if session else None,
+            'server_timing': pipeline.server_timing()
+        }
+    finally:
+        await pipeline.cancel_pending()
+
+@app.route('/api/consult/stream', methods=['POST'])
+def stream_text_consultation():
+    """Text consultation streamed as server-sent events, one per finished stage"""
+    data = request.get_json()
+    if not data or 'query' not in data:
+        return jsonify({'error': 'Query is required'}), 400
+    
+    query = data['query'].strip()
+    if not query:
+        return jsonify({'error': 'Query cannot be empty'}), 400
+    
+    pipeline = Pipeline()
+    session = _load_session(data.get('session_id'), pipeline)
+    requested_language = _preferred_language(session, data, 'language')
+    
+    def events():
+        try:
+            for event, payload in iterate_on_io_loop(_consult_events(query, requested_language, pipeline, session)):
+                yield sse_event(event, payload)
+        except Exception as e:
+            print(f"Error in streamed text consultation: {e}")
+            yield sse_event('error', {'error': 'Internal server error'})
+    
+    return Response(events(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+async def _audio_consult_pipeline(audio_stream: MultipartFileStream, pipeline: Pipeline,
+                                  response_language: str = None, synthesize: bool = True,
+                                  session: Optional[Session] = None):
+    """Run STT -> detection -> MedicalAI -> TTS on the I/O loop, overlapping independent stages"""
+    try:
+        # Decode and trim the recording before upload, or pipe the upload straight through
+        audio, filename, content_type = audio_stream, audio_stream.filename, audio_stream.content_type
+        segments = None
+        if audio_preprocessor is not None:
+            prepared = await pipeline.run('preprocess', asyncio.get_running_loop().run_in_executor(
+                None, _preprocess_upload, audio_stream
+            ))
+            if prepared is None:
+                return None
+            preprocessed, segments = prepared
+            audio, filename, content_type = preprocessed.audio, preprocessed.filename, preprocessed.content_type
+        
+        # Convert speech to text; long recordings are transcribed segment by segment in parallel
+        if segments and len(segments) > 1:
+            transcript = await pipeline.run('stt', async_sarvam_client.speech_to_text_segments(
+                segments,
+                concurrency=Config.STT_SEGMENT_CONCURRENCY
+            ))
+        else:
+            transcript = await pipeline.run('stt', async_sarvam_client.speech_to_text(
+                audio,
+                filename=filename,
+                content_type=content_type
+            ))
+        if not transcript:
+            return None
+        
+        # Detect language from transcript, unless earlier turns of the session established it
+        known_language = _session_language(transcript, session)
+        known_symptoms = session.symptoms if session else None
+        detection = None if known_language else pipeline.start(
+            'detect', async_sarvam_client.detect_language(transcript)
+        )
+        
+        # The emergency template only depends on the language, so start
+        # synthesizing it for the likely language while detection is in flight
+        with pipeline.step('emergency-check'):
+            emergency = medical_ai.check_emergency(transcript)
+        speculative_tts = None
+        if emergency:
+            log_emergency(transcript)
+            guessed_language = known_language or (language_detector.guess(transcript) if language_detector else None)
+            if guessed_language and synthesize:
+                speculative_response, _ = medical_ai.generate_localized_response(
+                    transcript, guessed_language, known_symptoms
+                )
+                speculative_tts = pipeline.start('tts-speculative', async_sarvam_client.text_to_speech(
+                    speculative_response, guessed_language
+                ))
+        
+        detected_language = known_language or await detection or 'en'
+        
+        # Generate medical response
+        with pipeline.step('generate'):
+            response, _ = medical_ai.generate_localized_response(transcript, detected_language, known_symptoms)
+        
+        # Convert response to speech, reusing the speculative synthesis when it guessed right;
+        # clients that stream speech from /api/tts/stream skip synthesis here
+        if not synthesize:
+            speech = None
+        elif speculative_tts and guessed_language == detected_language and speculative_response == response:
+            speech = speculative_tts
+        else:
+            speech = pipeline.start('tts', async_sarvam_client.text_to_speech(response, detected_language))
+        
+        # Translate and synthesize the requested language alongside the original audio
+        translated_response = translated_audio = None
+        if response_language and response_language != detected_language:
+            translated_response, translated_language = medical_ai.generate_localized_response(
+                transcript, response_language, known_symptoms
+            )
+            if translated_language != response_language:
+                translated_response = await pipeline.run('translate', async_sarvam_client.translate_text(
+                    translated_response,
+                    response_language,
+                    translated_language
+                ))
+            if translated_response and synthesize:
+                translated_audio = await pipeline.run('tts-translated', async_sarvam_client.text_to_speech(
+                    translated_response, response_language
+                ))
+        
+        audio_response = await speech if speech else None
+        await _record_turn_async(session, transcript, response, detected_language, pipeline)
+        return transcript, detected_language, response, audio_response, translated_response, translated_audio
+    finally:
+        await pipeline.cancel_pending()
+
+def _preprocess_upload(audio_stream: MultipartFileStream) -> Optional[Tuple[PreprocessedAudio, List[bytes]]]:
+    """
+    Read the whole upload, preprocess it and split it into the segments to
+    transcribe; None if it was too large
+    """
+    try:
+        audio = audio_stream.read()
+    except UploadTooLarge:
+        return None
+    preprocessed = audio_preprocessor.process(audio, audio_stream.filename, audio_stream.content_type)
+    segments = audio_preprocessor.split(preprocessed, Config.LONG_AUDIO_SEGMENT_SECONDS,
+                                        Config.LONG_AUDIO_OVERLAP_SECONDS)
+    return preprocessed, segments
+
+def _audio_url(text: str, language: str, audio: bytes) -> str:
+    """Link to audio in the audio bank or TTS cache, or in the audio store when it was not cached"""
+    audio_key = tts_cache_key(text, language)
+    if not (audio_bank and audio_key in audio_bank) and audio_key not in tts_cache:
+        audio_key = audio_store.put(audio)
+    return f'/api/download-audio/{audio_key}'
+
 @app.route('/api/audio-consult', methods=['POST'])
-def audio_consultation():
+async def audio_consultation():
     """Audio-based medical consultation"""
     try:
-        if 'audio' not in request.files:
+        # Decode the multipart body incrementally instead of spooling it to disk
+        try:
+            audio_stream = MultipartFileStream(
+                request.stream,
+                request.content_type or '',
+                'audio',
+                Config.MAX_AUDIO_UPLOAD_BYTES
+            )
+        except UploadStreamError:
             return jsonify({'error': 'Audio file is required'}), 400
+        except RequestEntityTooLarge:
+            return jsonify({'error': 'Audio file is too large'}), 413
         
-        audio_file = request.files['audio']
-        if audio_file.filename == '':
+        if not audio_stream.filename:
             return jsonify({'error': 'No audio file selected'}), 400
+        # The client's filename is sent upstream; keep only a safe base name
+        audio_stream.filename = secure_filename(audio_stream.filename) or 'audio'
         
-        if not sarvam_client:
+        if not async_sarvam_client:
             return jsonify({'error': 'Sarvam AI client not initialized'}), 500
         
-        # Save audio file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as temp_file:
-            audio_file.save(temp_file.name)
-            temp_file_path = temp_file.name
+        # Optional second language to answer in, sent as a form field before the audio part
+        response_language = audio_stream.fields.get('response_language') or None
+        if response_language and response_language not in Config.SUPPORTED_LANGUAGES:
+            return jsonify({'error': 'Unsupported response_language'}), 400
         
-        try:
-            # Convert speech to text
-            transcript = sarvam_client.speech_to_text(temp_file_path)
-            if not transcript:
-                return jsonify({'error': 'Could not transcribe audio'}), 400
-            
-            # Detect language from transcript
-            detected_language = sarvam_client.detect_language(transcript) or 'en'
-            
-            # Generate medical response
-            response = medical_ai.generate_medical_response(transcript, detected_language)
-            
-            # Convert response to speech
-            audio_response = sarvam_client.text_to_speech(response, detected_language)
-            
-            result = {
-                'success': True,
-                'transcript': transcript,
-                'response': response,
-                'detected_language': detected_language,
-                'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown'),
-                'has_audio_response': audio_response is not None
-            }
-            
-            # If audio response is available, save it and provide download link
-            if audio_response:
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as audio_temp:
-                    audio_temp.write(audio_response)
-                    result['audio_response_url'] = f'/api/download-audio/{os.path.basename(audio_temp.name)}'
-            
-            return jsonify(result)
+        stream_audio = audio_stream.fields.get('stream_audio') == 'true'
         
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+        pipeline = Pipeline()
+        session = _load_session(audio_stream.fields.get('session_id'), pipeline)
+        response_language = _preferred_language(session, audio_stream.fields, 'response_language')
+        pipeline_result = await run_on_io_loop(
+            _audio_consult_pipeline(audio_stream, pipeline, response_language, synthesize=not stream_audio,
+                                    session=session)
+        )
+        if audio_stream.too_large:
+            return jsonify({'error': 'Audio file is too large'}), 413
+        if not pipeline_result:
+            return jsonify({'error': 'Could not transcribe audio'}), 400
+        
+        transcript, detected_language, response, audio_response, translated_response, translated_audio = pipeline_result
+        
+        result = {
+            'success': True,
+            'transcript': transcript,
+            'response': response,
+            'detected_language': detected_language,
+            'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown'),
+            'has_audio_response': audio_response is not None,
+            'session_id': session.id if session else None
+        }
+        
+        # If audio response is available, link to it in the TTS cache or the audio store
+        if audio_response:
+            result['audio_response_url'] = _audio_url(response, detected_language, audio_response)
+        
+        if translated_response:
+            result['response_language'] = response_language
+            result['translated_response'] = translated_response
+            if translated_audio:
+                result['translated_audio_url'] = _audio_url(translated_response, response_language, translated_audio)
+        
+        result = jsonify(result)
+        result.headers['Server-Timing'] = pipeline.server_timing()
+        return result
     
     except Exception as e:
         print(f"Error in audio consultation: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
-@app.route('/api/download-audio/<filename>')
-def download_audio(filename):
+def _send_audio(path_or_file, mimetype: str, etag: str = None):
+    """Send audio with Content-Length and byte-range support so players can seek"""
+    response = send_file(path_or_file, mimetype=mimetype, as_attachment=True,
+                         download_name='response.wav', conditional=True, etag=etag or True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
+
+@app.route('/api/download-audio/<audio_id>')
+def download_audio(audio_id):
     """Download generated audio response"""
     try:
-        temp_dir = tempfile.gettempdir()
-        file_path = os.path.join(temp_dir, filename)
+        # Pre-synthesized template audio is served from the memory-mapped bank
+        banked = audio_bank.get(audio_id) if audio_bank and audio_id in audio_bank else None
+        if banked is not None:
+            return _send_audio(io.BytesIO(banked), 'audio/wav', etag=audio_id)
+        
+        # Cached TTS audio is served straight from the content-addressed store
+        cached_path = tts_cache.path_for(audio_id)
+        if cached_path:
+            return _send_audio(cached_path, 'audio/wav', etag=audio_id)
         
-        if not os.path.exists(file_path):
+        # One snapshot of the entry, so a spill by another request cannot empty what is sent
+        entry = audio_store.get(audio_id)
+        if entry is None:
             return jsonify({'error': 'Audio file not found'}), 404
         
-        return send_file(file_path, as_attachment=True, download_name='response.wav')
+        data, path = entry.data, entry.path
+        if data is not None:
+            return _send_audio(io.BytesIO(data), entry.content_type, etag=audio_id)
+        return _send_audio(path, entry.content_type, etag=audio_id)
     
+    except FileNotFoundError:
+        return jsonify({'error': 'Audio file not found'}), 404
     except Exception as e:
         print(f"Error downloading audio: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/tts/stream', methods=['POST'])
+def stream_text_to_speech():
+    """Stream speech for long text as server-sent events, one WAV per sentence chunk"""
+    data = request.get_json()
+    if not data or not data.get('text') or 'language' not in data:
+        return jsonify({'error': 'Text and language are required'}), 400
+    
+    language = data['language']
+    if language not in Config.SUPPORTED_LANGUAGES:
+        return jsonify({'error': 'Unsupported language'}), 400
+    
+    if not async_sarvam_client:
+        return jsonify({'error': 'Text-to-speech service not available'}), 500
+    
+    def events():
+        chunks = async_sarvam_client.text_to_speech_chunks(data['text'], language)
+        for index, (chunk, audio) in enumerate(iterate_on_io_loop(chunks)):
+            yield sse_event('audio', {
+                'index': index,
+                'text': chunk,
+                'audio': base64.b64encode(audio).decode('ascii') if audio else None
+            })
+        yield sse_event('done', {})
+    
+    return Response(events(), mimetype='text/event-stream', headers=SSE_HEADERS)
+
+async def _whole_speech(text: str, language: str):
+    """The whole reply as a single speech chunk, for audio that is already synthesized"""
+    yield text, await async_sarvam_client.text_to_speech(text, language)
+
+async def _voice_turn_events(utterance: bytes, response_language: Optional[str], pipeline: Pipeline,
+                             session: Optional[Session] = None):
+    """Yield (event, data) for one spoken turn; 'audio' carries WAV bytes of the reply, chunk by chunk"""
+    try:
+        transcript = await pipeline.run('stt', async_sarvam_client.speech_to_text(
+            pcm_to_wav(utterance, Config.VOICE_SAMPLE_RATE),
+            filename='utterance.wav',
+            content_type='audio/wav'
+        ))
+        if not transcript:
+            yield 'error', {'error': 'Could not transcribe audio'}
+            return
+            
+        detected_language = _session_language(transcript, session) or await pipeline.run(
+            'detect', async_sarvam_client.detect_language(transcript)
+        ) or 'en'
+        yield 'transcript', {
+            'text': transcript,
+            'detected_language': detected_language,
+            'language_name': Config.LANGUAGE_NAMES.get(detected_language, 'Unknown')
+        }
+        
+        # Generate medical response, from the precomputed corpus where it covers the language
+        with pipeline.step('generate'):
+            log_emergency(transcript)
+            emergency = medical_ai.check_emergency(transcript)
+            response, language = medical_ai.generate_localized_response(
+                transcript, response_language or detected_language, session.symptoms if session else None
+            )
+        if response_language and language != response_language:
+            translated_response = await pipeline.run('translate', async_sarvam_client.translate_text(
+                response, response_language, language
+            ))
+            if translated_response:
+                response, language = translated_response, response_language
+        yield 'response', {'text': response, 'language': language, 'emergency': emergency}
+        
+        # Replies already banked or cached go out whole; the rest is synthesized
+        # sentence by sentence so the first sentence plays while later ones are in flight
+        audio_key = tts_cache_key(response, language)
+        if (audio_bank and audio_key in audio_bank) or audio_key in tts_cache:
+            speech = _whole_speech(response, language)
+        else:
+            speech = async_sarvam_client.text_to_speech_chunks(response, language)
+        first_audio_ms = None
+        with pipeline.step('tts'):
+            async for _, audio in speech:
+                if not audio:
+                    continue
+                if first_audio_ms is None:
+                    first_audio_ms = pipeline.elapsed_ms()
+                    metrics.VOICE_TURN_LATENCY.observe(first_audio_ms / 1000)
+                yield 'audio', audio
+                
+        await _record_turn_async(session, transcript, response, detected_language, pipeline)
+        yield 'turn_end', {
+            'detected_language': detected_language,
+            'response_language': language,
+            'first_audio_ms': round(first_audio_ms, 1) if first_audio_ms is not None else None,
+            'server_timing': pipeline.server_timing()
+        }
+    finally:
+        await pipeline.cancel_pending()
+
+def _answer_utterance(ws, utterance: bytes, response_language: Optional[str], session: Optional[Session] = None):
+    """Run one turn on the I/O loop, sending its events as JSON and its audio as binary messages"""
+    seconds = len(utterance) / (2 * Config.VOICE_SAMPLE_RATE)
+    ws.send(json.dumps({'type': 'utterance', 'seconds': round(seconds, 2)}))
+    try:
+        turn = _voice_turn_events(utterance, response_language, Pipeline(), session)
+        for event, payload in iterate_on_io_loop(turn):
+            # Only bytes go out as a binary message; TTS audio may be a bytearray or a bank view
+            ws.send(bytes(payload) if event == 'audio' else json.dumps({'type': event, **payload}, ensure_ascii=False))
+    except ConnectionClosed:
+        raise
+    except Exception as e:
+        print(f"Error in voice turn: {e}")
+        ws.send(json.dumps({'type': 'error', 'error': 'Internal server error'}))
+
+def voice_consultation_stream(ws):
+    """
+    Real-time voice consultation over a WebSocket. The client streams binary
+    audio messages, 16 kHz mono 16-bit PCM by default or WebM/Opus with
+    ?format=webm, and may send {"type": "end"} to finish. Utterances are
+    endpointed here, so each is transcribed as soon as the speaker pauses,
+    and answered on the same socket: JSON events (utterance, transcript,
+    response, turn_end) with the spoken reply as binary WAV messages.
+    Pass ?session_id= to continue a conversation from earlier turns.
+    """
+    def fail(message: str):
+        ws.send(json.dumps({'type': 'error', 'error': message}))
+        
+    if not async_sarvam_client:
+        return fail('Sarvam AI client not initialized')
+    audio_format = request.args.get('format', 'pcm')
+    if audio_format not in ('pcm', 'webm'):
+        return fail('Unsupported audio format')
+    response_language = request.args.get('response_language') or None
+    if response_language and response_language not in Config.SUPPORTED_LANGUAGES:
+        return fail('Unsupported response_language')
+    session = _load_session(request.args.get('session_id'), Pipeline())
+    response_language = _preferred_language(session, request.args, 'response_language')
+    ffmpeg_path = Config.FFMPEG_PATH or find_ffmpeg()
+    if audio_format == 'webm' and not ffmpeg_path:
+        return fail('WebM audio needs ffmpeg on the server; send PCM instead')
+        
+    endpointer = Endpointer(
+        sample_rate=Config.VOICE_SAMPLE_RATE,
+        threshold_db=Config.VOICE_VAD_THRESHOLD_DB,
+        silence_ms=Config.VOICE_ENDPOINT_SILENCE_MS,
+        padding_ms=Config.AUDIO_VAD_PADDING_MS,
+        min_speech_ms=Config.VOICE_MIN_SPEECH_MS,
+        max_seconds=Config.VOICE_MAX_UTTERANCE_SECONDS
+    )
+    utterances = queue.Queue()
+    
+    def on_pcm(pcm: bytes):
+        for utterance in endpointer.feed(pcm):
+            utterances.put(utterance)
+            
+    # Compressed audio is decoded by ffmpeg as it arrives; its reader thread feeds the endpointer
+    decoder = FfmpegStreamDecoder(ffmpeg_path, on_pcm, Config.VOICE_SAMPLE_RATE) if audio_format == 'webm' else None
+    ws.send(json.dumps({'type': 'ready', 'format': audio_format, 'sample_rate': Config.VOICE_SAMPLE_RATE,
+                        'session_id': session.id if session else None}))
+    in_speech, ended = False, False
+    last_message = time.monotonic()
+    try:
+        while not ended:
+            message = ws.receive(timeout=0.02 if decoder else 1)
+            if message is None:
+                if time.monotonic() - last_message > Config.VOICE_IDLE_TIMEOUT:
+                    break
+            elif isinstance(message, str):
+                try:
+                    ended = json.loads(message).get('type') == 'end'
+                except (ValueError, AttributeError):
+                    return fail('Control messages must be JSON objects')
+                if ended:
+                    if decoder:
+                        decoder.close()
+                        decoder = None
+                    utterance = endpointer.flush()
+                    if utterance:
+                        utterances.put(utterance)
+            else:
+                last_message = time.monotonic()
+                if decoder:
+                    if not decoder.write(message):
+                        return fail('Could not decode audio')
+                else:
+                    on_pcm(message)
+                    
+            if endpointer.in_speech != in_speech:
+                in_speech = endpointer.in_speech
+                if in_speech:
+                    ws.send(json.dumps({'type': 'speech_start'}))
+            while not utterances.empty():
+                _answer_utterance(ws, utterances.get(), response_language, session)
+    finally:
+        if decoder:
+            decoder.close()
+
+if sock is not None:
+    sock.route('/api/voice/stream')(voice_consultation_stream)
+
 @app.route('/api/translate', methods=['POST'])
-def translate_text():
+async def translate_text():
     """Translate text to different language"""
     try:
         data = request.get_json()
         if not data or 'text' not in data or 'target_language' not in data:
             return jsonify({'error': 'Text and target_language are required'}), 400
         
-        if not sarvam_client:
+        if not async_sarvam_client:
             return jsonify({'error': 'Translation service not available'}), 500
         
         text = data['text']
         target_language = data['target_language']
         source_language = data.get('source_language', 'auto')
         
-        translated_text = sarvam_client.translate_text(text, target_language, source_language)
+        translated_text = await run_on_io_loop(
+            async_sarvam_client.translate_text(text, target_language, source_language)
+        )
         
         return jsonify({
             'success': True,
@@ -190,19 +928,54 @@ def translate_text():
         print(f"Error in translation: {e}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@app.route('/api/translate/batch', methods=['POST'])
+async def translate_batch():
+    """Translate many texts into one language, packed into as few upstream calls as possible"""
+    try:
+        data = request.get_json()
+        if not data or not isinstance(data.get('texts'), list) or 'target_language' not in data:
+            return jsonify({'error': 'texts (a list) and target_language are required'}), 400
+        
+        texts = data['texts']
+        if not all(isinstance(text, str) for text in texts):
+            return jsonify({'error': 'texts must be strings'}), 400
+        if len(texts) > Config.TRANSLATE_BATCH_MAX_TEXTS:
+            return jsonify({'error': f'At most {Config.TRANSLATE_BATCH_MAX_TEXTS} texts per batch'}), 413
+        
+        if not async_sarvam_client:
+            return jsonify({'error': 'Translation service not available'}), 500
+        
+        target_language = data['target_language']
+        source_language = data.get('source_language', 'auto')
+        
+        translations = await run_on_io_loop(
+            async_sarvam_client.translate_batch(texts, target_language, source_language)
+        )
+        
+        return jsonify({
+            'success': True,
+            'translations': translations,
+            'source_language': source_language,
+            'target_language': target_language
+        })
+    
+    except Exception as e:
+        print(f"Error in batch translation: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
+
 @app.route('/api/detect-language', methods=['POST'])
-def detect_language():
+async def detect_language():
     """Detect language of input text"""
     try:
         data = request.get_json()
         if not data or 'text' not in data:
             return jsonify({'error': 'Text is required'}), 400
         
-        if not sarvam_client:
+        if not async_sarvam_client:
             return jsonify({'error': 'Language detection service not available'}), 500
         
         text = data['text']
-        detected_lang = sarvam_client.detect_language(text)
+        detected_lang = await run_on_io_loop(async_sarvam_client.detect_language(text))
         
         return jsonify({
             'success': True,
@@ -219,6 +992,10 @@ def detect_language():
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'error': 'Audio file is too large'}), 413
+
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
@@ -0,0 +1,150 @@
+import json
+import mmap
+import os
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from text_chunks import split_for_speech
+
+# Bump when the index layout changes
+AUDIO_BANK_FORMAT = 1
+
+class AudioBank:
+    """
+    Read-only bank of pre-synthesized audio: every clip is packed into one
+    data file that is memory-mapped, with a JSON index of key -> (offset,
+    length) beside it. Keys are TTS cache keys, so they cover the text,
+    language and every voice parameter, and a clip for a changed template
+    or voice is simply never looked up.
+    """
+    
+    def __init__(self, path: str, index: Dict[str, Tuple[int, int]], data: Optional[mmap.mmap]):
+        self.path = path
+        self._index = index
+        self._data = data
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def index_path(path: str) -> str:
+        return f"{path}.idx"
+    
+    @classmethod
+    def load(cls, path: str) -> Optional['AudioBank']:
+        """Map the bank at path, or None if it is missing or does not match its index"""
+        try:
+            with open(cls.index_path(path), 'r', encoding='utf-8') as index_file:
+                header = json.load(index_file)
+            with open(path, 'rb') as data_file:
+                size = os.fstat(data_file.fileno()).st_size
+                if header.get('format') != AUDIO_BANK_FORMAT or header.get('size') != size:
+                    print(f"Ignoring stale audio bank {path}; rebuild it with: python build_assets.py audio-bank")
+                    return None
+                data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not load audio bank {path}: {e}")
+            return None
+            
+        index = {key: (offset, length) for key, (offset, length) in header['entries'].items()}
+        return cls(path, index, data)
+    
+    @classmethod
+    def write(cls, path: str, clips: Iterable[Tuple[str, bytes]]):
+        """Pack clips into path and write its index; both files are replaced atomically"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            
+        entries = {}
+        offset = 0
+        with open(f"{path}.tmp", 'wb') as data_file:
+            for key, audio in clips:
+                if key in entries:
+                    continue
+                data_file.write(audio)
+                entries[key] = (offset, len(audio))
+                offset += len(audio)
+                
+        index_path = cls.index_path(path)
+        with open(f"{index_path}.tmp", 'w', encoding='utf-8') as index_file:
+            json.dump({'format': AUDIO_BANK_FORMAT, 'size': offset, 'entries': entries},
+                      index_file, separators=(',', ':'), sort_keys=True)
+                      
+        # A reader keeps its mapping of the old data file, and refuses a pair whose sizes disagree
+        os.replace(f"{path}.tmp", path)
+        os.replace(f"{index_path}.tmp", index_path)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+    
+    def __len__(self) -> int:
+        return len(self._index)
+    
+    def get(self, key: str) -> Optional[memoryview]:
+        """Return a read-only view of the clip for key over the mapping, without copying it, or None"""
+        location = self._index.get(key)
+        if location is None or self._data is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        offset, length = location
+        return memoryview(self._data)[offset:offset + length]
+    
+    def keys(self):
+        return self._index.keys()
+    
+    def close(self):
+        """Unmap the bank; while clips from get are still referenced, the mapping lives on with them"""
+        if self._data is not None:
+            try:
+                self._data.close()
+            except BufferError:
+                pass
+            self._data = None
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'clips': len(self._index),
+            'bytes': self._data.size() if self._data is not None else 0,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+def bank_texts(medical_ai, languages: Iterable[str], max_chars: int, first_chunk_chars: int) -> Dict[Tuple[str, str], None]:
+    """
+    Every (text, language) worth pre-rendering: each deterministic response
+    as synthesized whole by the consult endpoints, and its sentence chunks
+    as synthesized by the streaming endpoints
+    """
+    texts = {}
+    for language in languages:
+        for response in medical_ai.localized_deterministic_responses(language).values():
+            texts[(response, language)] = None
+            for chunk in split_for_speech(response, max_chars, first_chunk_chars):
+                texts[(chunk, language)] = None
+    return texts
+
+def build_audio_bank(path: str, texts: Iterable[Tuple[str, str]],
+                     text_to_speech: Callable[[str, str], Optional[bytes]],
+                     cache_key: Callable[[str, str], str], existing: Optional[AudioBank] = None) -> int:
+    """
+    Synthesize every (text, language) and pack the clips into a bank at
+    path, reusing clips already in existing. Returns the number of clips
+    synthesized. Raises ValueError if synthesis failed for any text.
+    """
+    clips = {}
+    synthesized = 0
+    for text, language in texts:
+        key = cache_key(text, language)
+        audio = existing.get(key) if existing is not None else None
+        if audio is None:
+            audio = text_to_speech(text, language)
+            synthesized += 1
+        if not audio:
+            raise ValueError(f"Could not synthesize {language} text: {text[:40]!r}")
+        clips[key] = audio
+        
+    AudioBank.write(path, clips.items())
+    return synthesized
@@ -0,0 +1,299 @@
+import io
+import shutil
+import subprocess
+import threading
+import wave
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # without NumPy uploads are passed through untouched
+    np = None
+
+try:
+    import imageio_ffmpeg
+except ImportError:  # ffmpeg must then be on PATH or set with FFMPEG_PATH
+    imageio_ffmpeg = None
+
+def find_ffmpeg() -> Optional[str]:
+    """ffmpeg on PATH, else the static build shipped with imageio-ffmpeg; None if neither"""
+    path = shutil.which('ffmpeg')
+    if path or imageio_ffmpeg is None:
+        return path
+    try:
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except RuntimeError:
+        return None
+
+# Leading bytes of each container we can recognize; RIFF, MP4 and MP3 need extra checks
+CONTAINER_MAGIC = (
+    (b'\x1a\x45\xdf\xa3', 'webm'),
+    (b'OggS', 'ogg'),
+    (b'fLaC', 'flac'),
+    (b'ID3', 'mp3')
+)
+
+CONTAINER_TYPES = {
+    'wav': 'audio/wav',
+    'webm': 'audio/webm',
+    'ogg': 'audio/ogg',
+    'flac': 'audio/flac',
+    'mp3': 'audio/mpeg',
+    'mp4': 'audio/mp4'
+}
+
+def sniff_container(header: bytes) -> Optional[str]:
+    """Container format from the first bytes of a file, whatever its name or declared type"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        return 'wav'
+    if header[4:8] == b'ftyp':
+        return 'mp4'
+    for magic, container in CONTAINER_MAGIC:
+        if header.startswith(magic):
+            return container
+    if len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0:
+        return 'mp3'
+    return None
+
+class PreprocessedAudio:
+    """The audio to upload for STT, and what preprocessing did to it"""
+    
+    __slots__ = ('audio', 'filename', 'content_type', 'container', 'original_bytes',
+                 'duration', 'trimmed_seconds', 'samples', 'sample_rate', 'skipped')
+    
+    def __init__(self, audio: bytes, filename: Optional[str], content_type: Optional[str],
+                 container: Optional[str], original_bytes: int, duration: Optional[float] = None,
+                 trimmed_seconds: float = 0.0, samples=None, sample_rate: Optional[int] = None,
+                 skipped: Optional[str] = None):
+        self.audio = audio
+        self.filename = filename
+        self.content_type = content_type
+        self.container = container
+        self.original_bytes = original_bytes
+        self.duration = duration
+        self.trimmed_seconds = trimmed_seconds
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.skipped = skipped
+
+class AudioPreprocessor:
+    """
+    Turns an uploaded recording into what speech-to-text needs: the
+    container is sniffed from its bytes, the audio decoded to mono 16-bit
+    PCM at sample_rate (WAV natively, anything else through ffmpeg) and
+    leading and trailing silence trimmed by a frame-energy VAD. Uploads
+    that cannot be decoded are passed through unchanged.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, trim_silence: bool = True, frame_ms: int = 30,
+                 padding_ms: int = 200, threshold_db: float = -50.0, ffmpeg_path: Optional[str] = None,
+                 ffmpeg_timeout: float = 30):
+        self.sample_rate = sample_rate
+        self.trim_silence = trim_silence
+        self.frame_ms = frame_ms
+        self.padding_ms = padding_ms
+        self.threshold_db = threshold_db
+        self.ffmpeg_path = ffmpeg_path or find_ffmpeg()
+        self.ffmpeg_timeout = ffmpeg_timeout
+        
+        self._lock = threading.Lock()
+        self.processed = 0
+        self.skipped = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds_trimmed = 0.0
+    
+    @property
+    def available(self) -> bool:
+        return np is not None
+    
+    def process(self, audio: bytes, filename: Optional[str] = None,
+                content_type: Optional[str] = None) -> PreprocessedAudio:
+        """Decode, resample and trim audio; never raises for undecodable input"""
+        container = sniff_container(audio[:16])
+        result = self._process(audio, container)
+        if isinstance(result, str):
+            result = PreprocessedAudio(audio, filename, content_type or CONTAINER_TYPES.get(container),
+                                       container, len(audio), skipped=result)
+                                       
+        with self._lock:
+            self.bytes_in += len(audio)
+            self.bytes_out += len(result.audio)
+            if result.skipped:
+                self.skipped += 1
+            else:
+                self.processed += 1
+                self.seconds_trimmed += result.trimmed_seconds
+        return result
+    
+    def _process(self, audio: bytes, container: Optional[str]) -> Union[PreprocessedAudio, str]:
+        """The preprocessed audio, or why the upload has to go through as it is"""
+        if np is None:
+            return 'numpy not installed'
+            
+        samples, already_target = None, False
+        if container == 'wav':
+            decoded = self._decode_wav(audio)
+            if decoded is not None:
+                samples, already_target = decoded
+        if samples is None:
+            if not self.ffmpeg_path:
+                return 'ffmpeg not found'
+            samples = self._decode_ffmpeg(audio)
+            if samples is None:
+                return 'could not decode'
+                
+        start, end = self.speech_bounds(samples) if self.trim_silence else (0, len(samples))
+        trimmed_seconds = (len(samples) - (end - start)) / self.sample_rate
+        if already_target and start == 0 and end == len(samples):
+            # Nothing to change; upload the original rather than an identical re-encoding
+            return PreprocessedAudio(audio, 'audio.wav', 'audio/wav', container, len(audio),
+                                     len(samples) / self.sample_rate, 0.0, samples, self.sample_rate)
+                                     
+        samples = samples[start:end]
+        return PreprocessedAudio(self.encode_wav(samples), 'audio.wav', 'audio/wav', container, len(audio),
+                                 len(samples) / self.sample_rate, trimmed_seconds, samples, self.sample_rate)
+    
+    def _decode_wav(self, audio: bytes) -> Optional[Tuple[Any, bool]]:
+        """(int16 mono samples at sample_rate, whether the file already was exactly that)"""
+        try:
+            with wave.open(io.BytesIO(audio), 'rb') as wav:
+                channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+                frames = wav.readframes(wav.getnframes())
+        except (wave.Error, EOFError):
+            # Float and extensible WAVs are left to ffmpeg
+            return None
+        if width not in (1, 2, 4):
+            return None
+            
+        if width == 1:
+            samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.int16) - 128) << 8
+        else:
+            samples = np.frombuffer(frames, dtype='<i2' if width == 2 else '<i4')
+        samples = samples[:len(samples) - len(samples) % channels]
+        already_target = channels == 1 and width == 2 and rate == self.sample_rate
+        if channels > 1:
+            samples = samples.reshape(-1, channels).mean(axis=1)
+        if width == 4:
+            samples = samples / 65536
+        return self._resample(samples, rate), already_target
+    
+    def _decode_ffmpeg(self, audio: bytes):
+        command = [self.ffmpeg_path, '-nostdin', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0',
+                   '-ac', '1', '-ar', str(self.sample_rate), '-f', 's16le', 'pipe:1']
+        try:
+            completed = subprocess.run(command, input=audio, capture_output=True, timeout=self.ffmpeg_timeout)
+        except (OSError, subprocess.TimeoutExpired) as e:
+            print(f"Audio decode error: {e}")
+            return None
+        if completed.returncode != 0 or not completed.stdout:
+            print(f"Audio decode error: {completed.stderr.decode('utf-8', 'replace').strip()[:200]}")
+            return None
+        return np.frombuffer(completed.stdout, dtype='<i2')
+    
+    def _resample(self, samples, rate: int):
+        """Linear-interpolation resample to sample_rate, averaging first when downsampling"""
+        if rate == self.sample_rate or not len(samples):
+            return samples.astype(np.int16, copy=False)
+        samples = samples.astype(np.float32)
+        ratio = rate / self.sample_rate
+        if ratio >= 2:
+            width = int(ratio)
+            samples = np.convolve(samples, np.full(width, 1.0 / width, dtype=np.float32), mode='same')
+        positions = np.arange(0, len(samples) - 1, ratio, dtype=np.float64)
+        resampled = np.interp(positions, np.arange(len(samples)), samples)
+        return np.clip(np.round(resampled), -32768, 32767).astype(np.int16)
+    
+    def speech_bounds(self, samples) -> Tuple[int, int]:
+        """
+        Sample range from the first to the last voiced frame, padded by
+        padding_ms. A frame is voiced when its energy clears both the
+        absolute threshold_db and a level relative to the recording's own
+        noise floor and peak. All of it when nothing sounds like speech.
+        """
+        frame, energy_db = self._frame_energy(samples)
+        count = len(energy_db)
+        if count == 0:
+            return 0, len(samples)
+            
+        noise_db, peak_db = np.percentile(energy_db, 10), energy_db.max()
+        threshold = max(self.threshold_db, min(noise_db + 10, peak_db - 20))
+        voiced = np.flatnonzero(energy_db > threshold)
+        if not len(voiced):
+            return 0, len(samples)
+            
+        padding = -(-self.padding_ms // self.frame_ms)
+        start = max(0, voiced[0] - padding) * frame
+        last = voiced[-1] + 1 + padding
+        end = len(samples) if last >= count else last * frame
+        return int(start), int(end)
+    
+    def _frame_energy(self, samples) -> Tuple[int, Any]:
+        """Frame length in samples, and the energy of every whole frame in dBFS"""
+        frame = max(1, self.sample_rate * self.frame_ms // 1000)
+        count = len(samples) // frame
+        frames = samples[:count * frame].astype(np.float32).reshape(count, frame) / 32768.0
+        return frame, 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-10)
+    
+    def segment_bounds(self, samples, max_seconds: float, overlap_seconds: float = 1.0) -> List[Tuple[int, int]]:
+        """
+        Split samples into segments of at most max_seconds. Each cut falls
+        in the middle of the last of the quietest stretches in the latter
+        half of the segment, so words are rarely split, and neighbouring segments share overlap_seconds
+        around the cut so a word that is split is heard whole in one of them.
+        """
+        max_length = int(max_seconds * self.sample_rate)
+        half_overlap = int(overlap_seconds * self.sample_rate) // 2
+        if len(samples) <= max_length or max_length <= 4 * half_overlap:
+            return [(0, len(samples))]
+            
+        frame, energy_db = self._frame_energy(samples)
+        bounds, start = [], 0
+        while len(samples) - start > max_length:
+            first = (start + max_length // 2) // frame
+            last = max(first + 1, (start + max_length - half_overlap) // frame)
+            # The middle of the latest quiet stretch, so segments come out as long as allowed
+            window = energy_db[first:last]
+            quiet = window <= window.min() + 3
+            quiet_end = np.flatnonzero(quiet)[-1]
+            loud = np.flatnonzero(~quiet[:quiet_end])
+            quiet_start = loud[-1] + 1 if len(loud) else 0
+            cut = (first + int(quiet_start + quiet_end) // 2) * frame + frame // 2
+            bounds.append((start, cut + half_overlap))
+            start = cut - half_overlap
+        bounds.append((start, len(samples)))
+        return bounds
+    
+    def split(self, preprocessed: PreprocessedAudio, max_seconds: float,
+              overlap_seconds: float = 1.0) -> List[bytes]:
+        """
+        The audio to transcribe as WAV segments of at most max_seconds; just
+        the upload itself when it is short or could not be decoded
+        """
+        if preprocessed.samples is None or preprocessed.duration <= max_seconds:
+            return [preprocessed.audio]
+        samples = preprocessed.samples
+        return [self.encode_wav(samples[start:end])
+                for start, end in self.segment_bounds(samples, max_seconds, overlap_seconds)]
+    
+    def encode_wav(self, samples) -> bytes:
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(samples.astype('<i2', copy=False).tobytes())
+        return buffer.getvalue()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'available': self.available,
+                'ffmpeg': bool(self.ffmpeg_path),
+                'processed': self.processed,
+                'skipped': self.skipped,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'bytes_saved': self.bytes_in - self.bytes_out,
+                'seconds_trimmed': round(self.seconds_trimmed, 2)
+            }
@@ -0,0 +1,207 @@
+import os
+import secrets
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+class AudioEntry:
+    """A stored audio response, held in memory or spilled to a file"""
+    
+    __slots__ = ('data', 'path', 'size', 'content_type', 'expires_at')
+    
+    def __init__(self, data: Optional[bytes], size: int, content_type: str, expires_at: float):
+        self.data = data
+        self.path = None
+        self.size = size
+        self.content_type = content_type
+        self.expires_at = expires_at
+
+class AudioStore:
+    """
+    Bounded store for generated audio responses addressed by opaque IDs.
+    Entries expire after a TTL and are swept by a background thread. Once
+    in-memory audio exceeds the memory budget the oldest entries are
+    spilled to files, and once the item or disk limits are exceeded the
+    oldest entries are dropped. Spill files are written outside the lock,
+    so lookups never wait on disk.
+    """
+    
+    def __init__(self, max_memory_bytes: int = 64 * 1024 * 1024, max_disk_bytes: int = 512 * 1024 * 1024,
+                 max_items: int = 2000, ttl: float = 900, spill_dir: Optional[str] = None,
+                 sweep_interval: float = 30):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.max_items = max_items
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        
+        self._spill_dir = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._entries = OrderedDict()  # id -> AudioEntry, oldest first
+        self._spilling = set()  # ids whose files are being written
+        self._spilling_bytes = 0
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._sweeper = None
+        self._stopped = threading.Event()
+        
+        self.expired = 0
+        self.spilled = 0
+        self.dropped = 0
+    
+    def put(self, audio: bytes, content_type: str = 'audio/wav', ttl: Optional[float] = None) -> str:
+        """Store audio and return its opaque ID"""
+        self._ensure_sweeper()
+        audio_id = secrets.token_urlsafe(16)
+        # Decoded TTS audio arrives as a bytearray; keep it rather than copy it
+        data = audio if isinstance(audio, (bytes, bytearray)) else bytes(audio)
+        entry = AudioEntry(data, len(data), content_type,
+                           time.time() + (self.ttl if ttl is None else ttl))
+        
+        with self._lock:
+            self._entries[audio_id] = entry
+            self._memory_bytes += entry.size
+            to_spill = self._enforce_limits()
+        if to_spill:
+            self._spill(to_spill)
+        return audio_id
+    
+    def get(self, audio_id: str) -> Optional[AudioEntry]:
+        """
+        A snapshot of the entry for an ID, or None if unknown or expired; it
+        keeps its data or path even if the entry is spilled afterwards
+        """
+        with self._lock:
+            entry = self._entries.get(audio_id)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.time():
+                self._discard(audio_id)
+                self.expired += 1
+                return None
+            snapshot = AudioEntry(entry.data, entry.size, entry.content_type, entry.expires_at)
+            snapshot.path = entry.path
+            return snapshot
+    
+    def delete(self, audio_id: str):
+        with self._lock:
+            if audio_id in self._entries:
+                self._discard(audio_id)
+    
+    def sweep(self) -> int:
+        """Remove expired entries; returns how many were removed"""
+        now = time.time()
+        with self._lock:
+            expired_ids = [audio_id for audio_id, entry in self._entries.items() if entry.expires_at <= now]
+            for audio_id in expired_ids:
+                self._discard(audio_id)
+            self.expired += len(expired_ids)
+        return len(expired_ids)
+    
+    def close(self):
+        """Stop the sweeper and remove spilled files"""
+        self._stopped.set()
+        with self._lock:
+            for audio_id in list(self._entries):
+                self._discard(audio_id)
+            if self._owns_spill_dir and self._spill_dir:
+                shutil.rmtree(self._spill_dir, ignore_errors=True)
+                self._spill_dir = None
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'items': len(self._entries),
+                'memory_bytes': self._memory_bytes,
+                'disk_bytes': self._disk_bytes,
+                'expired': self.expired,
+                'spilled': self.spilled,
+                'dropped': self.dropped
+            }
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _enforce_limits(self) -> list:
+        """Drop entries over the item limit; returns (id, entry, path) of the oldest to spill to disk"""
+        while len(self._entries) > self.max_items:
+            self._discard(next(iter(self._entries)))
+            self.dropped += 1
+            
+        to_spill = []
+        excess = self._memory_bytes - self._spilling_bytes - self.max_memory_bytes
+        if excess > 0:
+            if self._spill_dir is None:
+                self._spill_dir = tempfile.mkdtemp(prefix='sarvam_audio_')
+            for audio_id, entry in self._entries.items():
+                if excess <= 0:
+                    break
+                if entry.data is not None and audio_id not in self._spilling:
+                    self._spilling.add(audio_id)
+                    self._spilling_bytes += entry.size
+                    excess -= entry.size
+                    to_spill.append((audio_id, entry, os.path.join(self._spill_dir, audio_id)))
+        return to_spill
+    
+    def _spill(self, to_spill: list):
+        """Write entries to their files without the lock held, then swap them over under it"""
+        for audio_id, entry, path in to_spill:
+            try:
+                with open(path, 'wb') as audio_file:
+                    audio_file.write(entry.data)
+                written = True
+            except OSError as e:
+                print(f"Audio store spill error: {e}")
+                written = False
+                
+            with self._lock:
+                self._spilling.discard(audio_id)
+                self._spilling_bytes -= entry.size
+                # The entry may have expired or been dropped while its file was written
+                current = written and self._entries.get(audio_id) is entry
+                if current:
+                    entry.path = path
+                    entry.data = None
+                    self._memory_bytes -= entry.size
+                    self._disk_bytes += entry.size
+                    self.spilled += 1
+                    while self._disk_bytes > self.max_disk_bytes:
+                        spilled_id = next(spilled for spilled, other in self._entries.items() if other.path)
+                        self._discard(spilled_id)
+                        self.dropped += 1
+            if written and not current:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+    
+    def _discard(self, audio_id: str):
+        entry = self._entries.pop(audio_id)
+        if entry.path:
+            self._disk_bytes -= entry.size
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+        else:
+            self._memory_bytes -= entry.size
+    
+    def _ensure_sweeper(self):
+        """Start the expiry thread on first use, so it exists in the serving process"""
+        if self._sweeper is not None and self._sweeper.is_alive():
+            return
+        with self._lock:
+            if self._sweeper is None or not self._sweeper.is_alive():
+                self._sweeper = threading.Thread(target=self._sweep_loop, name='audio-store-sweeper', daemon=True)
+                self._sweeper.start()
+    
+    def _sweep_loop(self):
+        while not self._stopped.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"Audio store sweep error: {e}")
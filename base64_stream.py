@@ -0,0 +1,77 @@
+import binascii
+import re
+from typing import Optional
+
+# Upper bound on the buffer preallocated from a Content-Length header
+MAX_PREALLOCATE_BYTES = 64 * 1024 * 1024
+
+class Base64FieldDecoder:
+    """
+    Incremental decoder for the first base64 string of a JSON array field,
+    such as "audios": ["UklGR..."] in a text-to-speech response. Body
+    chunks are fed as they arrive and decoded straight into one
+    preallocated bytearray, so neither the JSON body, the base64 string
+    nor a second copy of the audio is ever held in memory.
+    """
+    
+    def __init__(self, field: str, size_hint: Optional[int] = None):
+        self._start = re.compile(rb'"' + re.escape(field.encode()) + rb'"\s*:\s*\[\s*"')
+        # Decoded base64 is at most 3/4 the size of the body it came in
+        capacity = min(size_hint * 3 // 4, MAX_PREALLOCATE_BYTES) if size_hint else 0
+        self._audio = bytearray(capacity)
+        self._length = 0
+        self._head = bytearray()  # body before the string, while still looking for it
+        self._carry = b''  # base64 characters short of a whole 4-character group
+        self._in_string = False
+        self.done = False
+    
+    def feed(self, chunk: bytes):
+        if self.done:
+            return
+        if not self._in_string:
+            self._head += chunk
+            match = self._start.search(self._head)
+            if match is None:
+                return
+            self._in_string = True
+            chunk = bytes(self._head[match.end():])
+            self._head = bytearray()
+            
+        end = chunk.find(b'"')
+        if end >= 0:
+            chunk = chunk[:end]
+            self.done = True
+        self._decode(chunk)
+    
+    def _decode(self, chunk: bytes):
+        data = self._carry + chunk if self._carry else chunk
+        if b'\\' in data:
+            # JSON may escape '/' or wrap lines; hold back an escape split across chunks
+            held = len(data) - len(data.rstrip(b'\\'))
+            if held % 2 and not self.done:
+                data, tail = data[:-1], b'\\'
+            else:
+                tail = b''
+            data = data.replace(b'\\/', b'/').replace(b'\\n', b'').replace(b'\\r', b'')
+        else:
+            tail = b''
+            
+        if self.done:
+            data += b'=' * (-len(data) % 4)
+            whole = len(data)
+        else:
+            whole = len(data) - len(data) % 4
+        self._carry = bytes(data[whole:]) + tail
+        if not whole:
+            return
+            
+        decoded = binascii.a2b_base64(memoryview(data)[:whole])
+        self._audio[self._length:self._length + len(decoded)] = decoded
+        self._length += len(decoded)
+    
+    def result(self) -> Optional[bytearray]:
+        """The decoded bytes, or None if the field was missing, empty or cut short"""
+        if not self.done or not self._length:
+            return None
+        del self._audio[self._length:]
+        return self._audio
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for emergency keyword scanning as vocabulary grows
+Compares the per-keyword substring loop with the Aho-Corasick scanner
+"""
+
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aho_corasick import AhoCorasick
+from medical_ai import MedicalAI
+
+QUERIES = [
+    "I have had a high fever and a headache since yesterday",
+    "मुझे दो दिन से सिर में दर्द और बुखार है",
+    "my father has severe chest pain and difficulty breathing",
+    "মাথা ব্যথা এবং জ্বর আছে, কী করব?"
+]
+
+# First letter of each supported script, used to build synthetic vocabulary
+SCRIPT_BASES = [0x0041, 0x0905, 0x0985, 0x0A05, 0x0A85, 0x0B05, 0x0B85, 0x0C05, 0x0C85, 0x0D05]
+
+def synthetic_keywords(keyword_count: int) -> list:
+    """Real keywords padded with synthetic multi-script phrases"""
+    keywords = list(MedicalAI().emergency_keywords)
+    i = 0
+    while len(keywords) < keyword_count:
+        base = SCRIPT_BASES[i % len(SCRIPT_BASES)]
+        word = ''.join(chr(base + (i // len(SCRIPT_BASES) + j) % 20) for j in range(6))
+        keywords.append(f"{word} {i}")
+        i += 1
+    return keywords
+
+def legacy_check(keywords: list, query: str) -> bool:
+    """The original per-keyword substring loop"""
+    query_lower = query.lower()
+    for keyword in keywords:
+        if keyword.lower() in query_lower:
+            return True
+    return False
+
+def scanner_check(scanner: AhoCorasick, query: str) -> bool:
+    for _ in scanner.finditer(query.lower()):
+        return True
+    return False
+
+def run(keyword_counts=(18, 180, 1800, 18000), number=500):
+    print(f"{'keywords':>10} {'legacy µs/query':>16} {'scanner µs/query':>17}")
+    for count in keyword_counts:
+        keywords = synthetic_keywords(count)
+        scanner = AhoCorasick(keyword.lower() for keyword in keywords)
+        for query in QUERIES:
+            assert legacy_check(keywords, query) == scanner_check(scanner, query)
+            
+        legacy = timeit.timeit(lambda: [legacy_check(keywords, q) for q in QUERIES], number=number)
+        scanned = timeit.timeit(lambda: [scanner_check(scanner, q) for q in QUERIES], number=number)
+        per_query = 1e6 / (number * len(QUERIES))
+        print(f"{count:>10} {legacy * per_query:>16.1f} {scanned * per_query:>17.1f}")
+
+if __name__ == "__main__":
+    run()
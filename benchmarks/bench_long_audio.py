@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Wall-clock transcription time of a long recording, whole versus split
+Starts benchmarks/mock_sarvam.py with speech-to-text latency proportional
+to audio length, builds a synthetic narrative of speech-like bursts and
+pauses, and times one upload of the whole recording against segmented
+transcription at several concurrency levels.
+
+    python benchmarks/bench_long_audio.py --seconds 120 --concurrency 1 2 4 8
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadgen import free_port, wait_until_listening
+
+def narrative(seconds: float, sample_rate: int = 16000, seed: int = 0):
+    """Bursts of noise at speech level, 2-4 s long, separated by 0.3-0.8 s pauses"""
+    rng = np.random.default_rng(seed)
+    parts, total = [], 0
+    while total < seconds * sample_rate:
+        burst = int(rng.uniform(2, 4) * sample_rate)
+        pause = int(rng.uniform(0.3, 0.8) * sample_rate)
+        parts += [rng.normal(0, 3000, burst).astype(np.int16), np.zeros(pause, dtype=np.int16)]
+        total += burst + pause
+    return np.concatenate(parts)[:int(seconds * sample_rate)]
+
+async def timed(coroutine) -> float:
+    started = time.perf_counter()
+    transcript = await coroutine
+    assert transcript is not None, "transcription failed"
+    return time.perf_counter() - started
+
+async def run(args, base_url: str):
+    import config
+    config.Config.SARVAM_BASE_URL = base_url
+    from audio_preprocess import AudioPreprocessor
+    from sarvam_client import AsyncSarvamAIClient
+    
+    preprocessor = AudioPreprocessor(trim_silence=False)
+    samples = narrative(args.seconds)
+    preprocessed = preprocessor.process(preprocessor.encode_wav(samples))
+    segments = preprocessor.split(preprocessed, args.segment_seconds, args.overlap_seconds)
+    client = AsyncSarvamAIClient('benchmark', single_flight=False, circuit_breakers=None)
+    try:
+        whole = await timed(client.speech_to_text(preprocessed.audio))
+        print(f"{args.seconds:.0f}s recording, {len(segments)} segments of up to {args.segment_seconds:.0f}s")
+        print(f"{'mode':<16} {'seconds':>8} {'speedup':>8}")
+        print(f"{'whole':<16} {whole:>8.2f} {1:>7.2f}x")
+        for concurrency in args.concurrency:
+            elapsed = await timed(client.speech_to_text_segments(segments, concurrency=concurrency))
+            print(f"{f'segments x{concurrency}':<16} {elapsed:>8.2f} {whole / elapsed:>7.2f}x")
+    finally:
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=120)
+    parser.add_argument('--segment-seconds', type=float, default=30)
+    parser.add_argument('--overlap-seconds', type=float, default=1.0)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--stt-realtime-factor', type=float, default=0.1,
+                        help='mock STT seconds per second of audio')
+    args = parser.parse_args()
+    
+    port = free_port()
+    mock = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_sarvam.py'),
+                             '--port', str(port), '--stt-realtime-factor', str(args.stt_realtime_factor)])
+    try:
+        wait_until_listening(port, mock)
+        asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmarks for the MedicalAI hot paths run on every request
+detect_symptoms, check_emergency and symptom template rendering over
+synthetic queries of several lengths and scripts, against knowledge bases
+of several sizes. Records ops/sec and peak bytes allocated per call, and
+compares against a committed baseline, failing on regressions.
+
+    python benchmarks/bench_medical_ai.py --baseline benchmarks/medical_ai_baseline.json
+    python benchmarks/bench_medical_ai.py --save-baseline benchmarks/medical_ai_baseline.json
+
+Ops/sec are compared relative to a fixed pure-Python calibration loop, so
+a baseline recorded on one machine stays meaningful on another.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aho_corasick import AhoCorasick
+from medical_ai import MedicalAI, SymptomMatcher
+from benchmarks.bench_symptom_matcher import synthetic_patterns
+from benchmarks.bench_emergency_scanner import synthetic_keywords
+
+# A symptom phrase per script, padded with neutral filler to the wanted length
+SCRIPT_QUERIES = {
+    'latin': ("I have had a fever and a headache since yesterday.", " I also feel tired in the evening."),
+    'devanagari': ("मुझे कल से बुखार और सिर में दर्द है।", " शाम को थकान भी महसूस होती है।"),
+    'bengali': ("আমার গতকাল থেকে জ্বর আর মাথা ব্যথা।", " সন্ধ্যায় ক্লান্ত লাগে।"),
+    'tamil': ("எனக்கு நேற்றிலிருந்து காய்ச்சல் மற்றும் தலைவலி.", " மாலையில் சோர்வாக இருக்கிறது."),
+    'mixed': ("mujhe kal se fever hai aur सिर में दर्द bhi.", " shaam ko थकान feel hoti hai.")
+}
+QUERY_LENGTHS = {'short': 60, 'medium': 400, 'long': 4000}
+
+# Knowledge base sizes: symptom conditions and emergency keywords
+CONDITION_COUNTS = (5, 50, 500)
+KEYWORD_COUNTS = (18, 1800)
+
+def synthetic_query(script: str, length: int) -> str:
+    phrase, filler = SCRIPT_QUERIES[script]
+    query = phrase
+    while len(query) < length:
+        query += filler
+    return query[:max(length, len(phrase))]
+
+def calibration():
+    """Fixed pure-Python workload that ops/sec are normalized against"""
+    total = 0
+    for i in range(1000):
+        total += i * i % 7
+    return total
+
+def _calls_per_slice(fn, slice_time: float) -> int:
+    """Calls of fn that take about slice_time seconds"""
+    number = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started
+        if elapsed >= slice_time:
+            return max(1, int(number * slice_time / elapsed))
+        number *= 2
+
+def _timed(fn, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - started
+
+def measure_ops(fn, slices: int = 15, slice_time: float = 0.005):
+    """
+    Median ops/sec of fn, and its median ratio to the calibration loop.
+    Short slices of fn and calibration alternate, so CPU frequency changes
+    and noisy neighbours affect both sides of each ratio alike.
+    """
+    fn_number = _calls_per_slice(fn, slice_time)
+    calibration_number = _calls_per_slice(calibration, slice_time)
+    rates, ratios = [], []
+    for _ in range(slices):
+        calibration_rate = calibration_number / _timed(calibration, calibration_number)
+        rate = fn_number / _timed(fn, fn_number)
+        rates.append(rate)
+        ratios.append(rate / calibration_rate)
+    return statistics.median(rates), statistics.median(ratios)
+
+def measure_peak_alloc(fn) -> int:
+    """Peak bytes allocated during one call, after a warm-up call"""
+    fn()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        fn()
+        return tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+def medical_ai_with(conditions: int, keywords: int) -> MedicalAI:
+    """MedicalAI whose matchers are built over a knowledge base padded to the given sizes"""
+    medical_ai = MedicalAI(corpus_path='')
+    medical_ai.symptom_matcher = SymptomMatcher(synthetic_patterns(conditions))
+    medical_ai.emergency_scanner = AhoCorasick(keyword.lower() for keyword in synthetic_keywords(keywords))
+    return medical_ai
+
+def cases():
+    """(name, callable) for every benchmarked combination"""
+    queries = {
+        (script, length_name): synthetic_query(script, length)
+        for script in SCRIPT_QUERIES for length_name, length in QUERY_LENGTHS.items()
+    }
+    for conditions in CONDITION_COUNTS:
+        medical_ai = medical_ai_with(conditions, KEYWORD_COUNTS[0])
+        for (script, length_name), query in queries.items():
+            yield f"detect_symptoms/kb={conditions}/{script}/{length_name}", \
+                lambda medical_ai=medical_ai, query=query: medical_ai.detect_symptoms(query)
+    for keywords in KEYWORD_COUNTS:
+        medical_ai = medical_ai_with(CONDITION_COUNTS[0], keywords)
+        for (script, length_name), query in queries.items():
+            yield f"check_emergency/kw={keywords}/{script}/{length_name}", \
+                lambda medical_ai=medical_ai, query=query: medical_ai.check_emergency(query)
+    medical_ai = MedicalAI(corpus_path='')
+    for language in MedicalAI.RESPONSE_LANGUAGES:
+        for symptom in medical_ai.medical_knowledge:
+            yield f"render_symptom/{language}/{symptom}", \
+                lambda symptom=symptom, language=language: medical_ai._generate_symptom_response([symptom], language)
+
+def run(name_filter: str = None) -> dict:
+    calibration_ops, _ = measure_ops(calibration)
+    results = {}
+    for name, fn in cases():
+        if name_filter and name_filter not in name:
+            continue
+        ops, relative_ops = measure_ops(fn)
+        results[name] = {
+            'ops_per_sec': round(ops, 1),
+            'relative_ops': round(relative_ops, 4),
+            'peak_alloc_bytes': measure_peak_alloc(fn)
+        }
+        print(f"{name:<45} {ops:>12,.0f} ops/s {results[name]['peak_alloc_bytes']:>9,} B")
+    return {
+        'meta': {
+            'calibration_ops_per_sec': round(calibration_ops, 1),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'cases': results
+    }
+
+def compare(results: dict, baseline: dict, max_slowdown: float, max_alloc_growth: float) -> list:
+    """Return the cases that got slower or allocate more than allowed"""
+    regressions = []
+    for name, current in results['cases'].items():
+        previous = baseline['cases'].get(name)
+        if not previous:
+            continue
+        slowdown = 1 - current['relative_ops'] / previous['relative_ops']
+        if slowdown > max_slowdown:
+            regressions.append(f"{name}: {slowdown:.0%} slower")
+        # A few hundred bytes of slack absorbs interpreter-level jitter on tiny calls
+        allowed_bytes = previous['peak_alloc_bytes'] * (1 + max_alloc_growth) + 256
+        if current['peak_alloc_bytes'] > allowed_bytes:
+            regressions.append(
+                f"{name}: peak allocation {previous['peak_alloc_bytes']:,} -> {current['peak_alloc_bytes']:,} B"
+            )
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--filter', help='only run cases whose name contains this')
+    parser.add_argument('--baseline', help='compare against a saved baseline and fail on regressions')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write results as the new baseline')
+    parser.add_argument('--max-slowdown', type=float, default=0.25,
+                        help='allowed drop in calibrated ops/sec (default 25%%)')
+    parser.add_argument('--max-alloc-growth', type=float, default=0.10,
+                        help='allowed growth in peak bytes allocated per call (default 10%%)')
+    args = parser.parse_args()
+    
+    results = run(args.filter)
+    
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write('\n')
+        print(f"📝 Wrote {args.save_baseline}")
+        
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.max_slowdown, args.max_alloc_growth)
+        for regression in regressions:
+            print(f"⚠️  {regression}")
+        if regressions:
+            print(f"❌ {len(regressions)} regressions against {args.baseline}")
+            return 1
+        print(f"✅ No regressions against {args.baseline}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Conversation sessions: repeat-turn latency and language detections saved
+Starts benchmarks/mock_sarvam.py and the app (and benchmarks/mock_redis.py
+for the redis backend), then holds multi-turn Hindi conversations over
+/api/consult. Each conversation is run twice: once echoing the session_id
+the server hands back, once without, so every turn is a first turn. Reports
+median latency of first and repeat turns and the mock's /detect-language
+calls for each.
+
+    python benchmarks/bench_sessions.py --conversations 20 --turns 4 --backend memory redis
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadgen import free_port, spawned_stack, wait_until_listening
+
+# Devanagari alone does not tell Hindi from Marathi, so each turn needs /detect-language
+TURNS = [
+    'मुझे कल से सिरदर्द है',
+    'और अब बुखार भी है',
+    'रात को खांसी बढ़ जाती है',
+    'क्या मुझे डॉक्टर के पास जाना चाहिए',
+    'दवा लेने के बाद भी आराम नहीं है',
+    'मैं क्या खा सकता हूँ'
+]
+
+def post(url: str, payload: dict) -> dict:
+    request = urllib.request.Request(url, json.dumps(payload).encode('utf-8'),
+                                     {'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+def detect_calls(mock_url: str) -> int:
+    with urllib.request.urlopen(mock_url + '/__stats', timeout=5) as response:
+        return json.loads(response.read())['calls'].get('detect-language', 0)
+
+def converse(app_url: str, turns: int, keep_session: bool) -> list:
+    """Seconds per turn of one conversation"""
+    session_id = None
+    durations = []
+    for query in (TURNS * turns)[:turns]:
+        started = time.perf_counter()
+        result = post(app_url + '/api/consult', {'query': query, 'session_id': session_id})
+        durations.append(time.perf_counter() - started)
+        if keep_session:
+            session_id = result['session_id']
+    return durations
+
+def run_backend(backend: str, args) -> dict:
+    redis_process = None
+    os.environ['SESSION_BACKEND'] = backend
+    if backend == 'redis':
+        redis_port = free_port()
+        redis_process = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_redis.py'),
+                                          '--port', str(redis_port), '--latency-ms', str(args.redis_latency_ms)])
+        wait_until_listening(redis_port, redis_process)
+        os.environ['SESSION_REDIS_URL'] = f'redis://127.0.0.1:{redis_port}/0'
+    stack_args = SimpleNamespace(seed=args.seed, latency_scale=args.latency_scale, error_rate=0.0, latency=None)
+    
+    results = {}
+    try:
+        with spawned_stack(stack_args) as (app_url, mock_url):
+            for keep_session in (False, True):
+                before = detect_calls(mock_url)
+                conversations = [converse(app_url, args.turns, keep_session) for _ in range(args.conversations)]
+                results[keep_session] = {
+                    'first': statistics.median(turns[0] for turns in conversations),
+                    'repeat': statistics.median(duration for turns in conversations for duration in turns[1:]),
+                    'detect_calls': detect_calls(mock_url) - before
+                }
+    finally:
+        if redis_process:
+            redis_process.terminate()
+            redis_process.wait(timeout=10)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--conversations', type=int, default=20)
+    parser.add_argument('--turns', type=int, default=4)
+    parser.add_argument('--backend', nargs='+', choices=('memory', 'redis'), default=['memory', 'redis'])
+    parser.add_argument('--redis-latency-ms', type=float, default=0.5)
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    
+    print(f"{args.conversations} conversations of {args.turns} turns; median seconds per turn")
+    print(f"{'backend':<8} {'session':<9} {'first':>7} {'repeat':>7} {'detect calls':>13}")
+    for backend in args.backend:
+        results = run_backend(backend, args)
+        for keep_session in (False, True):
+            result = results[keep_session]
+            print(f"{backend:<8} {'kept' if keep_session else 'none':<9} {result['first']:>7.3f} "
+                  f"{result['repeat']:>7.3f} {result['detect_calls']:>13}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for symptom detection as the knowledge base grows
+Compares the per-pattern re.search loop with the precompiled SymptomMatcher
+"""
+
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from medical_ai import MedicalAI, SymptomMatcher
+
+QUERIES = [
+    "I have had a high fever and a headache since yesterday",
+    "मुझे दो दिन से सिर में दर्द और बुखार है",
+    "my stomach pain gets worse after eating and I feel nausea",
+    "How can I stay healthy during the monsoon season?"
+]
+
+def synthetic_patterns(condition_count: int) -> dict:
+    """Real patterns padded with synthetic conditions up to condition_count"""
+    patterns = dict(MedicalAI()._load_symptom_patterns())
+    for i in range(len(patterns), condition_count):
+        patterns[f'condition_{i}'] = [
+            f'symptom{i}|sign{i}|लक्षण{i}',
+            f'area{i}.*ache|क्षेत्र{i}.*दर्द'
+        ]
+    return patterns
+
+def legacy_detect(patterns: dict, query: str) -> list:
+    """The original per-pattern re.search loop"""
+    query_lower = query.lower()
+    detected = []
+    for symptom, symptom_patterns in patterns.items():
+        for pattern in symptom_patterns:
+            if re.search(pattern, query_lower, re.IGNORECASE):
+                detected.append(symptom)
+                break
+    return detected
+
+def run(condition_counts=(5, 50, 500), number=200):
+    print(f"{'conditions':>10} {'legacy µs/query':>16} {'matcher µs/query':>17} {'speedup':>8}")
+    for count in condition_counts:
+        patterns = synthetic_patterns(count)
+        matcher = SymptomMatcher(patterns)
+        for query in QUERIES:
+            assert legacy_detect(patterns, query) == matcher.match(query)
+            
+        legacy = timeit.timeit(lambda: [legacy_detect(patterns, q) for q in QUERIES], number=number)
+        compiled = timeit.timeit(lambda: [matcher.match(q) for q in QUERIES], number=number)
+        per_query = 1e6 / (number * len(QUERIES))
+        print(f"{count:>10} {legacy * per_query:>16.1f} {compiled * per_query:>17.1f} {legacy / compiled:>7.1f}x")
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Peak memory per concurrent text-to-speech request
+Starts benchmarks/mock_sarvam.py, then for each client (sync and async)
+and concurrency level runs a fresh child process that fires that many
+concurrent uncached TTS requests for long text and reports how much its
+peak RSS grew, per request and relative to the decoded audio size.
+
+    python benchmarks/bench_tts_memory.py --chars 4000 --concurrency 1 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadgen import free_port, wait_until_listening
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1])
+    raise KeyError(field)
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's peak RSS counter (Linux 4.0+); False if unsupported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as clear_refs:
+            clear_refs.write('5')
+        return True
+    except OSError:
+        return False
+
+def peak_rss_kb() -> int:
+    try:
+        return _status_kb('VmHWM:')
+    except (OSError, KeyError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def texts(chars: int, count: int):
+    """Distinct long texts, so no request is coalesced with another"""
+    sentence = "Drink plenty of fluids and rest well. "
+    return [f"{index}. " + (sentence * (chars // len(sentence) + 1))[:chars] for index in range(count)]
+
+def child(args) -> dict:
+    """Run one measurement in this process and return its numbers"""
+    import config
+    config.Config.SARVAM_BASE_URL = args.base_url
+    from sarvam_client import SarvamAIClient, AsyncSarvamAIClient
+    
+    requests_texts = texts(args.chars, args.concurrency)
+    options = dict(single_flight=False, circuit_breakers=None)
+    if args.client == 'sync':
+        client = SarvamAIClient('benchmark', **options)
+        client.text_to_speech("warm up", 'en')
+        def run():
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                return list(pool.map(lambda text: client.text_to_speech(text, 'en'), requests_texts))
+    else:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        client = AsyncSarvamAIClient('benchmark', **options)
+        loop.run_until_complete(client.text_to_speech("warm up", 'en'))
+        def run():
+            return loop.run_until_complete(asyncio.gather(
+                *(client.text_to_speech(text, 'en') for text in requests_texts)
+            ))
+            
+    tracemalloc.start()
+    baseline_rss = _status_kb('VmRSS:')
+    exact = reset_peak_rss()
+    audios = run()
+    peak_rss = peak_rss_kb()
+    traced_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    
+    assert all(audios), "a TTS request failed"
+    audio_bytes = sum(len(audio) for audio in audios)
+    rss_growth = max(0, peak_rss - baseline_rss) * 1024
+    return {
+        'client': args.client,
+        'concurrency': args.concurrency,
+        'audio_bytes_per_request': audio_bytes // len(audios),
+        'peak_rss_per_request': rss_growth // len(audios),
+        'rss_to_audio_ratio': round(rss_growth / audio_bytes, 2),
+        'traced_peak_per_request': traced_peak // len(audios),
+        'traced_to_audio_ratio': round(traced_peak / audio_bytes, 2),
+        'exact_peak': exact
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--chars', type=int, default=4000, help='characters of text per request')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--clients', nargs='+', choices=('sync', 'async'), default=['sync', 'async'])
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--client', help=argparse.SUPPRESS)
+    parser.add_argument('--base-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        args.concurrency = args.concurrency[0]
+        print(json.dumps(child(args)))
+        return 0
+        
+    port = free_port()
+    mock = subprocess.Popen([sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_sarvam.py'),
+                             '--port', str(port), '--latency-scale', '0.01'])
+    try:
+        wait_until_listening(port, mock)
+        print(f"{'client':<7} {'conc':>4} {'audio/req':>11} {'peak RSS/req':>13} {'RSS/audio':>10} "
+              f"{'traced/req':>11} {'traced/audio':>13}")
+        for client in args.clients:
+            for concurrency in args.concurrency:
+                output = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), '--child', '--client', client,
+                     '--concurrency', str(concurrency), '--chars', str(args.chars),
+                     '--base-url', f"http://127.0.0.1:{port}"],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{client:<7} {concurrency:>4} {result['audio_bytes_per_request']:>11,} "
+                      f"{result['peak_rss_per_request']:>13,} {result['rss_to_audio_ratio']:>9}x "
+                      f"{result['traced_peak_per_request']:>11,} {result['traced_to_audio_ratio']:>12}x"
+                      f"{'' if result['exact_peak'] else '  (peak RSS since start)'}")
+    finally:
+        mock.terminate()
+        mock.wait(timeout=10)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Turn latency of the streaming voice consultation WebSocket
+Starts benchmarks/mock_sarvam.py and the app, streams spoken turns over
+/api/voice/stream in real time (speech-like noise, then silence) and
+reports, per turn, the time from the end of speech to the first reply
+audio next to a bare speech-to-text round trip for the same utterance.
+The difference is the endpointing silence plus everything after STT.
+
+    python benchmarks/bench_voice_stream.py --turns 5 --speech-seconds 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from simple_websocket import Client
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.loadgen import spawned_stack
+
+FRAME_SECONDS = 0.02
+
+def utterance_pcm(seconds: float, sample_rate: int = 16000, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, 3000, int(seconds * sample_rate)).astype('<i2').tobytes()
+
+def silence_pcm(seconds: float, sample_rate: int = 16000) -> bytes:
+    return b'\x00\x00' * int(seconds * sample_rate)
+
+def stream_turn(ws: Client, speech: bytes, silence: bytes, frame_bytes: int) -> dict:
+    """Send one turn paced like a microphone; seconds from end of speech to transcript and first audio"""
+    audio = speech + silence
+    started = time.perf_counter()
+    for index, offset in enumerate(range(0, len(audio), frame_bytes)):
+        ws.send(audio[offset:offset + frame_bytes])
+        delay = started + (index + 1) * FRAME_SECONDS - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    speech_end = started + len(speech) // frame_bytes * FRAME_SECONDS
+    
+    result = {}
+    while True:
+        message = ws.receive(timeout=30)
+        if message is None:
+            raise RuntimeError("no reply within 30s")
+        now = time.perf_counter() - speech_end
+        if isinstance(message, bytes):
+            result.setdefault('first_audio', now)
+            continue
+        event = json.loads(message)
+        if event['type'] == 'transcript':
+            result['transcript'] = now
+        elif event['type'] == 'error':
+            raise RuntimeError(event['error'])
+        elif event['type'] == 'turn_end':
+            result['server_first_audio_ms'] = event['first_audio_ms']
+            return result
+
+async def stt_round_trips(mock_url: str, wav: bytes, count: int) -> list:
+    import config
+    config.Config.SARVAM_BASE_URL = mock_url
+    from sarvam_client import AsyncSarvamAIClient
+    
+    client = AsyncSarvamAIClient('benchmark', single_flight=False, circuit_breakers=None)
+    try:
+        durations = []
+        for _ in range(count):
+            started = time.perf_counter()
+            await client.speech_to_text(wav, filename='utterance.wav', content_type='audio/wav')
+            durations.append(time.perf_counter() - started)
+        return durations
+    finally:
+        await client.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--turns', type=int, default=5)
+    parser.add_argument('--speech-seconds', type=float, default=2.0)
+    parser.add_argument('--silence-seconds', type=float, default=1.0,
+                        help='silence streamed after each utterance; must exceed VOICE_ENDPOINT_SILENCE_MS')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    stack_args = SimpleNamespace(seed=args.seed, latency_scale=args.latency_scale, error_rate=0.0, latency=None)
+    
+    from voice_stream import pcm_to_wav
+    speech = utterance_pcm(args.speech_seconds, seed=args.seed)
+    silence = silence_pcm(args.silence_seconds)
+    frame_bytes = int(16000 * FRAME_SECONDS) * 2
+    
+    with spawned_stack(stack_args) as (app_url, mock_url):
+        stt = asyncio.run(stt_round_trips(mock_url, pcm_to_wav(speech), args.turns))
+        ws = Client.connect(app_url.replace('http', 'ws', 1) + '/api/voice/stream')
+        try:
+            ready = json.loads(ws.receive(timeout=10))
+            assert ready['type'] == 'ready', ready
+            turns = [stream_turn(ws, speech, silence, frame_bytes) for _ in range(args.turns)]
+        finally:
+            ws.close()
+            
+    print(f"{args.turns} turns of {args.speech_seconds:.1f}s speech; median seconds after end of speech")
+    print(f"{'STT round trip alone':<34} {statistics.median(stt):>7.3f}")
+    print(f"{'transcript on the socket':<34} {statistics.median(t['transcript'] for t in turns):>7.3f}")
+    print(f"{'first reply audio on the socket':<34} {statistics.median(t['first_audio'] for t in turns):>7.3f}")
+    print(f"{'  of which after endpointing':<34} "
+          f"{statistics.median(t['server_first_audio_ms'] for t in turns) / 1000:>7.3f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
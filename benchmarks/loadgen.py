@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Load generator for /api/consult and /api/audio-consult
+Starts benchmarks/mock_sarvam.py and the app (unless --target points at a
+running app), drives each scenario with concurrent clients replaying a
+multilingual corpus, and reports throughput, p50/p95/p99 latency and
+upstream calls per request. Results can be saved as a baseline and later
+runs compared against it.
+
+    python benchmarks/loadgen.py --save-baseline benchmarks/baseline.json
+    python benchmarks/loadgen.py --baseline benchmarks/baseline.json
+
+Environment variables are passed through to the spawned app, so
+configurations can be compared, e.g. TRANSLATE_BATCH_WINDOW_MS=0.
+"""
+
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from collections import Counter
+from contextlib import contextmanager
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.mock_sarvam import TRANSCRIPT_MARKER
+
+# (language, query) pairs: symptoms, emergencies and general questions across scripts
+QUERIES = [
+    ('en', "I have had a high fever and body ache since yesterday"),
+    ('en', "My head hurts badly and light bothers my eyes"),
+    ('en', "I have a dry cough and a sore throat for three days"),
+    ('en', "My father has severe chest pain and difficulty breathing"),
+    ('en', "How much water should I drink every day?"),
+    ('en', "I feel nauseous and have stomach pain after eating"),
+    ('hi', "मुझे दो दिन से बुखार और सिर में दर्द है"),
+    ('hi', "मेरे पेट में दर्द है और उल्टी जैसा लग रहा है"),
+    ('hi', "मेरी माँ को सीने में दर्द हो रहा है, सांस लेने में तकलीफ है"),
+    ('hi', "खांसी और गले में खराश कब तक रहती है?"),
+    ('hi', "क्या रोज़ सुबह टहलना सेहत के लिए अच्छा है?"),
+    ('bn', "আমার দুই দিন ধরে জ্বর আর মাথা ব্যথা"),
+    ('bn', "পেটে ব্যথা এবং বমি বমি ভাব হচ্ছে"),
+    ('ta', "எனக்கு இரண்டு நாட்களாக காய்ச்சல் மற்றும் தலைவலி"),
+    ('ta', "எனக்கு இருமல் மற்றும் தொண்டை வலி உள்ளது"),
+    ('te', "నాకు జ్వరం మరియు తలనొప్పి ఉంది"),
+    ('te', "కడుపు నొప్పి మరియు వికారంగా ఉంది"),
+    ('mr', "मला ताप आणि डोकेदुखी आहे"),
+    ('gu', "મને તાવ અને માથાનો દુખાવો છે"),
+    ('kn', "ನನಗೆ ಜ್ವರ ಮತ್ತು ತಲೆನೋವು ಇದೆ"),
+    ('ml', "എനിക്ക് പനിയും തലവേദനയും ഉണ്ട്"),
+    ('pa', "ਮੈਨੂੰ ਬੁਖਾਰ ਅਤੇ ਸਿਰ ਦਰਦ ਹੈ"),
+    ('or', "ମୋର ଜ୍ୱର ଏବଂ ମୁଣ୍ଡବିନ୍ଧା ହେଉଛି"),
+    ('en', "Can I take paracetamol with a cold?")
+]
+
+# Metrics compared against a baseline: whether a lower value is better, and the
+# requests needed before a change counts as a regression rather than noise
+COMPARED_METRICS = {
+    'throughput_rps': (False, 0),
+    'p50_ms': (True, 0),
+    'p95_ms': (True, 100),
+    'p99_ms': (True, 500)
+}
+
+def speech_wav(transcript: str, seconds: float, sample_rate: int = 16000) -> bytes:
+    """
+    A silent 16-bit mono WAV followed by the transcript the mock should
+    'recognize'. It is already 16 kHz mono and has no speech to trim, so
+    audio preprocessing uploads it untouched, marker included.
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * int(seconds * sample_rate))
+    return buffer.getvalue() + TRANSCRIPT_MARKER + transcript.encode('utf-8') + b'\x00'
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+def summarize(latencies, statuses: Counter, elapsed: float, upstream_calls: int) -> dict:
+    latencies = sorted(latencies)
+    requests = len(latencies)
+    return {
+        'requests': requests,
+        'errors': sum(count for status, count in statuses.items() if status != 200),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+        'throughput_rps': round(requests / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 1),
+        'p95_ms': round(percentile(latencies, 0.95), 1),
+        'p99_ms': round(percentile(latencies, 0.99), 1),
+        'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+        'upstream_calls_per_request': round(upstream_calls / requests, 2) if requests else 0.0
+    }
+
+class LoadGenerator:
+    """Closed-loop clients: each sends its next request as soon as the previous one completes"""
+    
+    def __init__(self, target: str, mock_url: str = None, concurrency: int = 8, unique_ratio: float = 0.5,
+                 audio_seconds: float = 4.0, seed: int = 0):
+        self.target = target.rstrip('/')
+        self.mock_url = mock_url
+        self.concurrency = concurrency
+        self.unique_ratio = unique_ratio
+        self.audio_seconds = audio_seconds
+        self.random = random.Random(seed)
+        self._unique = itertools.count()
+    
+    def _query(self, index: int):
+        language, text = QUERIES[index % len(QUERIES)]
+        # A share of queries are new so caches see a realistic mix of hits and misses
+        if self.random.random() < self.unique_ratio:
+            text = f"{text} ({next(self._unique)})"
+        return language, text
+    
+    async def _consult(self, session: aiohttp.ClientSession, language: str, text: str) -> int:
+        async with session.post(f"{self.target}/api/consult", json={'query': text, 'language': language}) as response:
+            await response.read()
+            return response.status
+    
+    async def _audio_consult(self, session: aiohttp.ClientSession, language: str, text: str) -> int:
+        form = aiohttp.FormData()
+        form.add_field('audio', speech_wav(text, self.audio_seconds), filename='query.wav', content_type='audio/wav')
+        async with session.post(f"{self.target}/api/audio-consult", data=form) as response:
+            await response.read()
+            return response.status
+    
+    async def _upstream_calls(self, session: aiohttp.ClientSession) -> int:
+        if not self.mock_url:
+            return 0
+        async with session.get(f"{self.mock_url}/__stats") as response:
+            return sum((await response.json())['calls'].values())
+    
+    async def run(self, scenario: str, duration: float, warmup: float = 0.0) -> dict:
+        send = {'consult': self._consult, 'audio-consult': self._audio_consult}[scenario]
+        timeout = aiohttp.ClientTimeout(total=120)
+        connector = aiohttp.TCPConnector(limit=self.concurrency * 2)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            if warmup:
+                await self._drive(session, send, warmup)
+            calls_before = await self._upstream_calls(session)
+            started = time.perf_counter()
+            latencies, statuses = await self._drive(session, send, duration)
+            elapsed = time.perf_counter() - started
+            upstream_calls = await self._upstream_calls(session) - calls_before
+        return summarize(latencies, statuses, elapsed, upstream_calls)
+    
+    async def _drive(self, session: aiohttp.ClientSession, send, duration: float):
+        deadline = time.perf_counter() + duration
+        latencies, statuses = [], Counter()
+        
+        async def client(offset: int):
+            for index in itertools.count(offset, self.concurrency):
+                if time.perf_counter() >= deadline:
+                    return
+                language, text = self._query(index)
+                started = time.perf_counter()
+                try:
+                    status = await send(session, language, text)
+                except (aiohttp.ClientError, asyncio.TimeoutError):
+                    status = 'error'
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] += 1
+                
+        await asyncio.gather(*(client(offset) for offset in range(self.concurrency)))
+        return latencies, statuses
+
+def free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+def wait_until_listening(port: int, process: subprocess.Popen, timeout: float = 30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{' '.join(process.args)} exited with {process.returncode}")
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Nothing listening on port {port} after {timeout}s")
+
+@contextmanager
+def spawned_stack(args):
+    """Run the mock API and the app as subprocesses with cold caches"""
+    workdir = tempfile.mkdtemp(prefix='doctor-bench-')
+    mock_port, app_port = free_port(), free_port()
+    mock_url = f"http://127.0.0.1:{mock_port}"
+    mock_command = [
+        sys.executable, os.path.join(ROOT, 'benchmarks', 'mock_sarvam.py'),
+        '--port', str(mock_port), '--seed', str(args.seed),
+        '--latency-scale', str(args.latency_scale), '--error-rate', str(args.error_rate)
+    ]
+    for spec in args.latency or []:
+        mock_command += ['--latency', spec]
+    env = dict(
+        os.environ,
+        SARVAM_BASE_URL=mock_url,
+        SARVAM_API_KEY=os.environ.get('SARVAM_API_KEY') or 'benchmark',
+        PORT=str(app_port),
+        FLASK_ENV='production',
+        TTS_CACHE_DIR=os.path.join(workdir, 'tts_cache'),
+        TRANSLATION_CACHE_PATH=''
+    )
+    
+    log_path = os.path.join(workdir, 'app.log')
+    with open(log_path, 'wb') as log:
+        processes = [
+            subprocess.Popen(mock_command, stdout=log, stderr=subprocess.STDOUT),
+            subprocess.Popen([sys.executable, 'app.py'], cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        ]
+        try:
+            wait_until_listening(mock_port, processes[0])
+            wait_until_listening(app_port, processes[1])
+            yield f"http://127.0.0.1:{app_port}", mock_url
+        except RuntimeError:
+            print(f"❌ Could not start the benchmark stack; see {log_path}")
+            raise
+        finally:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.wait(timeout=10)
+
+def compare(results: dict, baseline: dict, max_regression: float) -> list:
+    """Print each compared metric against the baseline and return the regressions"""
+    regressions = []
+    settings = ('concurrency', 'duration', 'unique_ratio', 'audio_seconds', 'latency', 'latency_scale', 'error_rate')
+    differing = [key for key in settings if results['meta'].get(key) != baseline.get('meta', {}).get(key)]
+    if differing:
+        print(f"\n⚠️  Run settings differ from the baseline ({', '.join(differing)}); results are not comparable")
+    print(f"\n{'scenario':<15} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for scenario, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(scenario)
+        if not previous:
+            continue
+        for metric, (lower_is_better, min_requests) in COMPARED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > max_regression if lower_is_better else change < -max_regression
+            if worse and min(current['requests'], previous['requests']) < min_requests:
+                worse = False
+                flag = '  (too few requests to judge)'
+            else:
+                flag = '  ⚠️' if worse else ''
+            print(f"{scenario:<15} {metric:<16} {before:>10} {after:>10} {change:>+7.1%}{flag}")
+            if worse:
+                regressions.append(f"{scenario} {metric}: {before} -> {after}")
+    return regressions
+
+def print_results(results: dict):
+    print(f"\n{'scenario':<15} {'requests':>8} {'errors':>6} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'upstream/req':>12}")
+    for scenario, stats in results['scenarios'].items():
+        print(f"{scenario:<15} {stats['requests']:>8} {stats['errors']:>6} {stats['throughput_rps']:>7} "
+              f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} {stats['upstream_calls_per_request']:>12}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target', help='URL of a running app (default: spawn the app and the mock API)')
+    parser.add_argument('--mock-url', help='URL of the mock API behind --target, for upstream call counts')
+    parser.add_argument('--scenarios', nargs='+', default=['consult', 'audio-consult'],
+                        choices=['consult', 'audio-consult'])
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=15, help='seconds measured per scenario')
+    parser.add_argument('--warmup', type=float, default=2, help='seconds run before measuring')
+    parser.add_argument('--unique-ratio', type=float, default=0.5, help='share of queries that miss the caches')
+    parser.add_argument('--audio-seconds', type=float, default=4.0, help='length of uploaded audio')
+    parser.add_argument('--latency', action='append', metavar='ENDPOINT=MEDIAN_MS[:SIGMA]',
+                        help='mock latency override (repeatable)')
+    parser.add_argument('--latency-scale', type=float, default=1.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='compare against a saved baseline and fail on regressions')
+    parser.add_argument('--save-baseline', metavar='PATH', help='write results as the new baseline')
+    parser.add_argument('--max-regression', type=float, default=0.15,
+                        help='allowed relative worsening before a metric counts as a regression')
+    args = parser.parse_args()
+    
+    results = {
+        'meta': {
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+            'unique_ratio': args.unique_ratio,
+            'audio_seconds': args.audio_seconds,
+            'latency': args.latency or [],
+            'latency_scale': args.latency_scale,
+            'error_rate': args.error_rate,
+            'seed': args.seed,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'scenarios': {}
+    }
+    
+    def run_all(target, mock_url):
+        generator = LoadGenerator(target, mock_url, args.concurrency, args.unique_ratio, args.audio_seconds, args.seed)
+        for scenario in args.scenarios:
+            print(f"🏃 {scenario}: {args.concurrency} clients for {args.duration:g}s...")
+            results['scenarios'][scenario] = asyncio.run(generator.run(scenario, args.duration, args.warmup))
+            
+    if args.target:
+        run_all(args.target, args.mock_url)
+    else:
+        with spawned_stack(args) as (target, mock_url):
+            run_all(target, mock_url)
+            
+    print_results(results)
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+                output.write('\n')
+            print(f"📝 Wrote {path}")
+            
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regressions beyond {args.max_regression:.0%}")
+            return 1
+        print("\n✅ No regressions against the baseline")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
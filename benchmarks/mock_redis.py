@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Redis, for offline session benchmarks and tests
+Speaks enough of the RESP protocol for the session store: PING, GET, SET
+(with EX/PX), DEL and EXPIRE, with keys expiring like the real server.
+An optional per-command latency emulates a Redis across the network.
+
+    python benchmarks/mock_redis.py --port 6390 --latency-ms 0.5
+"""
+
+import argparse
+import asyncio
+import time
+
+class MockRedis:
+    """Key-value store and RESP connection handler"""
+    
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency = latency_ms / 1000
+        self.data = {}  # key -> (value, expires_at or None)
+        self.commands = 0
+    
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                self.commands += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                writer.write(self.execute(command))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    def execute(self, command: list) -> bytes:
+        name = command[0].upper() if command else b''
+        args = command[1:]
+        if name == b'PING':
+            return b'+PONG\r\n'
+        if name in (b'CLIENT', b'SELECT'):
+            return b'+OK\r\n'
+        if name == b'GET' and len(args) == 1:
+            value = self._get(args[0])
+            return b'$-1\r\n' if value is None else b'$%d\r\n%s\r\n' % (len(value), value)
+        if name == b'SET' and len(args) >= 2:
+            expires_at = None
+            options = [option.upper() for option in args[2:]]
+            for unit, scale in ((b'EX', 1.0), (b'PX', 0.001)):
+                if unit in options:
+                    expires_at = time.monotonic() + int(args[2 + options.index(unit) + 1]) * scale
+            self.data[args[0]] = (args[1], expires_at)
+            return b'+OK\r\n'
+        if name == b'DEL':
+            removed = sum(1 for key in args if self.data.pop(key, None) is not None)
+            return b':%d\r\n' % removed
+        if name == b'EXPIRE' and len(args) == 2:
+            value = self._get(args[0])
+            if value is None:
+                return b':0\r\n'
+            self.data[args[0]] = (value, time.monotonic() + int(args[1]))
+            return b':1\r\n'
+        return b'-ERR unknown command\r\n'
+    
+    def _get(self, key: bytes):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            del self.data[key]
+            return None
+        return entry[0]
+
+async def read_command(reader: asyncio.StreamReader):
+    """One command as a list of byte strings, or None at end of stream"""
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.split()  # inline command
+    command = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header[1:])
+        command.append((await reader.readexactly(length + 2))[:-2])
+    return command
+
+async def serve(port: int, latency_ms: float = 0.0, host: str = '127.0.0.1'):
+    server = await asyncio.start_server(MockRedis(latency_ms).handle, host, port)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=6390)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='delay before answering each command')
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.latency_ms))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Sarvam AI API, for offline benchmarks
+Emulates /detect-language, /translate, /speech-to-text, /text-to-speech and
+/speech-to-text-translate with lognormal latency per endpoint and an
+optional error rate. Point the app at it with SARVAM_BASE_URL.
+
+    python benchmarks/mock_sarvam.py --port 8765 --latency translate=250:0.4 --error-rate 0.01
+
+With --stt-realtime-factor, speech endpoints also take that many seconds
+per second of uploaded WAV audio, as real recognition does.
+"""
+
+import argparse
+import asyncio
+import base64
+import io
+import json
+import math
+import random
+import wave
+from collections import Counter
+
+from aiohttp import web
+
+# Median latency (ms) and lognormal sigma per endpoint, roughly what the hosted API shows
+DEFAULT_LATENCY = {
+    'detect-language': (80, 0.3),
+    'translate': (250, 0.4),
+    'speech-to-text': (600, 0.35),
+    'text-to-speech': (700, 0.35),
+    'speech-to-text-translate': (800, 0.35)
+}
+
+# Audio sent by the load generator carries its transcript after this marker
+TRANSCRIPT_MARKER = b'SARVAM-BENCH-TRANSCRIPT:'
+DEFAULT_TRANSCRIPT = 'I have had a headache since yesterday'
+
+# Unicode block of each script and the three-letter code /detect-language answers with
+SCRIPTS = [
+    (0x0900, 0x097F, 'hin'),
+    (0x0980, 0x09FF, 'ben'),
+    (0x0A00, 0x0A7F, 'pan'),
+    (0x0A80, 0x0AFF, 'guj'),
+    (0x0B00, 0x0B7F, 'ori'),
+    (0x0B80, 0x0BFF, 'tam'),
+    (0x0C00, 0x0C7F, 'tel'),
+    (0x0C80, 0x0CFF, 'kan'),
+    (0x0D00, 0x0D7F, 'mal')
+]
+
+# Synthesized speech is silence whose length follows the text, at the app's 8 kHz sample rate
+TTS_SAMPLE_RATE = 8000
+TTS_SECONDS_PER_CHAR = 0.065
+
+def detect_script(text: str) -> str:
+    counts = Counter()
+    for char in text:
+        code = ord(char)
+        for first, last, language in SCRIPTS:
+            if first <= code <= last:
+                counts[language] += 1
+                break
+        else:
+            if char.isalpha():
+                counts['eng'] += 1
+    return counts.most_common(1)[0][0] if counts else 'eng'
+
+def silent_wav(seconds: float, sample_rate: int = TTS_SAMPLE_RATE) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(b'\x00\x00' * int(seconds * sample_rate))
+    return buffer.getvalue()
+
+def wav_seconds(body: bytes) -> float:
+    """Duration of the WAV file inside a multipart upload, or 0 if there is none"""
+    start = body.find(b'RIFF')
+    if start < 0:
+        return 0.0
+    try:
+        with wave.open(io.BytesIO(body[start:]), 'rb') as wav:
+            return wav.getnframes() / wav.getframerate()
+    except (wave.Error, EOFError):
+        return 0.0
+
+def embedded_transcript(body: bytes) -> str:
+    start = body.find(TRANSCRIPT_MARKER)
+    if start < 0:
+        return DEFAULT_TRANSCRIPT
+    start += len(TRANSCRIPT_MARKER)
+    end = body.find(b'\x00', start)
+    return body[start:end if end >= 0 else len(body)].decode('utf-8', errors='ignore') or DEFAULT_TRANSCRIPT
+
+class MockSarvam:
+    """Request handlers plus per-endpoint call counters exposed at GET /__stats"""
+    
+    def __init__(self, latency=None, latency_scale: float = 1.0, error_rate: float = 0.0, seed: int = None,
+                 stt_realtime_factor: float = 0.0):
+        self.latency = dict(DEFAULT_LATENCY, **(latency or {}))
+        self.latency_scale = latency_scale
+        self.error_rate = error_rate
+        self.stt_realtime_factor = stt_realtime_factor
+        self.random = random.Random(seed)
+        self.calls = Counter()
+        self.errors = Counter()
+    
+    async def _delay(self, endpoint: str):
+        median, sigma = self.latency[endpoint]
+        await asyncio.sleep(median * self.latency_scale * math.exp(self.random.gauss(0, sigma)) / 1000)
+    
+    def handler(self, endpoint: str, respond):
+        async def handle(request: web.Request) -> web.Response:
+            body = await request.read()
+            self.calls[endpoint] += 1
+            await self._delay(endpoint)
+            if self.stt_realtime_factor and endpoint.startswith('speech-to-text'):
+                await asyncio.sleep(self.stt_realtime_factor * wav_seconds(body))
+            if self.random.random() < self.error_rate:
+                self.errors[endpoint] += 1
+                return web.json_response({'error': 'Service temporarily unavailable'}, status=503)
+            return web.json_response(respond(body), dumps=lambda data: json.dumps(data, ensure_ascii=False))
+        return handle
+    
+    @staticmethod
+    def detect_language(body: bytes):
+        return {'language_code': detect_script(json.loads(body)['input'])}
+    
+    @staticmethod
+    def translate(body: bytes):
+        payload = json.loads(body)
+        target = payload['target_language_code'].split('-')[0]
+        # Line structure is kept so packed batch translations can be split again
+        return {'translated_text': '\n'.join(f"[{target}] {line}" for line in payload['input'].split('\n'))}
+    
+    @staticmethod
+    def speech_to_text(body: bytes):
+        return {'transcript': embedded_transcript(body)}
+    
+    @staticmethod
+    def speech_to_text_translate(body: bytes):
+        return {'translated_text': f"[en] {embedded_transcript(body)}"}
+    
+    @staticmethod
+    def text_to_speech(body: bytes):
+        text = json.loads(body)['inputs'][0]
+        audio = silent_wav(len(text) * TTS_SECONDS_PER_CHAR)
+        return {'audios': [base64.b64encode(audio).decode('ascii')]}
+    
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({'calls': dict(self.calls), 'errors': dict(self.errors)})
+    
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post('/detect-language', self.handler('detect-language', self.detect_language))
+        app.router.add_post('/translate', self.handler('translate', self.translate))
+        app.router.add_post('/speech-to-text', self.handler('speech-to-text', self.speech_to_text))
+        app.router.add_post('/text-to-speech', self.handler('text-to-speech', self.text_to_speech))
+        app.router.add_post('/speech-to-text-translate',
+                            self.handler('speech-to-text-translate', self.speech_to_text_translate))
+        app.router.add_get('/__stats', self.stats)
+        return app
+
+def parse_latency(specs) -> dict:
+    """Parse ENDPOINT=MEDIAN_MS[:SIGMA] overrides"""
+    latency = {}
+    for spec in specs or []:
+        endpoint, _, value = spec.partition('=')
+        if endpoint not in DEFAULT_LATENCY or not value:
+            raise ValueError(f"expected ENDPOINT=MEDIAN_MS[:SIGMA] with ENDPOINT in {', '.join(DEFAULT_LATENCY)}")
+        median, _, sigma = value.partition(':')
+        latency[endpoint] = (float(median), float(sigma) if sigma else DEFAULT_LATENCY[endpoint][1])
+    return latency
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', action='append', metavar='ENDPOINT=MEDIAN_MS[:SIGMA]',
+                        help='override the latency distribution of one endpoint (repeatable)')
+    parser.add_argument('--latency-scale', type=float, default=1.0, help='multiply every latency, e.g. 0.1')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of calls answered with 503')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--stt-realtime-factor', type=float, default=0.0,
+                        help='extra STT seconds per second of uploaded audio, e.g. 0.1')
+    args = parser.parse_args()
+    
+    try:
+        latency = parse_latency(args.latency)
+    except ValueError as e:
+        parser.error(str(e))
+    
+    mock = MockSarvam(latency, args.latency_scale, args.error_rate, args.seed, args.stt_realtime_factor)
+    web.run_app(mock.app(), host=args.host, port=args.port, print=None, access_log=None)
+
+if __name__ == '__main__':
+    main()
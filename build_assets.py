@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Build step for precomputed assets served by the Multilingual AI Doctor Agent
+
+    python build_assets.py corpus      # template responses in every supported language
+    python build_assets.py audio-bank  # pre-synthesized speech for those responses
+"""
+
+import argparse
+import sys
+from config import Config
+from cache import TranslationCache, AudioCache
+from medical_ai import MedicalAI
+from response_corpus import ResponseCorpus, build_corpus
+from audio_bank import AudioBank, bank_texts, build_audio_bank
+from sarvam_client import SarvamAIClient, tts_cache_key
+
+def corpus_languages():
+    """Supported languages the MedicalAI templates do not cover"""
+    return [language for language in Config.SUPPORTED_LANGUAGES if language not in MedicalAI.RESPONSE_LANGUAGES]
+
+def build_response_corpus(args):
+    """Render and translate the template responses, skipping the build when up to date"""
+    medical_ai = MedicalAI(corpus_path='')
+    fingerprint = medical_ai.corpus_fingerprint()
+    languages = args.languages or corpus_languages()
+    
+    # Languages already in an up-to-date corpus are kept; only the rest are translated
+    existing = ResponseCorpus.load(args.output, fingerprint)
+    if existing and not args.force:
+        built = existing.stats()['languages']
+        languages = [language for language in languages if language not in built]
+        if not languages:
+            print(f"✅ {args.output} is up to date ({fingerprint[:12]})")
+            return True
+        
+    if not Config.SARVAM_API_KEY:
+        print("❌ SARVAM_API_KEY is required to translate the corpus")
+        return False
+        
+    # Reuse the translation cache so an unchanged paragraph is never translated twice
+    translation_cache = TranslationCache(db_path=Config.TRANSLATION_CACHE_PATH or None)
+    client = SarvamAIClient(Config.SARVAM_API_KEY, translation_cache=translation_cache)
+    try:
+        print(f"📋 Translating {len(medical_ai.deterministic_responses('en'))} responses into {', '.join(languages)}...")
+        corpus = build_corpus(
+            medical_ai, lambda texts, target, source: client.translate_batch(texts, target, source, keep_source=False),
+            languages, existing
+        )
+    except ValueError as e:
+        print(f"❌ Corpus build failed: {e}")
+        return False
+    finally:
+        client.close()
+        
+    corpus.save(args.output)
+    print(f"✅ Wrote {args.output} ({fingerprint[:12]}, {len(corpus.stats()['languages'])} languages)")
+    return True
+
+def build_speech_bank(args):
+    """Synthesize every template response and its streaming chunks into the audio bank"""
+    medical_ai = MedicalAI(corpus_path=args.corpus)
+    languages = args.languages or list(Config.SUPPORTED_LANGUAGES)
+    missing = [language for language in languages if not medical_ai.localized_deterministic_responses(language)]
+    if missing:
+        print(f"⚠️  No responses for {', '.join(missing)}; run: python build_assets.py corpus")
+    
+    texts = bank_texts(medical_ai, languages, Config.TTS_STREAM_CHUNK_CHARS, Config.TTS_STREAM_FIRST_CHUNK_CHARS)
+    existing = AudioBank.load(args.output) if not args.force else None
+    if existing and set(existing.keys()) == {tts_cache_key(*text) for text in texts}:
+        print(f"✅ {args.output} is up to date ({len(existing)} clips)")
+        return True
+    
+    if not Config.SARVAM_API_KEY:
+        print("❌ SARVAM_API_KEY is required to synthesize the audio bank")
+        return False
+    
+    # Clips already in the bank or the TTS cache are not synthesized again
+    tts_cache = AudioCache(Config.TTS_CACHE_DIR, max_bytes=Config.TTS_CACHE_MAX_BYTES)
+    client = SarvamAIClient(Config.SARVAM_API_KEY, tts_cache=tts_cache)
+    try:
+        print(f"🔊 Rendering {len(texts)} clips in {', '.join(languages)}...")
+        synthesized = build_audio_bank(args.output, texts, client.text_to_speech, tts_cache_key, existing)
+    except ValueError as e:
+        print(f"❌ Audio bank build failed: {e}")
+        return False
+    finally:
+        client.close()
+        if existing:
+            existing.close()
+    
+    print(f"✅ Wrote {args.output} ({len(texts)} clips, {synthesized} newly synthesized)")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    corpus = commands.add_parser('corpus', help='precompute template responses for every supported language')
+    corpus.add_argument('--output', default=Config.RESPONSE_CORPUS_PATH)
+    corpus.add_argument('--languages', nargs='+', choices=corpus_languages())
+    corpus.add_argument('--force', action='store_true', help='rebuild even if the artifact is up to date')
+    corpus.set_defaults(build=build_response_corpus)
+    
+    bank = commands.add_parser('audio-bank', help='pre-synthesize speech for every template response')
+    bank.add_argument('--output', default=Config.AUDIO_BANK_PATH)
+    bank.add_argument('--corpus', default=Config.RESPONSE_CORPUS_PATH, help='response corpus to render')
+    bank.add_argument('--languages', nargs='+', choices=list(Config.SUPPORTED_LANGUAGES))
+    bank.add_argument('--force', action='store_true', help='resynthesize every clip')
+    bank.set_defaults(build=build_speech_bank)
+    
+    args = parser.parse_args()
+    return 0 if args.build(args) else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
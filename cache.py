@@ -0,0 +1,307 @@
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+class TranslationCache:
+    """
+    Thread-safe LRU cache for translations, bounded by entry count and by
+    bytes, with per-entry TTL and optional SQLite persistence so a restart
+    starts warm. Writes to SQLite are queued and committed in batches by a
+    background thread every flush_interval seconds, never on the request path.
+    """
+    
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 32 * 1024 * 1024,
+                 ttl: float = 7 * 24 * 3600, db_path: Optional[str] = None, flush_interval: float = 1.0):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        
+        self._entries = OrderedDict()  # key -> (value, expires_at, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._db = None
+        self._db_lock = threading.Lock()  # taken before _lock, never after it
+        self._pending = []  # SQLite writes not yet committed, in order
+        self._writer = None
+        self._stopped = threading.Event()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        if db_path:
+            self._open_db()
+    
+    @staticmethod
+    def make_key(text: str, source_language: str, target_language: str, model: str, mode: str) -> str:
+        """Build a cache key from a hash of the text and the translation parameters"""
+        text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()
+        return f"{text_hash}|{source_language}|{target_language}|{model}|{mode}"
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached translation, or None on a miss or expiry"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+                
+            value, expires_at, _ = entry
+            if expires_at <= time.time():
+                self._remove(key)
+                self.misses += 1
+                return None
+                
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: str, value: str):
+        """Store a translation, evicting least recently used entries past the bounds"""
+        expires_at = time.time() + self.ttl
+        size = len(key) + len(value.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+            
+        with self._lock:
+            self._insert(key, value, expires_at, size)
+            self._persist(("INSERT OR REPLACE INTO translations (key, value, expires_at) VALUES (?, ?, ?)",
+                           (key, value, expires_at)))
+    
+    def clear(self):
+        """Drop every entry, including persisted ones"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._persist(("DELETE FROM translations", ()))
+    
+    def flush(self) -> int:
+        """Commit queued SQLite writes in one transaction; returns how many were written"""
+        with self._db_lock:
+            with self._lock:
+                writes, self._pending = self._pending, []
+            if not writes or self._db is None:
+                return 0
+            try:
+                for statement, parameters in writes:
+                    self._db.execute(statement, parameters)
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Translation cache persistence error: {e}")
+                return 0
+            return len(writes)
+    
+    def close(self):
+        """Stop the writer thread after committing what is queued"""
+        self._stopped.set()
+        self.flush()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'persistent': self._db is not None
+            }
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def _insert(self, key: str, value: str, expires_at: float, size: int):
+        if key in self._entries:
+            self._bytes -= self._entries.pop(key)[2]
+        self._entries[key] = (value, expires_at, size)
+        self._bytes += size
+        
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            evicted_key = next(iter(self._entries))
+            self._remove(evicted_key)
+            self.evictions += 1
+    
+    def _remove(self, key: str):
+        self._bytes -= self._entries.pop(key)[2]
+        self._persist(("DELETE FROM translations WHERE key = ?", (key,)))
+    
+    def _persist(self, write: tuple):
+        """Queue a SQLite write; called with _lock held"""
+        if self._db is None:
+            return
+        self._pending.append(write)
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_loop, name='translation-cache-writer', daemon=True)
+            self._writer.start()
+    
+    def _write_loop(self):
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+    
+    def _open_db(self):
+        """Open the SQLite file and load unexpired entries into memory"""
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        now = time.time()
+        self._db.execute("DELETE FROM translations WHERE expires_at <= ?", (now,))
+        self._db.commit()
+        
+        rows = self._db.execute(
+            "SELECT key, value, expires_at FROM translations ORDER BY expires_at"
+        ).fetchall()
+        with self._lock:
+            for key, value, expires_at in rows:
+                self._insert(key, value, expires_at, len(key) + len(value.encode('utf-8')))
+        # Queued writes are committed when the interpreter exits
+        atexit.register(self.flush)
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized audio stored as one file per key
+    in a directory capped by total size, with least recently used files
+    evicted first. Recency survives restarts through file mtimes.
+    """
+    
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024, suffix: str = '.wav'):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+        
+        self._entries = OrderedDict()  # key -> size
+        self._bytes = 0
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+    
+    @staticmethod
+    def make_key(text: str, language_code: str, voice: Dict[str, Any]) -> str:
+        """Hash the text, target language and every voice parameter into a key"""
+        material = json.dumps(
+            {'text': text, 'target_language_code': language_code, 'voice': voice},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    @staticmethod
+    def is_valid_key(key: str) -> bool:
+        return len(key) == 64 and all(c in '0123456789abcdef' for c in key)
+    
+    def path_for(self, key: str) -> Optional[str]:
+        """Return the file holding the audio for key, marking it recently used"""
+        if not self.is_valid_key(key):
+            return None
+            
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+        return path
+    
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached audio bytes, or None on a miss"""
+        path = self.path_for(key)
+        if path is None:
+            return None
+        try:
+            with open(path, 'rb') as audio_file:
+                return audio_file.read()
+        except OSError:
+            with self._lock:
+                self._forget(key)
+            return None
+    
+    def set(self, key: str, audio: bytes):
+        """Store audio atomically and evict old files past the size cap"""
+        if not self.is_valid_key(key) or len(audio) > self.max_bytes:
+            return
+            
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as audio_file:
+            audio_file.write(audio)
+        os.replace(temp_path, path)
+        
+        with self._lock:
+            self._forget(key)
+            self._entries[key] = len(audio)
+            self._bytes += len(audio)
+            self._evict()
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+    
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.suffix)
+    
+    def _forget(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+    
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(self._path(key))
+            except OSError:
+                pass
+    
+    def _scan(self):
+        """Index files already on disk, oldest first"""
+        found = []
+        for name in os.listdir(self.directory):
+            key = name[:-len(self.suffix)]
+            if not name.endswith(self.suffix) or not self.is_valid_key(key):
+                continue
+            stat = os.stat(os.path.join(self.directory, name))
+            found.append((stat.st_mtime, key, stat.st_size))
+            
+        with self._lock:
+            for _, key, size in sorted(found):
+                self._entries[key] = size
+                self._bytes += size
+            self._evict()
@@ -0,0 +1,148 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List
+
+class _Call:
+    """An in-flight call that other threads can wait on"""
+    
+    __slots__ = ('done', 'result', 'error')
+    
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Thread-safe single-flight: concurrent calls with the same key share the
+    result of the one that got there first instead of each calling upstream
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.coalesced = 0
+    
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+            else:
+                self.coalesced += 1
+                
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+            
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return _flight_stats(self.calls, self.coalesced)
+
+class AsyncSingleFlight:
+    """
+    Single-flight for coroutines on one event loop. The shared call runs as
+    a task, so a caller that is cancelled does not cancel it for the others.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda finished: self._forget(key, finished))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+    
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+    
+    def stats(self) -> Dict[str, Any]:
+        return _flight_stats(self.calls, self.coalesced)
+
+class MicroBatcher:
+    """
+    Collects items submitted under the same key within a short window and
+    hands them to dispatch together, so concurrent distinct requests can
+    share upstream round trips. dispatch(key, items) returns one result per
+    item, in order.
+    """
+    
+    def __init__(self, dispatch: Callable[[Hashable, List[Any]], Awaitable[List[Any]]],
+                 window: float = 0.005, max_items: int = 32):
+        self.dispatch = dispatch
+        self.window = window
+        self.max_items = max_items
+        self._pending: Dict[Hashable, list] = {}  # key -> [(item, future)]
+        self.items = 0
+        self.batches = 0
+    
+    async def submit(self, key: Hashable, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = []
+            loop.call_later(self.window, self._flush, key, batch)
+        batch.append((item, future))
+        self.items += 1
+        if len(batch) >= self.max_items:
+            self._flush(key, batch)
+        return await future
+    
+    def _flush(self, key: Hashable, batch: list):
+        # The window timer may fire after the batch was already flushed for size
+        if self._pending.get(key) is batch:
+            del self._pending[key]
+            self.batches += 1
+            asyncio.ensure_future(self._run(key, batch))
+    
+    async def _run(self, key: Hashable, batch: list):
+        try:
+            results = await self.dispatch(key, [item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'items': self.items,
+            'batches': self.batches,
+            'mean_batch_size': round(self.items / self.batches, 2) if self.batches else 0.0
+        }
+
+def _flight_stats(calls: int, coalesced: int) -> Dict[str, Any]:
+    return {
+        'calls': calls,
+        'coalesced': coalesced,
+        'coalesced_ratio': round(coalesced / calls, 4) if calls else 0.0
+    }
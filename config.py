@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -7,9 +8,130 @@ class Config:
     """Configuration class for the multilingual AI doctor agent"""
     
     SARVAM_API_KEY = os.getenv('SARVAM_API_KEY')
+    # Point at a local stand-in such as benchmarks/mock_sarvam.py for offline runs
+    SARVAM_BASE_URL = os.getenv('SARVAM_BASE_URL', 'https://api.sarvam.ai')
     PORT = int(os.getenv('PORT', 5001))
     FLASK_ENV = os.getenv('FLASK_ENV', 'development')
     
+    # gunicorn.conf.py: every in-flight request holds one worker thread, so
+    # workers x threads caps the consultations served at once
+    GUNICORN_WORKERS = int(os.getenv('GUNICORN_WORKERS', 2))
+    GUNICORN_THREADS = int(os.getenv('GUNICORN_THREADS', 64))
+    
+    # Sarvam AI HTTP connection pool settings
+    SARVAM_POOL_SIZE = int(os.getenv('SARVAM_POOL_SIZE', 20))
+    SARVAM_MAX_RETRIES = int(os.getenv('SARVAM_MAX_RETRIES', 3))
+    SARVAM_RETRY_BACKOFF = float(os.getenv('SARVAM_RETRY_BACKOFF', 0.3))
+    SARVAM_CONNECT_TIMEOUT = float(os.getenv('SARVAM_CONNECT_TIMEOUT', 3.05))
+    
+    # Read timeouts (seconds) per Sarvam AI endpoint
+    SARVAM_READ_TIMEOUTS = {
+        'detect-language': float(os.getenv('SARVAM_DETECT_TIMEOUT', 5)),
+        'translate': float(os.getenv('SARVAM_TRANSLATE_TIMEOUT', 15)),
+        'speech-to-text': float(os.getenv('SARVAM_STT_TIMEOUT', 30)),
+        'text-to-speech': float(os.getenv('SARVAM_TTS_TIMEOUT', 30)),
+        'speech-to-text-translate': float(os.getenv('SARVAM_STT_TRANSLATE_TIMEOUT', 30))
+    }
+    
+    # Largest audio upload accepted, enforced while the upload streams through
+    MAX_AUDIO_UPLOAD_BYTES = int(os.getenv('MAX_AUDIO_UPLOAD_BYTES', 10 * 1024 * 1024))
+    
+    # Decode uploads to mono PCM and trim leading/trailing silence before STT;
+    # needs NumPy, plus ffmpeg (FFMPEG_PATH, on PATH or from imageio-ffmpeg) for anything but WAV
+    AUDIO_PREPROCESS = os.getenv('AUDIO_PREPROCESS', 'true').lower() == 'true'
+    AUDIO_PREPROCESS_SAMPLE_RATE = int(os.getenv('AUDIO_PREPROCESS_SAMPLE_RATE', 16000))
+    AUDIO_TRIM_SILENCE = os.getenv('AUDIO_TRIM_SILENCE', 'true').lower() == 'true'
+    AUDIO_VAD_THRESHOLD_DB = float(os.getenv('AUDIO_VAD_THRESHOLD_DB', -50))
+    AUDIO_VAD_PADDING_MS = int(os.getenv('AUDIO_VAD_PADDING_MS', 200))
+    FFMPEG_PATH = os.getenv('FFMPEG_PATH', '')
+    
+    # Decoded recordings longer than this are split at pauses into overlapping
+    # segments that are transcribed concurrently and stitched back together
+    LONG_AUDIO_SEGMENT_SECONDS = float(os.getenv('LONG_AUDIO_SEGMENT_SECONDS', 30))
+    LONG_AUDIO_OVERLAP_SECONDS = float(os.getenv('LONG_AUDIO_OVERLAP_SECONDS', 1.0))
+    STT_SEGMENT_CONCURRENCY = int(os.getenv('STT_SEGMENT_CONCURRENCY', 4))
+    
+    # Voice consultation over a WebSocket (/api/voice/stream, needs flask-sock): audio is
+    # endpointed server-side and each utterance is answered once this much silence follows it
+    VOICE_SAMPLE_RATE = int(os.getenv('VOICE_SAMPLE_RATE', 16000))
+    VOICE_ENDPOINT_SILENCE_MS = int(os.getenv('VOICE_ENDPOINT_SILENCE_MS', 600))
+    VOICE_MIN_SPEECH_MS = int(os.getenv('VOICE_MIN_SPEECH_MS', 200))
+    VOICE_VAD_THRESHOLD_DB = float(os.getenv('VOICE_VAD_THRESHOLD_DB', -45))
+    VOICE_MAX_UTTERANCE_SECONDS = float(os.getenv('VOICE_MAX_UTTERANCE_SECONDS', 30))
+    VOICE_IDLE_TIMEOUT = float(os.getenv('VOICE_IDLE_TIMEOUT', 120))
+    
+    # Conversation sessions keyed by session_id: language, preferred response language,
+    # symptoms and recent turns; SESSION_BACKEND is memory, redis (any Redis-compatible
+    # server at SESSION_REDIS_URL) or none
+    SESSION_BACKEND = os.getenv('SESSION_BACKEND', 'memory').lower()
+    SESSION_REDIS_URL = os.getenv('SESSION_REDIS_URL', 'redis://localhost:6379/0')
+    SESSION_TTL = float(os.getenv('SESSION_TTL', 1800))
+    SESSION_MAX_BYTES = int(os.getenv('SESSION_MAX_BYTES', 8192))
+    SESSION_MAX_TURNS = int(os.getenv('SESSION_MAX_TURNS', 10))
+    SESSION_MEMORY_MAX_SESSIONS = int(os.getenv('SESSION_MEMORY_MAX_SESSIONS', 10000))
+    SESSION_MEMORY_BYTES = int(os.getenv('SESSION_MEMORY_BYTES', 32 * 1024 * 1024))
+    
+    # Share one upstream call between concurrent identical requests, and collect
+    # distinct translations arriving within a few milliseconds into packed requests
+    SINGLE_FLIGHT = os.getenv('SINGLE_FLIGHT', 'true').lower() == 'true'
+    TRANSLATE_BATCH_WINDOW_MS = float(os.getenv('TRANSLATE_BATCH_WINDOW_MS', 5))
+    
+    # Batched translation: upstream input size limit (characters) and parallel requests
+    TRANSLATE_MAX_INPUT_CHARS = int(os.getenv('TRANSLATE_MAX_INPUT_CHARS', 1000))
+    TRANSLATE_BATCH_CONCURRENCY = int(os.getenv('TRANSLATE_BATCH_CONCURRENCY', 4))
+    TRANSLATE_BATCH_MAX_TEXTS = int(os.getenv('TRANSLATE_BATCH_MAX_TEXTS', 1000))
+    
+    # Translation cache (LRU + TTL); set TRANSLATION_CACHE_PATH to persist to SQLite
+    TRANSLATION_CACHE_MAX_ENTRIES = int(os.getenv('TRANSLATION_CACHE_MAX_ENTRIES', 10000))
+    TRANSLATION_CACHE_MAX_BYTES = int(os.getenv('TRANSLATION_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    TRANSLATION_CACHE_TTL = float(os.getenv('TRANSLATION_CACHE_TTL', 7 * 24 * 3600))
+    TRANSLATION_CACHE_PATH = os.getenv('TRANSLATION_CACHE_PATH', '')
+    
+    # Content-addressed TTS audio cache directory and size cap
+    TTS_CACHE_DIR = os.getenv('TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'sarvam_tts_cache'))
+    TTS_CACHE_MAX_BYTES = int(os.getenv('TTS_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+    
+    # Streaming TTS: chunk sizes (characters) and how many chunks are synthesized ahead
+    TTS_STREAM_CHUNK_CHARS = int(os.getenv('TTS_STREAM_CHUNK_CHARS', 300))
+    TTS_STREAM_FIRST_CHUNK_CHARS = int(os.getenv('TTS_STREAM_FIRST_CHUNK_CHARS', 120))
+    TTS_STREAM_CONCURRENCY = int(os.getenv('TTS_STREAM_CONCURRENCY', 3))
+    
+    # Generated audio responses: memory budget, spill-to-disk cap, item cap and expiry
+    AUDIO_STORE_MEMORY_BYTES = int(os.getenv('AUDIO_STORE_MEMORY_BYTES', 64 * 1024 * 1024))
+    AUDIO_STORE_DISK_BYTES = int(os.getenv('AUDIO_STORE_DISK_BYTES', 512 * 1024 * 1024))
+    AUDIO_STORE_MAX_ITEMS = int(os.getenv('AUDIO_STORE_MAX_ITEMS', 2000))
+    AUDIO_STORE_TTL = float(os.getenv('AUDIO_STORE_TTL', 900))
+    AUDIO_STORE_SPILL_DIR = os.getenv('AUDIO_STORE_SPILL_DIR', '')
+    
+    # Precomputed template responses for every supported language (python build_assets.py corpus)
+    RESPONSE_CORPUS_PATH = os.getenv('RESPONSE_CORPUS_PATH', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'assets', 'response_corpus.json.gz'
+    ))
+    
+    # Pre-synthesized audio for the template responses (python build_assets.py audio-bank)
+    AUDIO_BANK_PATH = os.getenv('AUDIO_BANK_PATH', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'assets', 'audio_bank.bin'
+    ))
+    
+    # Per-endpoint circuit breakers: fail fast to the fallbacks while Sarvam AI is erroring or slow
+    CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+    CIRCUIT_WINDOW = int(os.getenv('CIRCUIT_WINDOW', 20))
+    CIRCUIT_MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', 10))
+    CIRCUIT_FAILURE_RATIO = float(os.getenv('CIRCUIT_FAILURE_RATIO', 0.5))
+    CIRCUIT_SLOW_CALL_FRACTION = float(os.getenv('CIRCUIT_SLOW_CALL_FRACTION', 0.8))
+    CIRCUIT_OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', 30))
+    
+    # Hedged detect-language: a second attempt after the observed p95 (or a fixed delay when set)
+    DETECT_HEDGE = os.getenv('DETECT_HEDGE', 'false').lower() == 'true'
+    DETECT_HEDGE_DELAY_MS = float(os.getenv('DETECT_HEDGE_DELAY_MS', 0))
+    
+    # Prometheus-format metrics at /metrics; when disabled instrumentation is a no-op
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    
+    # Offline script-based language detection ahead of the remote detect-language call
+    LOCAL_LANGUAGE_DETECTION = os.getenv('LOCAL_LANGUAGE_DETECTION', 'true').lower() == 'true'
+    LOCAL_DETECT_MIN_CONFIDENCE = float(os.getenv('LOCAL_DETECT_MIN_CONFIDENCE', 0.8))
+    
     # Supported languages mapping
     SUPPORTED_LANGUAGES = {
         'hi': 'hi-IN',  # Hindi
@@ -0,0 +1,24 @@
+"""
+Gunicorn settings for production
+
+    gunicorn -c gunicorn.conf.py app:app
+
+Async views await the shared I/O event loop, but Flask still runs each
+request on a WSGI worker thread that is held until the response (or the
+SSE stream, or the voice WebSocket) is finished. A worker therefore serves
+at most GUNICORN_THREADS requests at once. The threads only wait on the
+I/O loop, so they can far outnumber the CPUs.
+"""
+
+from config import Config
+
+bind = f"0.0.0.0:{Config.PORT}"
+worker_class = 'gthread'  # also needed by the voice WebSocket
+workers = Config.GUNICORN_WORKERS
+threads = Config.GUNICORN_THREADS
+
+def post_worker_init(worker):
+    """Create the Sarvam AI client in each worker; app.py only does this when run directly"""
+    from app import init_sarvam_client
+    if not init_sarvam_client():
+        worker.log.warning("Running without Sarvam AI integration")
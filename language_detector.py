@@ -0,0 +1,144 @@
+import bisect
+import re
+import threading
+from typing import Dict, Optional, Any
+
+# Precomputed (first codepoint, last codepoint, script) table, sorted by start
+SCRIPT_RANGES = [
+    (0x0041, 0x005A, 'latin'),
+    (0x0061, 0x007A, 'latin'),
+    (0x00C0, 0x024F, 'latin'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0980, 0x09FF, 'bengali'),
+    (0x0A00, 0x0A7F, 'gurmukhi'),
+    (0x0A80, 0x0AFF, 'gujarati'),
+    (0x0B00, 0x0B7F, 'odia'),
+    (0x0B80, 0x0BFF, 'tamil'),
+    (0x0C00, 0x0C7F, 'telugu'),
+    (0x0C80, 0x0CFF, 'kannada'),
+    (0x0D00, 0x0D7F, 'malayalam'),
+    (0xA8E0, 0xA8FF, 'devanagari'),
+]
+_RANGE_STARTS = [start for start, _, _ in SCRIPT_RANGES]
+
+# Scripts used by exactly one of Config.SUPPORTED_LANGUAGES
+SCRIPT_LANGUAGES = {
+    'bengali': 'bn',
+    'gurmukhi': 'pa',
+    'gujarati': 'gu',
+    'odia': 'or',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'malayalam': 'ml',
+}
+
+# Common English function words; Romanized Indic text rarely contains them
+ENGLISH_MARKERS = frozenset("""
+a an the i me my we you your he she it they them his her their is am are was were be been
+have has had do does did not no and or but if of to in on at for from with about by as
+this that these those what when where why how which who can could should would will
+feel feeling since after before very much some any there here
+""".split())
+
+_WORD = re.compile(r"[a-z']+")
+
+def script_of(char: str) -> Optional[str]:
+    """Look up the script of a character in the codepoint range table"""
+    codepoint = ord(char)
+    index = bisect.bisect_right(_RANGE_STARTS, codepoint) - 1
+    if index >= 0 and codepoint <= SCRIPT_RANGES[index][1]:
+        return SCRIPT_RANGES[index][2]
+    return None
+
+class ScriptLanguageDetector:
+    """
+    Offline language detector driven by Unicode script. Scripts that map to
+    a single supported language are answered locally; Devanagari (Hindi or
+    Marathi) and Latin text that does not read as English (possibly
+    Romanized Indic) are left to the remote detector.
+    """
+    
+    def __init__(self, min_confidence: float = 0.8, min_letters: int = 2,
+                 min_english_ratio: float = 0.25):
+        self.min_confidence = min_confidence
+        self.min_letters = min_letters
+        self.min_english_ratio = min_english_ratio
+        
+        self._lock = threading.Lock()
+        self.calls_saved = 0
+        self.deferred = 0
+    
+    def detect(self, text: str) -> Optional[str]:
+        """Return a supported language code, or None when the remote API should decide"""
+        language = self._classify(text)
+        with self._lock:
+            if language:
+                self.calls_saved += 1
+            else:
+                self.deferred += 1
+        return language
+    
+    def classify(self, text: str) -> Optional[str]:
+        """What detect would return, not counted in stats; for checking a language already known"""
+        return self._classify(text)
+    
+    def guess(self, text: str) -> Optional[str]:
+        """
+        Most likely language without deferring, for speculative work that is
+        checked against the real detection later: Devanagari reads as Hindi
+        and Latin as English. Not counted in stats.
+        """
+        language = self._classify(text)
+        if language:
+            return language
+        script = self._dominant_script(text)
+        return {'devanagari': 'hi', 'latin': 'en'}.get(script)
+    
+    def _dominant_script(self, text: str) -> Optional[str]:
+        counts = {}
+        for char in text:
+            if char.isalpha():
+                script = script_of(char)
+                if script:
+                    counts[script] = counts.get(script, 0) + 1
+        return max(counts, key=counts.get) if counts else None
+    
+    def _classify(self, text: str) -> Optional[str]:
+        counts = {}
+        letters = 0
+        for char in text:
+            if not char.isalpha():
+                continue
+            script = script_of(char)
+            if script:
+                counts[script] = counts.get(script, 0) + 1
+                letters += 1
+                
+        if letters < self.min_letters:
+            return None
+            
+        script, count = max(counts.items(), key=lambda item: item[1])
+        if count / letters < self.min_confidence:
+            return None
+            
+        if script == 'latin':
+            return 'en' if self._reads_as_english(text) else None
+        return SCRIPT_LANGUAGES.get(script)
+    
+    def _reads_as_english(self, text: str) -> bool:
+        words = _WORD.findall(text.lower())
+        if not words:
+            return False
+        markers = sum(1 for word in words if word in ENGLISH_MARKERS)
+        return markers / len(words) >= self.min_english_ratio
+    
+    def stats(self) -> Dict[str, Any]:
+        """How many remote detect-language calls were saved"""
+        with self._lock:
+            total = self.calls_saved + self.deferred
+            return {
+                'calls_saved': self.calls_saved,
+                'deferred_to_remote': self.deferred,
+                'local_ratio': round(self.calls_saved / total, 4) if total else 0.0
+            }
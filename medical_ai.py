@@ -1,19 +1,113 @@
+import hashlib
+import json
 import re
 from typing import Dict, List, Optional, Tuple
 from config import Config
+from aho_corasick import AhoCorasick
+from response_corpus import ResponseCorpus, CORPUS_FORMAT
+
+# Characters that make a pattern piece more than a plain literal
+REGEX_METACHARACTERS = set('.^$*+?{}[]\\|()')
+
+class SymptomMatcher:
+    """
+    Symptom patterns compiled once into a single matcher. Literal
+    alternatives, and the literal pieces of 'a.*b' alternatives, go into one
+    Aho-Corasick automaton, so a query is scanned once however many
+    conditions there are. Gapped alternatives are confirmed with their
+    precompiled regex only when all of their pieces were seen, and
+    anything else falls back to a precompiled regex.
+    """
+    
+    def __init__(self, symptom_patterns: Dict[str, List[str]]):
+        self.symptoms = list(symptom_patterns)
+        self._literal_symptoms = {}   # literal -> symptom indices
+        self._gapped = {}             # first piece -> [(symptom index, pieces, regex)]
+        self._fallback = []           # (symptom index, regex)
+        
+        for index, patterns in enumerate(symptom_patterns.values()):
+            for pattern in patterns:
+                # Only literal pieces are lowercased; lowercasing regex source would turn \W into \w
+                for alternative in self._split_alternatives(pattern):
+                    pieces = alternative.split('.*')
+                    if not all(piece and self._is_literal(piece) for piece in pieces):
+                        self._fallback.append((index, re.compile(alternative, re.IGNORECASE)))
+                    elif len(pieces) == 1:
+                        self._literal_symptoms.setdefault(alternative.lower(), set()).add(index)
+                    else:
+                        self._gapped.setdefault(pieces[0].lower(), []).append(
+                            (index, [piece.lower() for piece in pieces], re.compile(alternative, re.IGNORECASE))
+                        )
+        
+        literals = list(self._literal_symptoms)
+        for candidates in self._gapped.values():
+            literals.extend(piece for _, pieces, _ in candidates for piece in pieces)
+        self._automaton = AhoCorasick(literals)
+    
+    @staticmethod
+    def _is_literal(piece: str) -> bool:
+        return not REGEX_METACHARACTERS.intersection(piece)
+    
+    @staticmethod
+    def _split_alternatives(pattern: str) -> List[str]:
+        """Split on top-level '|'; grouped or escaped patterns are kept whole"""
+        if '(' in pattern or '[' in pattern or '\\' in pattern:
+            return [pattern]
+        return pattern.split('|')
+    
+    def match(self, query: str) -> List[str]:
+        """Return every matching symptom, in knowledge base order"""
+        text = query.lower()
+        found = self._automaton.find_keywords(text)
+        
+        matched = set()
+        for literal in found:
+            matched.update(self._literal_symptoms.get(literal, ()))
+        
+        # Only gapped alternatives whose first piece occurs need checking
+        for literal in found:
+            for index, pieces, regex in self._gapped.get(literal, ()):
+                if index not in matched and found.issuperset(pieces) and regex.search(text):
+                    matched.add(index)
+        
+        for index, regex in self._fallback:
+            if index not in matched and regex.search(text):
+                matched.add(index)
+        
+        return [self.symptoms[index] for index in sorted(matched)]
 
 class MedicalAI:
     """Medical AI consultation system"""
     
-    def __init__(self):
+    # Languages the response templates are written in; others get English
+    RESPONSE_LANGUAGES = ('en', 'hi')
+    
+    def __init__(self, corpus_path: Optional[str] = None):
         self.medical_knowledge = self._load_medical_knowledge()
         self.symptom_patterns = self._load_symptom_patterns()
+        self.symptom_matcher = SymptomMatcher(self.symptom_patterns)
+        self.emergency_vocabulary = self._load_emergency_keywords()
         self.emergency_keywords = [
-            'chest pain', 'difficulty breathing', 'unconscious', 'severe bleeding',
-            'heart attack', 'stroke', 'poisoning', 'emergency', 'urgent',
-            'सीने में दर्द', 'सांस लेने में तकलीफ', 'बेहोशी', 'खून बहना',
-            'हार्ट अटैक', 'स्ट्रोक', 'इमरजेंसी', 'जरूरी', 'तुरंत'
+            keyword for keywords in self.emergency_vocabulary.values() for keyword in keywords
         ]
+        self.emergency_scanner = AhoCorasick(keyword.lower() for keyword in self.emergency_keywords)
+        
+        # Precomputed responses for languages without templates, if built
+        corpus_path = corpus_path if corpus_path is not None else Config.RESPONSE_CORPUS_PATH
+        self.corpus = ResponseCorpus.load(corpus_path, self.corpus_fingerprint()) if corpus_path else None
+    
+    def _load_emergency_keywords(self) -> Dict[str, List[str]]:
+        """Load emergency keywords per language code"""
+        return {
+            'en': [
+                'chest pain', 'difficulty breathing', 'unconscious', 'severe bleeding',
+                'heart attack', 'stroke', 'poisoning', 'emergency', 'urgent'
+            ],
+            'hi': [
+                'सीने में दर्द', 'सांस लेने में तकलीफ', 'बेहोशी', 'खून बहना',
+                'हार्ट अटैक', 'स्ट्रोक', 'इमरजेंसी', 'जरूरी', 'तुरंत'
+            ]
+        }
     
     def _load_medical_knowledge(self) -> Dict:
         """Load medical knowledge base"""
@@ -77,34 +171,89 @@ class MedicalAI:
     
     def detect_symptoms(self, query: str) -> List[str]:
         """Detect symptoms from user query"""
-        query_lower = query.lower()
-        detected_symptoms = []
-        
-        for symptom, patterns in self.symptom_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, query_lower, re.IGNORECASE):
-                    detected_symptoms.append(symptom)
-                    break
-        
-        return detected_symptoms
+        return self.symptom_matcher.match(query)
+    
+    def find_emergency_keywords(self, query: str) -> List[Tuple[str, int]]:
+        """Return (keyword, offset) for every emergency keyword in the lowercased query"""
+        return [(keyword, start) for start, _, keyword in self.emergency_scanner.finditer(query.lower())]
     
     def check_emergency(self, query: str) -> bool:
         """Check if query indicates emergency situation"""
-        query_lower = query.lower()
-        for keyword in self.emergency_keywords:
-            if keyword.lower() in query_lower:
-                return True
+        for _ in self.emergency_scanner.finditer(query.lower()):
+            return True
         return False
     
-    def generate_medical_response(self, query: str, detected_language: str) -> str:
-        """Generate medical response based on query and detected symptoms"""
+    def response_language(self, language: str) -> str:
+        """Language generate_medical_response actually answers in for a requested language"""
+        return language if language in self.RESPONSE_LANGUAGES else 'en'
+    
+    def generate_localized_response(self, query: str, language: str,
+                                    known_symptoms: Optional[List[str]] = None) -> Tuple[str, str]:
+        """
+        Respond in language when the templates or the precomputed corpus
+        cover it, otherwise in English. Returns (response, language it is in).
+        """
+        if language not in self.RESPONSE_LANGUAGES and self.corpus is not None:
+            case = self._response_case(query, known_symptoms)
+            precomputed = self.corpus.get(case, language) if case else None
+            if precomputed:
+                return precomputed, language
+        
+        language = self.response_language(language)
+        return self.generate_medical_response(query, language, known_symptoms), language
+    
+    def _response_case(self, query: str, known_symptoms: Optional[List[str]] = None) -> Optional[str]:
+        """Corpus case for a query: 'emergency', the primary symptom, or None for a general reply"""
+        if self.check_emergency(query):
+            return 'emergency'
+        symptoms = self.detect_symptoms(query) or self._known(known_symptoms)
+        return symptoms[0] if symptoms else None
+    
+    def _known(self, symptoms: Optional[List[str]]) -> List[str]:
+        """Symptoms from earlier turns that the knowledge base still covers"""
+        return [symptom for symptom in symptoms or () if symptom in self.medical_knowledge]
+    
+    def deterministic_responses(self, language: str) -> Dict[str, str]:
+        """Every response that depends only on its case and language, keyed by case"""
+        responses = {'emergency': self._generate_emergency_response(language)}
+        for symptom in self.medical_knowledge:
+            responses[symptom] = self._generate_symptom_response([symptom], language)
+        return responses
+    
+    def localized_deterministic_responses(self, language: str) -> Dict[str, str]:
+        """Deterministic responses available in language from the templates or the corpus"""
+        if language in self.RESPONSE_LANGUAGES:
+            return self.deterministic_responses(language)
+        if self.corpus is None:
+            return {}
+        responses = {}
+        for case in ['emergency', *self.medical_knowledge]:
+            precomputed = self.corpus.get(case, language)
+            if precomputed:
+                responses[case] = precomputed
+        return responses
+    
+    def corpus_fingerprint(self) -> str:
+        """Hash of the English responses a corpus is translated from"""
+        material = json.dumps(
+            {'format': CORPUS_FORMAT, 'responses': self.deterministic_responses('en')},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(material.encode('utf-8')).hexdigest()
+    
+    def generate_medical_response(self, query: str, detected_language: str,
+                                  known_symptoms: Optional[List[str]] = None) -> str:
+        """
+        Generate medical response based on query and detected symptoms; a
+        follow-up naming no symptom continues with the earlier turns' known_symptoms
+        """
         
         # Check for emergency
         if self.check_emergency(query):
             return self._generate_emergency_response(detected_language)
         
         # Detect symptoms
-        symptoms = self.detect_symptoms(query)
+        symptoms = self.detect_symptoms(query) or self._known(known_symptoms)
         
         if not symptoms:
             return self._generate_general_response(query, detected_language)
@@ -0,0 +1,237 @@
+import asyncio
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+from config import Config
+
+# Latency buckets in seconds, from a cache hit to a slow speech upstream call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class _Metric:
+    """A metric family: one value (or histogram) per combination of label values"""
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+    
+    def _labels(self, key: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+    
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in sorted(values):
+            yield f'{self.name}{self._labels(key)} {_number(value)}'
+
+class Counter(_Metric):
+    kind = 'counter'
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+class Gauge(_Metric):
+    kind = 'gauge'
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+class Histogram(_Metric):
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last slot is +Inf), then sum
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+    
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        for key, (counts, total) in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f'{self.name}_bucket{self._labels(key, le)} {cumulative}'
+            yield f'{self.name}_sum{self._labels(key)} {_number(total)}'
+            yield f'{self.name}_count{self._labels(key)} {cumulative}'
+
+class CallbackMetric(_Metric):
+    """Values read at scrape time from stats() the app already keeps, e.g. cache counters"""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str],
+                 read: Callable[[], Dict[Tuple[str, ...], float]], kind: str = 'gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.read = read
+        self.kind = kind
+    
+    def samples(self) -> Iterator[str]:
+        try:
+            values = self.read()
+        except Exception as e:
+            print(f"Metrics collection error for {self.name}: {e}")
+            return
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{self._labels(key)} {_number(value)}'
+
+class _NoopMetric:
+    """Stands in for every metric when metrics are disabled"""
+    
+    def inc(self, *args, **labels):
+        pass
+    
+    def dec(self, *args, **labels):
+        pass
+    
+    def set(self, *args, **labels):
+        pass
+    
+    def observe(self, *args, **labels):
+        pass
+
+_NOOP = _NoopMetric()
+
+class Registry:
+    """Metric families rendered together in the Prometheus text format"""
+    
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List[_Metric] = []
+    
+    def _register(self, metric: _Metric):
+        if not self.enabled:
+            return _NOOP
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+    
+    def callback(self, name: str, documentation: str, labelnames: Sequence[str],
+                 read: Callable[[], Dict[Tuple[str, ...], float]], kind: str = 'gauge'):
+        return self._register(CallbackMetric(name, documentation, labelnames, read, kind))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+class _UpstreamCall:
+    """Times one upstream call; the caller sets status once a response arrives"""
+    
+    __slots__ = ('endpoint', 'status', 'started')
+    
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+        self.status = None
+    
+    def __enter__(self):
+        UPSTREAM_IN_FLIGHT.inc(endpoint=self.endpoint)
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        UPSTREAM_DURATION.observe(time.perf_counter() - self.started, endpoint=self.endpoint)
+        if exc_type is not None and issubclass(exc_type, asyncio.CancelledError):
+            status = 'cancelled'
+        else:
+            status = self.status if self.status is not None else ('error' if exc_type else 'unknown')
+        UPSTREAM_REQUESTS.inc(endpoint=self.endpoint, status=status)
+        UPSTREAM_IN_FLIGHT.dec(endpoint=self.endpoint)
+        return False
+
+class _NoopCall:
+    __slots__ = ('status',)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+def upstream_call(endpoint: str):
+    """Context manager recording latency, status and concurrency of a Sarvam AI call"""
+    return _UpstreamCall(endpoint) if registry.enabled else _NoopCall()
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+registry = Registry(enabled=Config.METRICS_ENABLED)
+
+HTTP_DURATION = registry.histogram(
+    'doctor_http_request_duration_seconds', 'Time to produce a response, by route',
+    ('route', 'method', 'status')
+)
+HTTP_IN_FLIGHT = registry.gauge(
+    'doctor_http_requests_in_flight', 'Requests being handled, by route', ('route',)
+)
+UPSTREAM_DURATION = registry.histogram(
+    'doctor_sarvam_request_duration_seconds', 'Sarvam AI call latency including retries, by endpoint',
+    ('endpoint',)
+)
+UPSTREAM_REQUESTS = registry.counter(
+    'doctor_sarvam_requests_total', 'Sarvam AI calls by endpoint and HTTP status (error: no response)',
+    ('endpoint', 'status')
+)
+UPSTREAM_IN_FLIGHT = registry.gauge(
+    'doctor_sarvam_requests_in_flight', 'Sarvam AI calls awaiting a response, by endpoint', ('endpoint',)
+)
+STAGE_DURATION = registry.histogram(
+    'doctor_pipeline_stage_duration_seconds',
+    'Consultation pipeline stage latency (stt, detect, generate, tts, ...) by outcome (ok, error, cancelled)',
+    ('stage', 'outcome')
+)
+VOICE_TURN_LATENCY = registry.histogram(
+    'doctor_voice_turn_latency_seconds', 'Streaming voice turns: end of the utterance to the first reply audio'
+)
@@ -0,0 +1,81 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, List, Optional, Tuple
+import metrics
+
+class Pipeline:
+    """
+    Runs the stages of one request as asyncio tasks so that independent
+    upstream calls overlap, and records when each stage started and how long
+    it took so the critical path can be read from the Server-Timing header.
+    Stage names are fixed strings, since they become metric labels; which
+    instance of a repeated stage ran (index) and how it ended (outcome: ok,
+    error or cancelled) are recorded beside the name.
+    """
+    
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._tasks = []
+        # (stage, start ms, duration ms, outcome, index)
+        self.timings: List[Tuple[str, float, float, str, Optional[int]]] = []
+    
+    def start(self, name: str, awaitable: Awaitable, index: Optional[int] = None) -> asyncio.Task:
+        """Schedule a stage to run alongside the caller and return its task"""
+        task = asyncio.ensure_future(self.run(name, awaitable, index))
+        self._tasks.append(task)
+        return task
+    
+    async def run(self, name: str, awaitable: Awaitable, index: Optional[int] = None) -> Any:
+        """Await a stage in line, recording its timing"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await awaitable
+            outcome = 'ok'
+            return result
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        finally:
+            self._record(name, started, outcome, index)
+    
+    @contextmanager
+    def step(self, name: str):
+        """Time a synchronous step such as local response generation"""
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self._record(name, started, outcome)
+    
+    async def cancel_pending(self):
+        """Cancel stages whose results were not needed, e.g. a wrong speculation"""
+        pending = [task for task in self._tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._origin) * 1000
+    
+    def server_timing(self) -> str:
+        """Format stage timings as a Server-Timing header value"""
+        entries = []
+        for name, start, duration, outcome, index in sorted(self.timings, key=lambda timing: timing[1]):
+            description = f"start {start:.1f}ms"
+            if index is not None:
+                description += f" #{index}"
+            if outcome != 'ok':
+                description += f" {outcome}"
+            entries.append(f'{name};dur={duration:.1f};desc="{description}"')
+        entries.append(f'total;dur={self.elapsed_ms():.1f}')
+        return ', '.join(entries)
+    
+    def _record(self, name: str, started: float, outcome: str, index: Optional[int] = None):
+        finished = time.perf_counter()
+        self.timings.append((name, (started - self._origin) * 1000, (finished - started) * 1000, outcome, index))
+        metrics.STAGE_DURATION.observe(finished - started, stage=name, outcome=outcome)
@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+    
+    def __init__(self, endpoint: str):
+        super().__init__(f"Circuit open for {endpoint}")
+        self.endpoint = endpoint
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker over a rolling window of recent calls.
+    Failures and calls slower than slow_call_seconds both count against
+    the endpoint; once they reach failure_ratio of the window the circuit
+    opens and calls fail fast for open_seconds. Then a single probe call is
+    let through: success closes the circuit, failure opens it again.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+    
+    def __init__(self, window: int = 20, min_calls: int = 10, failure_ratio: float = 0.5,
+                 slow_call_seconds: Optional[float] = None, open_seconds: float = 30,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.clock = clock
+        
+        self.state = self.CLOSED
+        self._outcomes = deque(maxlen=window)  # True for a failed or slow call
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        
+        self.rejected = 0
+        self.opened = 0
+    
+    def allow(self) -> bool:
+        """Whether a call may go upstream now; every allowed call must be followed by record()"""
+        with self._lock:
+            if self.state == self.OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+    
+    def record(self, success: Optional[bool], duration: float = 0.0):
+        """
+        Record the outcome of an allowed call. None means no verdict, e.g.
+        the caller cancelled it, and only frees the half-open probe slot.
+        """
+        with self._lock:
+            if success is None:
+                self._probing = False
+                return
+            failed = not success or (self.slow_call_seconds is not None and duration > self.slow_call_seconds)
+            if self.state == self.HALF_OPEN:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            if self.state == self.OPEN:
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) >= self.min_calls and \
+                    sum(self._outcomes) / len(self._outcomes) >= self.failure_ratio:
+                self._open()
+    
+    def _open(self):
+        self.state = self.OPEN
+        self._opened_at = self.clock()
+        self._outcomes.clear()
+        self.opened += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'recent_calls': len(self._outcomes),
+                'recent_failures': sum(self._outcomes),
+                'opened': self.opened,
+                'rejected': self.rejected
+            }
+
+class CircuitBreakers:
+    """
+    One breaker per upstream endpoint, created on first use. Shared by the
+    sync and async clients so both see the same view of upstream health.
+    """
+    
+    def __init__(self, window: int = 20, min_calls: int = 10, failure_ratio: float = 0.5,
+                 slow_call_fraction: float = 0.8, open_seconds: float = 30):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_ratio = failure_ratio
+        self.slow_call_fraction = slow_call_fraction
+        self.open_seconds = open_seconds
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, endpoint: str, read_timeout: float) -> CircuitBreaker:
+        """Breaker for endpoint; a call taking slow_call_fraction of its read timeout counts as slow"""
+        breaker = self._breakers.get(endpoint)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(endpoint, CircuitBreaker(
+                    self.window, self.min_calls, self.failure_ratio,
+                    read_timeout * self.slow_call_fraction if self.slow_call_fraction else None,
+                    self.open_seconds
+                ))
+        return breaker
+    
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {endpoint: breaker.stats() for endpoint, breaker in list(self._breakers.items())}
+
+class Hedge:
+    """
+    Hedged requests: if the first attempt has not answered after the
+    observed p95 latency (or a fixed delay), a second identical attempt is
+    started and whichever succeeds first wins; the other is cancelled.
+    """
+    
+    def __init__(self, delay: Optional[float] = None, percentile: float = 0.95,
+                 initial_delay: float = 0.3, samples: int = 200, min_samples: int = 20):
+        self.fixed_delay = delay
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self._latencies = deque(maxlen=samples)
+        self.calls = 0
+        self.fired = 0
+        self.won = 0
+    
+    def observe(self, duration: float):
+        """Record the latency of a successful attempt"""
+        self._latencies.append(duration)
+    
+    def delay(self) -> float:
+        if self.fixed_delay:
+            return self.fixed_delay
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+    
+    async def run(self, attempt: Callable[[], Awaitable]) -> Any:
+        self.calls += 1
+        attempts = [asyncio.ensure_future(attempt())]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=self.delay())
+            if done:
+                return attempts[0].result()
+            
+            self.fired += 1
+            attempts.append(asyncio.ensure_future(attempt()))
+            pending, error = set(attempts), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is attempts[1]:
+                            self.won += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing attempt, or both if the caller was cancelled
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+    
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'calls': self.calls,
+            'hedged': self.fired,
+            'hedge_won': self.won,
+            'delay_ms': round(self.delay() * 1000, 1)
+        }
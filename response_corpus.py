@@ -0,0 +1,93 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+from text_chunks import split_paragraphs
+
+# Bump when the artifact layout changes
+CORPUS_FORMAT = 1
+
+class ResponseCorpus:
+    """
+    Precomputed MedicalAI responses for languages the templates do not
+    cover, keyed by response case ('emergency' or a symptom) and language.
+    Built offline by build_assets.py and tied to a fingerprint of the
+    English templates and knowledge base, so a stale artifact is ignored
+    instead of served.
+    """
+    
+    def __init__(self, responses: Dict[str, Dict[str, str]], fingerprint: str, built_at: float = None):
+        self.responses = responses  # case -> {language: response}
+        self.fingerprint = fingerprint
+        self.built_at = built_at
+    
+    @classmethod
+    def load(cls, path: str, fingerprint: str) -> Optional['ResponseCorpus']:
+        """Load the artifact at path, or None if it is missing, unreadable or stale"""
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as corpus_file:
+                data = json.load(corpus_file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Could not load response corpus {path}: {e}")
+            return None
+            
+        if data.get('format') != CORPUS_FORMAT or data.get('fingerprint') != fingerprint:
+            print(f"Ignoring stale response corpus {path}; rebuild it with: python build_assets.py corpus")
+            return None
+        return cls(data['responses'], data['fingerprint'], data.get('built_at'))
+    
+    def save(self, path: str):
+        """Write the artifact atomically as compact gzipped JSON"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, 'wt', encoding='utf-8', compresslevel=9) as corpus_file:
+            json.dump({
+                'format': CORPUS_FORMAT,
+                'fingerprint': self.fingerprint,
+                'built_at': self.built_at,
+                'responses': self.responses
+            }, corpus_file, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        os.replace(temp_path, path)
+    
+    def get(self, case: str, language: str) -> Optional[str]:
+        return self.responses.get(case, {}).get(language)
+    
+    def stats(self) -> Dict[str, Any]:
+        languages = {language for by_language in self.responses.values() for language in by_language}
+        return {
+            'cases': len(self.responses),
+            'languages': sorted(languages),
+            'built_at': self.built_at
+        }
+
+def build_corpus(medical_ai, translate_batch: Callable[[List[str], str, str], List[Optional[str]]],
+                 languages: List[str], existing: Optional[ResponseCorpus] = None) -> ResponseCorpus:
+    """
+    Render every deterministic English response and translate it into each
+    language paragraph by paragraph, so paragraphs shared between responses
+    (follow-up questions, disclaimers) are translated once per language.
+    Other languages in an existing corpus are carried over unchanged.
+    Raises ValueError if any paragraph came back empty or missing.
+    """
+    sources = medical_ai.deterministic_responses('en')
+    case_paragraphs = {case: split_paragraphs(text) for case, text in sources.items()}
+    unique_paragraphs = list(dict.fromkeys(
+        paragraph for paragraphs in case_paragraphs.values() for paragraph in paragraphs
+    ))
+    
+    responses = {case: dict(existing.responses.get(case, {})) if existing else {} for case in sources}
+    for language in languages:
+        translated = dict(zip(unique_paragraphs, translate_batch(unique_paragraphs, language, 'en-IN')))
+        # Numbers, names and units may legitimately come back unchanged
+        untranslated = [paragraph for paragraph in unique_paragraphs if not translated.get(paragraph)]
+        if untranslated:
+            raise ValueError(f"{len(untranslated)} paragraphs were not translated to {language}")
+        for case, paragraphs in case_paragraphs.items():
+            responses[case][language] = '\n\n'.join(translated[paragraph] for paragraph in paragraphs)
+            
+    return ResponseCorpus(responses, medical_ai.corpus_fingerprint(), built_at=time.time())
@@ -1,49 +1,343 @@
+import asyncio
+import io
+import os
 import requests
+import aiohttp
 import json
-from typing import Optional, Dict, Any
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, AsyncIterator, BinaryIO, Iterator, List, Tuple, Union
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
+from cache import TranslationCache, AudioCache
+from audio_bank import AudioBank
+from language_detector import ScriptLanguageDetector
+from text_chunks import split_for_speech, stitch_transcripts
+from coalesce import SingleFlight, AsyncSingleFlight, MicroBatcher
+import metrics
+from resilience import CircuitBreakers, CircuitOpenError, Hedge
+from base64_stream import Base64FieldDecoder
+
+# Upstream statuses worth retrying with backoff
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Failures before the request reached upstream, so it is safe to send again;
+# aiohttp before 3.10 reports connect timeouts as read timeouts, which are not
+RETRYABLE_CONNECTION_ERRORS = (aiohttp.ClientConnectorError,) + (
+    (aiohttp.ConnectionTimeoutError,) if hasattr(aiohttp, 'ConnectionTimeoutError') else ()
+)
+
+# Text-to-speech responses are read and decoded in chunks of this size
+TTS_READ_CHUNK_BYTES = 64 * 1024
+
+# Translation model settings; also part of the translation cache key
+TRANSLATE_MODEL = "mayura:v1"
+TRANSLATE_MODE = "formal"
+
+# Voice parameters for TTS; also part of the audio cache key
+TTS_VOICE = {
+    "speaker": "meera",
+    "pitch": 0,
+    "pace": 1.0,
+    "loudness": 1.0,
+    "speech_sample_rate": 8000,
+    "model": "bulbul:v1"
+}
+
+# Map Sarvam language codes to our supported language codes
+LANGUAGE_CODE_MAP = {
+    'hin': 'hi',
+    'ben': 'bn',
+    'tel': 'te',
+    'tam': 'ta',
+    'mar': 'mr',
+    'guj': 'gu',
+    'kan': 'kn',
+    'mal': 'ml',
+    'pan': 'pa',
+    'ori': 'or',
+    'eng': 'en'
+}
+
+def _detect_payload(text: str) -> Dict[str, Any]:
+    return {"input": text}
+
+def _translate_payload(text: str, target_language: str, source_language: str) -> Dict[str, Any]:
+    return {
+        "input": text,
+        "source_language_code": source_language,
+        "target_language_code": Config.SUPPORTED_LANGUAGES.get(target_language, 'en-IN'),
+        "speaker_gender": "Male",
+        "mode": TRANSLATE_MODE,
+        "model": TRANSLATE_MODEL,
+        "enable_preprocessing": True
+    }
+
+def _tts_payload(text: str, language_code: str) -> Dict[str, Any]:
+    return {
+        "inputs": [text],
+        "target_language_code": Config.SUPPORTED_LANGUAGES.get(language_code, 'hi-IN'),
+        **TTS_VOICE,
+        "enable_preprocessing": True
+    }
+
+def _stt_form(language_code: str) -> Dict[str, str]:
+    return {
+        'model': 'saarika:v2',
+        'language_code': Config.SUPPORTED_LANGUAGES.get(language_code, 'hi-IN')
+    }
+
+def _stt_translate_form(target_language: str) -> Dict[str, str]:
+    return {
+        'model': 'saaras:v1',
+        'target_language_code': Config.SUPPORTED_LANGUAGES.get(target_language, 'en-IN')
+    }
+
+def _parse_detected_language(result: Dict[str, Any]) -> str:
+    detected_lang = result.get('language_code', 'en')
+    return LANGUAGE_CODE_MAP.get(detected_lang, 'en')
+
+def _tts_decoder(content_length: Optional[Union[int, str]]) -> Base64FieldDecoder:
+    # Sarvam returns base64 encoded audio; the first clip is decoded as the body streams in
+    return Base64FieldDecoder('audios', int(content_length) if content_length else None)
+
+async def _read_tts_audio(response: aiohttp.ClientResponse) -> Optional[bytearray]:
+    decoder = _tts_decoder(response.content_length)
+    async for chunk in response.content.iter_chunked(TTS_READ_CHUNK_BYTES):
+        decoder.feed(chunk)
+    return decoder.result()
+
+def _translation_cache_key(text: str, target_language: str, source_language: str) -> str:
+    return TranslationCache.make_key(
+        text,
+        source_language,
+        Config.SUPPORTED_LANGUAGES.get(target_language, 'en-IN'),
+        TRANSLATE_MODEL,
+        TRANSLATE_MODE
+    )
+
+def _pack_translation_inputs(texts: List[str], max_chars: int) -> List[List[str]]:
+    """
+    Group texts into newline-joined upstream inputs of up to max_chars.
+    Texts that contain newlines could not be split back apart, so they go
+    alone, as do texts at or over the limit.
+    """
+    groups, current, size = [], [], 0
+    for text in texts:
+        if '\n' in text or len(text) >= max_chars:
+            groups.append([text])
+            continue
+        if current and size + 1 + len(text) > max_chars:
+            groups.append(current)
+            current, size = [], 0
+        size += len(text) + (1 if current else 0)
+        current.append(text)
+    if current:
+        groups.append(current)
+    return groups
+
+def _unpack_translations(result: Dict[str, Any], group: List[str]) -> Optional[List[str]]:
+    """Split a packed translation back into lines, or None if the line structure was lost"""
+    if 'translated_text' not in result:
+        return None
+    lines = result['translated_text'].split('\n')
+    return lines if len(lines) == len(group) else None
+
+def _cached_translations(cache: Optional[TranslationCache], texts: List[str], target_language: str,
+                         source_language: str) -> Dict[str, Optional[str]]:
+    """Unique texts mapped to their cached translation, or None when not cached"""
+    translations = {}
+    for text in texts:
+        if text in translations:
+            continue
+        cached = None
+        if not text.strip():
+            cached = text
+        elif cache is not None:
+            cached = cache.get(_translation_cache_key(text, target_language, source_language))
+        translations[text] = cached
+    return translations
+
+def _cache_translations(cache: Optional[TranslationCache], texts: List[str], translations: List[Optional[str]],
+                        target_language: str, source_language: str):
+    if cache is not None:
+        for text, translated in zip(texts, translations):
+            if translated is not None:
+                cache.set(_translation_cache_key(text, target_language, source_language), translated)
+
+def _detect_flight_key(text: str) -> tuple:
+    """Requests differing only in whitespace share one detection"""
+    return ('detect-language', ' '.join(text.split()))
+
+def tts_cache_key(text: str, language_code: str) -> str:
+    """Audio cache key for the audio text_to_speech produces for text"""
+    return AudioCache.make_key(
+        text,
+        Config.SUPPORTED_LANGUAGES.get(language_code, 'hi-IN'),
+        TTS_VOICE
+    )
+
+# Audio accepted by the speech endpoints: a file path, raw bytes or a binary stream
+AudioSource = Union[str, bytes, BinaryIO]
+
+def _audio_file_field(audio: AudioSource, filename: Optional[str], content_type: Optional[str]) -> Tuple[tuple, Optional[BinaryIO]]:
+    """
+    Build a requests file tuple for an audio source; also returns the file
+    object opened here, which the caller must close
+    """
+    opened = None
+    if isinstance(audio, str):
+        opened = stream = open(audio, 'rb')
+        filename = filename or os.path.basename(audio)
+    elif isinstance(audio, (bytes, bytearray, memoryview)):
+        stream = io.BytesIO(audio)
+    else:
+        stream = audio
+    
+    filename = filename or 'audio.wav'
+    if content_type:
+        return (filename, stream, content_type), opened
+    return (filename, stream), opened
+
+def _speech_chunks(text: str):
+    return iter(split_for_speech(text, Config.TTS_STREAM_CHUNK_CHARS, Config.TTS_STREAM_FIRST_CHUNK_CHARS))
+
+def _read_timeout(endpoint: str) -> float:
+    return Config.SARVAM_READ_TIMEOUTS.get(endpoint, 30)
+
+def _circuit_breaker(circuit_breakers: Optional[CircuitBreakers], endpoint: str):
+    """The endpoint's breaker after checking it admits a call, or None without breakers"""
+    if circuit_breakers is None:
+        return None
+    breaker = circuit_breakers.get(endpoint, _read_timeout(endpoint))
+    if not breaker.allow():
+        raise CircuitOpenError(endpoint)
+    return breaker
 
 class SarvamAIClient:
     """Client for interacting with Sarvam AI APIs"""
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, pool_size: int = None, max_retries: int = None,
+                 backoff_factor: float = None, translation_cache: Optional[TranslationCache] = None,
+                 tts_cache: Optional[AudioCache] = None, audio_bank: Optional[AudioBank] = None,
+                 local_detector: Optional[ScriptLanguageDetector] = None, single_flight: bool = None,
+                 circuit_breakers: Optional[CircuitBreakers] = None):
         self.api_key = api_key
-        self.base_url = "https://api.sarvam.ai"
-        self.headers = {
-            "api-subscription-key": api_key,
-            "Content-Type": "application/json"
-        }
+        self.circuit_breakers = circuit_breakers
+        self.translation_cache = translation_cache
+        self.tts_cache = tts_cache
+        self.audio_bank = audio_bank
+        self.local_detector = local_detector
+        self.single_flight = SingleFlight() \
+            if (single_flight if single_flight is not None else Config.SINGLE_FLIGHT) else None
+        self.base_url = Config.SARVAM_BASE_URL.rstrip('/')
+        self.session = self._create_session(
+            pool_size if pool_size is not None else Config.SARVAM_POOL_SIZE,
+            max_retries if max_retries is not None else Config.SARVAM_MAX_RETRIES,
+            backoff_factor if backoff_factor is not None else Config.SARVAM_RETRY_BACKOFF
+        )
+    
+    def _create_session(self, pool_size: int, max_retries: int, backoff_factor: float) -> requests.Session:
+        """
+        Create a keep-alive session whose connection pool is shared by every
+        thread using this client
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset(['POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size,
+            max_retries=retry
+        )
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({"api-subscription-key": self.api_key})
+        return session
+    
+    def _timeout(self, endpoint: str) -> tuple:
+        """(connect, read) timeout pair for an endpoint"""
+        return (Config.SARVAM_CONNECT_TIMEOUT, _read_timeout(endpoint))
+    
+    def _post(self, endpoint: str, **kwargs) -> requests.Response:
+        """
+        POST to a Sarvam AI endpoint over the pooled session; fails fast with
+        CircuitOpenError while the endpoint's circuit is open
+        """
+        with metrics.upstream_call(endpoint) as call:
+            return self._send(endpoint, call, **kwargs)
+    
+    @contextmanager
+    def _post_streamed(self, endpoint: str, **kwargs) -> Iterator[requests.Response]:
+        """
+        Like _post, but the body is left to be read inside the with block,
+        which the call's latency covers
+        """
+        with metrics.upstream_call(endpoint) as call:
+            with self._send(endpoint, call, stream=True, **kwargs) as response:
+                yield response
+    
+    def _send(self, endpoint: str, call, **kwargs) -> requests.Response:
+        breaker = _circuit_breaker(self.circuit_breakers, endpoint)
+        url = f"{self.base_url}/{endpoint}"
+        started = time.perf_counter()
+        healthy = False
+        try:
+            response = self.session.post(url, timeout=self._timeout(endpoint), **kwargs)
+            call.status = response.status_code
+            healthy = response.status_code not in RETRY_STATUS_CODES
+            try:
+                response.raise_for_status()
+            except requests.HTTPError:
+                # Streamed responses hold their connection until closed
+                response.close()
+                raise
+            return response
+        finally:
+            if breaker is not None:
+                breaker.record(healthy, time.perf_counter() - started)
+    
+    def close(self):
+        """Release pooled connections"""
+        self.session.close()
+    
+    def _coalesce(self, key: tuple, fn, *args):
+        """Share one upstream call between concurrent identical requests"""
+        if self.single_flight is None:
+            return fn(*args)
+        return self.single_flight.do(key, lambda: fn(*args))
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return {'single_flight': self.single_flight.stats() if self.single_flight else None}
     
     def detect_language(self, text: str) -> Optional[str]:
         """
         Detect the language of input text using Sarvam AI language detection
         """
+        # Unambiguous scripts are answered offline without a round trip
+        if self.local_detector is not None:
+            local_language = self.local_detector.detect(text)
+            if local_language:
+                return local_language
+        
+        return self._coalesce(_detect_flight_key(text), self._detect_remote, text)
+    
+    def _detect_remote(self, text: str) -> str:
         try:
-            url = f"{self.base_url}/detect-language"
-            payload = {"input": text}
-            
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            detected_lang = result.get('language_code', 'en')
-            
-            # Map to our supported language codes
-            lang_mapping = {
-                'hin': 'hi',
-                'ben': 'bn', 
-                'tel': 'te',
-                'tam': 'ta',
-                'mar': 'mr',
-                'guj': 'gu',
-                'kan': 'kn',
-                'mal': 'ml',
-                'pan': 'pa',
-                'ori': 'or',
-                'eng': 'en'
-            }
-            
-            return lang_mapping.get(detected_lang, 'en')
+            response = self._post('detect-language', json=_detect_payload(text))
+            return _parse_detected_language(response.json())
             
         except Exception as e:
             print(f"Language detection error: {e}")
@@ -53,50 +347,84 @@ class SarvamAIClient:
         """
         Translate text using Sarvam AI translation API
         """
+        cache_key = _translation_cache_key(text, target_language, source_language)
+        if self.translation_cache is not None:
+            cached = self.translation_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        translated = self._coalesce(('translate', cache_key), self._translate_remote,
+                                    text, target_language, source_language)
+        return translated if translated is not None else text
+    
+    def _translate_remote(self, text: str, target_language: str, source_language: str) -> Optional[str]:
+        translated = self._translate_one(text, target_language, source_language)
+        _cache_translations(self.translation_cache, [text], [translated], target_language, source_language)
+        return translated
+    
+    def _translate_one(self, text: str, target_language: str, source_language: str) -> Optional[str]:
+        """One upstream translation; None if it failed"""
         try:
-            url = f"{self.base_url}/translate"
-            payload = {
-                "input": text,
-                "source_language_code": source_language,
-                "target_language_code": Config.SUPPORTED_LANGUAGES.get(target_language, 'en-IN'),
-                "speaker_gender": "Male",
-                "mode": "formal",
-                "model": "mayura:v1",
-                "enable_preprocessing": True
-            }
-            
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
-            
-            result = response.json()
-            return result.get('translated_text', text)
+            payload = _translate_payload(text, target_language, source_language)
+            return self._post('translate', json=payload).json().get('translated_text')
             
         except Exception as e:
             print(f"Translation error: {e}")
-            return text
+            return None
     
-    def speech_to_text(self, audio_file_path: str, language_code: str = "hi-IN") -> Optional[str]:
+    def translate_batch(self, texts: List[str], target_language: str, source_language: str = "auto",
+                        concurrency: int = None, keep_source: bool = True) -> List[Optional[str]]:
         """
-        Convert speech to text using Sarvam AI ASR
+        Translate many texts, returned in input order. Duplicates and cached
+        texts are not sent; the rest are packed several per request up to
+        the upstream input limit and sent with bounded concurrency. A text
+        that could not be translated comes back unchanged, or as None when
+        keep_source is False.
         """
+        translations = _cached_translations(self.translation_cache, texts, target_language, source_language)
+        pending = [text for text in translations if translations[text] is None]
+        groups = _pack_translation_inputs(pending, Config.TRANSLATE_MAX_INPUT_CHARS)
+        
+        if groups:
+            workers = min(concurrency or Config.TRANSLATE_BATCH_CONCURRENCY, len(groups))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='sarvam-translate') as executor:
+                for group, translated in zip(groups, executor.map(
+                    lambda group: self._translate_group(group, target_language, source_language), groups
+                )):
+                    _cache_translations(self.translation_cache, group, translated, target_language, source_language)
+                    translations.update(
+                        (text, result if result is not None or not keep_source else text)
+                        for text, result in zip(group, translated)
+                    )
+        return [translations[text] for text in texts]
+    
+    def _translate_group(self, group: List[str], target_language: str,
+                         source_language: str) -> List[Optional[str]]:
+        """Translate texts in one packed request, or one by one if packing was not preserved"""
+        if len(group) > 1:
+            try:
+                payload = _translate_payload('\n'.join(group), target_language, source_language)
+                lines = _unpack_translations(self._post('translate', json=payload).json(), group)
+                if lines is not None:
+                    return lines
+            except Exception as e:
+                print(f"Batch translation error: {e}")
+        
+        return [self._translate_one(text, target_language, source_language) for text in group]
+    
+    def speech_to_text(self, audio: AudioSource, language_code: str = "hi-IN",
+                       filename: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+        """
+        Convert speech to text using Sarvam AI ASR. audio may be a file path,
+        raw bytes or a binary stream.
+        """
+        opened = None
         try:
-            url = f"{self.base_url}/speech-to-text"
-            
             # Prepare multipart form data
-            files = {
-                'file': open(audio_file_path, 'rb')
-            }
+            file_field, opened = _audio_file_field(audio, filename, content_type)
             
-            data = {
-                'model': 'saarika:v2',
-                'language_code': Config.SUPPORTED_LANGUAGES.get(language_code, 'hi-IN')
-            }
-            
-            # Remove Content-Type header for multipart/form-data
-            headers = {"api-subscription-key": self.api_key}
-            
-            response = requests.post(url, headers=headers, files=files, data=data)
-            response.raise_for_status()
+            # Session headers carry no Content-Type, so requests sets the multipart boundary
+            response = self._post('speech-to-text', files={'file': file_field}, data=_stt_form(language_code))
             
             result = response.json()
             return result.get('transcript', '')
@@ -105,71 +433,508 @@ class SarvamAIClient:
             print(f"Speech to text error: {e}")
             return None
         finally:
-            if 'files' in locals():
-                files['file'].close()
+            if opened:
+                opened.close()
+    
+    def speech_to_text_segments(self, segments: List[AudioSource], language_code: str = "hi-IN",
+                                concurrency: int = None) -> Optional[str]:
+        """
+        Transcribe overlapping segments of one recording concurrently, up to
+        concurrency at a time, and stitch the transcripts back in order.
+        None if any segment could not be transcribed.
+        """
+        if len(segments) == 1:
+            return self.speech_to_text(segments[0], language_code)
+        concurrency = concurrency or Config.STT_SEGMENT_CONCURRENCY
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(segments)),
+                                thread_name_prefix='sarvam-stt') as executor:
+            transcripts = list(executor.map(lambda segment: self.speech_to_text(segment, language_code), segments))
+        if any(transcript is None for transcript in transcripts):
+            return None
+        return stitch_transcripts(transcripts)
     
     def text_to_speech(self, text: str, language_code: str = "hi-IN") -> Optional[bytes]:
         """
         Convert text to speech using Sarvam AI TTS
         """
+        cache_key = tts_cache_key(text, language_code)
+        if self.audio_bank is not None:
+            banked = self.audio_bank.get(cache_key)
+            if banked is not None:
+                return banked
+        if self.tts_cache is not None:
+            cached = self.tts_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        return self._coalesce(('text-to-speech', cache_key), self._tts_remote, text, language_code, cache_key)
+    
+    def _tts_remote(self, text: str, language_code: str, cache_key: str) -> Optional[bytes]:
         try:
-            url = f"{self.base_url}/text-to-speech"
-            payload = {
-                "inputs": [text],
-                "target_language_code": Config.SUPPORTED_LANGUAGES.get(language_code, 'hi-IN'),
-                "speaker": "meera",
-                "pitch": 0,
-                "pace": 1.0,
-                "loudness": 1.0,
-                "speech_sample_rate": 8000,
-                "enable_preprocessing": True,
-                "model": "bulbul:v1"
-            }
+            with self._post_streamed('text-to-speech', json=_tts_payload(text, language_code)) as response:
+                decoder = _tts_decoder(response.headers.get('Content-Length'))
+                for chunk in response.iter_content(TTS_READ_CHUNK_BYTES):
+                    decoder.feed(chunk)
+            audio = decoder.result()
+            if audio and self.tts_cache is not None:
+                self.tts_cache.set(cache_key, audio)
+            return audio
             
-            response = requests.post(url, headers=self.headers, json=payload)
-            response.raise_for_status()
+        except Exception as e:
+            print(f"Text to speech error: {e}")
+            return None
+    
+    def text_to_speech_chunks(self, text: str, language_code: str = "hi-IN",
+                              concurrency: int = None) -> Iterator[Tuple[str, Optional[bytes]]]:
+        """
+        Synthesize text sentence chunk by chunk, yielding (chunk, audio) in
+        order as soon as each is ready. Up to concurrency chunks are
+        synthesized ahead of the consumer.
+        """
+        concurrency = concurrency or Config.TTS_STREAM_CONCURRENCY
+        chunks = _speech_chunks(text)
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='sarvam-tts')
+        window = deque()
+        try:
+            for chunk in chunks:
+                window.append((chunk, executor.submit(self.text_to_speech, chunk, language_code)))
+                if len(window) >= concurrency:
+                    break
+            while window:
+                chunk, future = window.popleft()
+                audio = future.result()
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    window.append((next_chunk, executor.submit(self.text_to_speech, next_chunk, language_code)))
+                yield chunk, audio
+        finally:
+            for _, future in window:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def speech_to_text_translate(self, audio: AudioSource, target_language: str = "en",
+                                 filename: Optional[str] = None,
+                                 content_type: Optional[str] = None) -> Optional[str]:
+        """
+        Convert speech to text and translate to target language. audio may be
+        a file path, raw bytes or a binary stream.
+        """
+        opened = None
+        try:
+            file_field, opened = _audio_file_field(audio, filename, content_type)
             
+            response = self._post('speech-to-text-translate', files={'file': file_field},
+                                  data=_stt_translate_form(target_language))
+                                  
             result = response.json()
-            
-            # Sarvam returns base64 encoded audio
-            import base64
-            if 'audios' in result and len(result['audios']) > 0:
-                audio_base64 = result['audios'][0]
-                return base64.b64decode(audio_base64)
-            
-            return None
+            return result.get('translated_text', '')
             
         except Exception as e:
-            print(f"Text to speech error: {e}")
+            print(f"Speech to text translate error: {e}")
             return None
+        finally:
+            if opened:
+                opened.close()
+
+class AsyncSarvamAIClient:
+    """
+    asyncio client for Sarvam AI APIs with the same method surface as
+    SarvamAIClient. The aiohttp session is bound to the event loop it is
+    first used on, so all calls for one instance must run on that loop.
+    """
+    
+    def __init__(self, api_key: str, pool_size: int = None, max_retries: int = None,
+                 backoff_factor: float = None, translation_cache: Optional[TranslationCache] = None,
+                 tts_cache: Optional[AudioCache] = None, audio_bank: Optional[AudioBank] = None,
+                 local_detector: Optional[ScriptLanguageDetector] = None, single_flight: bool = None,
+                 batch_window: float = None, circuit_breakers: Optional[CircuitBreakers] = None,
+                 hedge_detect: bool = None):
+        self.api_key = api_key
+        self.circuit_breakers = circuit_breakers
+        
+        # A second detect-language attempt once the first has outlasted the usual latency
+        hedge_detect = hedge_detect if hedge_detect is not None else Config.DETECT_HEDGE
+        self.detect_hedge = Hedge(delay=Config.DETECT_HEDGE_DELAY_MS / 1000 or None) if hedge_detect else None
+        self.translation_cache = translation_cache
+        self.tts_cache = tts_cache
+        self.audio_bank = audio_bank
+        self.local_detector = local_detector
+        self.single_flight = AsyncSingleFlight() \
+            if (single_flight if single_flight is not None else Config.SINGLE_FLIGHT) else None
+        
+        # Distinct translations arriving within the window share packed requests
+        batch_window = batch_window if batch_window is not None else Config.TRANSLATE_BATCH_WINDOW_MS / 1000
+        self.translate_batcher = MicroBatcher(self._translate_window, window=batch_window) \
+            if batch_window > 0 else None
+        self.base_url = Config.SARVAM_BASE_URL.rstrip('/')
+        self.pool_size = pool_size if pool_size is not None else Config.SARVAM_POOL_SIZE
+        self.max_retries = max_retries if max_retries is not None else Config.SARVAM_MAX_RETRIES
+        self.backoff_factor = backoff_factor if backoff_factor is not None else Config.SARVAM_RETRY_BACKOFF
+        self._session = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Create the pooled keep-alive session on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"api-subscription-key": self.api_key}
+            )
+        return self._session
+    
+    def _timeout(self, endpoint: str, total: Optional[float] = None) -> aiohttp.ClientTimeout:
+        return aiohttp.ClientTimeout(
+            total=total,
+            sock_connect=Config.SARVAM_CONNECT_TIMEOUT,
+            sock_read=_read_timeout(endpoint)
+        )
     
-    def speech_to_text_translate(self, audio_file_path: str, target_language: str = "en") -> Optional[str]:
+    async def _post(self, endpoint: str, json: Dict[str, Any] = None, form_factory=None, read=None) -> Any:
         """
-        Convert speech to text and translate to target language
+        POST to a Sarvam AI endpoint and return the decoded JSON body, or
+        what read returns for the response, retrying 429/5xx and failed
+        connection attempts with exponential backoff. form_factory rebuilds
+        the multipart body for every attempt. Fails fast with CircuitOpenError
+        while the endpoint's circuit is open.
         """
+        breaker = _circuit_breaker(self.circuit_breakers, endpoint)
+        url = f"{self.base_url}/{endpoint}"
+        session = self._get_session()
+        started = time.perf_counter()
+        healthy = False
         try:
-            url = f"{self.base_url}/speech-to-text-translate"
-            
-            files = {
-                'file': open(audio_file_path, 'rb')
-            }
+            result = await self._post_with_retries(session, url, endpoint, json, form_factory, read)
+            healthy = True
+            if endpoint == 'detect-language' and self.detect_hedge is not None:
+                self.detect_hedge.observe(time.perf_counter() - started)
+            return result
+        except aiohttp.ClientResponseError as e:
+            healthy = e.status not in RETRY_STATUS_CODES
+            raise
+        except asyncio.CancelledError:
+            # A cancelled call, e.g. a hedge that lost, says nothing about upstream health
+            healthy = None
+            raise
+        finally:
+            if breaker is not None:
+                breaker.record(healthy, time.perf_counter() - started)
+    
+    async def _post_with_retries(self, session: aiohttp.ClientSession, url: str, endpoint: str,
+                                 json: Optional[Dict[str, Any]], form_factory, read) -> Any:
+        """
+        Retry only what is safe to send again: 429/5xx answers and connections
+        that could not be established. A read timeout or dropped connection may
+        mean upstream is still working on the request, so it is raised at once.
+        All attempts and backoff share one deadline, a single attempt's budget.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + Config.SARVAM_CONNECT_TIMEOUT + _read_timeout(endpoint)
+        with metrics.upstream_call(endpoint) as call:
+            for attempt in range(self.max_retries + 1):
+                remaining = deadline - loop.time()
+                data = form_factory() if form_factory else None
+                try:
+                    async with session.post(url, json=json, data=data,
+                                            timeout=self._timeout(endpoint, remaining)) as response:
+                        call.status = response.status
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            retry_after = response.headers.get('Retry-After')
+                            delay = float(retry_after) if retry_after and retry_after.isdigit() \
+                                else self.backoff_factor * (2 ** attempt)
+                            if loop.time() + delay < deadline:
+                                await asyncio.sleep(delay)
+                                continue
+                        response.raise_for_status()
+                        if read is not None:
+                            return await read(response)
+                        return await response.json(content_type=None)
+                except RETRYABLE_CONNECTION_ERRORS:
+                    call.status = None
+                    delay = self.backoff_factor * (2 ** attempt)
+                    if attempt >= self.max_retries or loop.time() + delay >= deadline:
+                        raise
+                    await asyncio.sleep(delay)
+                finally:
+                    if data is not None:
+                        _close_form_files(data)
+    
+    async def close(self):
+        """Release pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def _coalesce(self, key: tuple, fn, *args):
+        """Share one upstream call between concurrent identical requests"""
+        if self.single_flight is None:
+            return await fn(*args)
+        return await self.single_flight.do(key, lambda: fn(*args))
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        return {
+            'single_flight': self.single_flight.stats() if self.single_flight else None,
+            'translate_batching': self.translate_batcher.stats() if self.translate_batcher else None
+        }
+    
+    async def detect_language(self, text: str) -> Optional[str]:
+        """
+        Detect the language of input text using Sarvam AI language detection
+        """
+        # Unambiguous scripts are answered offline without a round trip
+        if self.local_detector is not None:
+            local_language = self.local_detector.detect(text)
+            if local_language:
+                return local_language
+        
+        return await self._coalesce(_detect_flight_key(text), self._detect_remote, text)
+    
+    async def _detect_remote(self, text: str) -> str:
+        try:
+            if self.detect_hedge is not None:
+                result = await self.detect_hedge.run(lambda: self._post('detect-language', json=_detect_payload(text)))
+            else:
+                result = await self._post('detect-language', json=_detect_payload(text))
+            return _parse_detected_language(result)
             
-            data = {
-                'model': 'saaras:v1',
-                'target_language_code': Config.SUPPORTED_LANGUAGES.get(target_language, 'en-IN')
-            }
+        except Exception as e:
+            print(f"Language detection error: {e}")
+            return 'en'  # Default to English
+    
+    async def translate_text(self, text: str, target_language: str, source_language: str = "auto") -> Optional[str]:
+        """
+        Translate text using Sarvam AI translation API
+        """
+        cache_key = _translation_cache_key(text, target_language, source_language)
+        if self.translation_cache is not None:
+            cached = self.translation_cache.get(cache_key)
+            if cached is not None:
+                return cached
+        
+        translated = await self._coalesce(('translate', cache_key), self._translate_remote,
+                                          text, target_language, source_language)
+        return translated if translated is not None else text
+    
+    async def _translate_remote(self, text: str, target_language: str, source_language: str) -> Optional[str]:
+        if self.translate_batcher is not None:
+            translated = await self.translate_batcher.submit((target_language, source_language), text)
+        else:
+            translated = await self._translate_one(text, target_language, source_language)
+        _cache_translations(self.translation_cache, [text], [translated], target_language, source_language)
+        return translated
+    
+    async def _translate_one(self, text: str, target_language: str, source_language: str) -> Optional[str]:
+        """One upstream translation; None if it failed"""
+        try:
+            payload = _translate_payload(text, target_language, source_language)
+            return (await self._post('translate', json=payload)).get('translated_text')
             
-            headers = {"api-subscription-key": self.api_key}
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return None
+    
+    async def _translate_window(self, languages: Tuple[str, str], texts: List[str]) -> List[Optional[str]]:
+        """Translate texts collected by the micro-batcher in as few packed requests as fit"""
+        target_language, source_language = languages
+        groups = _pack_translation_inputs(texts, Config.TRANSLATE_MAX_INPUT_CHARS)
+        results = await asyncio.gather(*(
+            self._translate_group(group, target_language, source_language) for group in groups
+        ))
+        translations = {}
+        for group, translated in zip(groups, results):
+            translations.update(zip(group, translated))
+        return [translations[text] for text in texts]
+    
+    async def translate_batch(self, texts: List[str], target_language: str, source_language: str = "auto",
+                              concurrency: int = None, keep_source: bool = True) -> List[Optional[str]]:
+        """
+        Translate many texts, returned in input order. Duplicates and cached
+        texts are not sent; the rest are packed several per request up to
+        the upstream input limit and sent with bounded concurrency. A text
+        that could not be translated comes back unchanged, or as None when
+        keep_source is False.
+        """
+        translations = _cached_translations(self.translation_cache, texts, target_language, source_language)
+        pending = [text for text in translations if translations[text] is None]
+        semaphore = asyncio.Semaphore(concurrency or Config.TRANSLATE_BATCH_CONCURRENCY)
+        
+        async def translate_group(group: List[str]):
+            async with semaphore:
+                translated = await self._translate_group(group, target_language, source_language)
+            _cache_translations(self.translation_cache, group, translated, target_language, source_language)
+            translations.update(
+                (text, result if result is not None or not keep_source else text)
+                for text, result in zip(group, translated)
+            )
+        
+        await asyncio.gather(*(
+            translate_group(group) for group in _pack_translation_inputs(pending, Config.TRANSLATE_MAX_INPUT_CHARS)
+        ))
+        return [translations[text] for text in texts]
+    
+    async def _translate_group(self, group: List[str], target_language: str,
+                               source_language: str) -> List[Optional[str]]:
+        """Translate texts in one packed request, or one by one if packing was not preserved"""
+        if len(group) > 1:
+            try:
+                payload = _translate_payload('\n'.join(group), target_language, source_language)
+                lines = _unpack_translations(await self._post('translate', json=payload), group)
+                if lines is not None:
+                    return lines
+            except Exception as e:
+                print(f"Batch translation error: {e}")
+        
+        return list(await asyncio.gather(*(
+            self._translate_one(text, target_language, source_language) for text in group
+        )))
+    
+    async def speech_to_text(self, audio: AudioSource, language_code: str = "hi-IN",
+                             filename: Optional[str] = None, content_type: Optional[str] = None) -> Optional[str]:
+        """
+        Convert speech to text using Sarvam AI ASR. Streams are piped into
+        the upload chunk by chunk without being buffered.
+        """
+        try:
+            form_factory = _audio_form_factory(audio, _stt_form(language_code), filename, content_type)
+            result = await self._post('speech-to-text', form_factory=form_factory)
+            return result.get('transcript', '')
             
-            response = requests.post(url, headers=headers, files=files, data=data)
-            response.raise_for_status()
+        except Exception as e:
+            print(f"Speech to text error: {e}")
+            return None
+    
+    async def speech_to_text_segments(self, segments: List[AudioSource], language_code: str = "hi-IN",
+                                      concurrency: int = None) -> Optional[str]:
+        """
+        Transcribe overlapping segments of one recording concurrently, up to
+        concurrency at a time, and stitch the transcripts back in order.
+        None if any segment could not be transcribed.
+        """
+        if len(segments) == 1:
+            return await self.speech_to_text(segments[0], language_code)
+        semaphore = asyncio.Semaphore(concurrency or Config.STT_SEGMENT_CONCURRENCY)
+        
+        async def transcribe(segment: AudioSource) -> Optional[str]:
+            async with semaphore:
+                return await self.speech_to_text(segment, language_code)
+        
+        transcripts = await asyncio.gather(*(transcribe(segment) for segment in segments))
+        if any(transcript is None for transcript in transcripts):
+            return None
+        return stitch_transcripts(transcripts)
+    
+    async def text_to_speech(self, text: str, language_code: str = "hi-IN") -> Optional[bytes]:
+        """
+        Convert text to speech using Sarvam AI TTS
+        """
+        cache_key = tts_cache_key(text, language_code)
+        if self.audio_bank is not None:
+            banked = self.audio_bank.get(cache_key)
+            if banked is not None:
+                return banked
+        if self.tts_cache is not None:
+            cached = await asyncio.get_running_loop().run_in_executor(None, self.tts_cache.get, cache_key)
+            if cached is not None:
+                return cached
+        
+        return await self._coalesce(('text-to-speech', cache_key), self._tts_remote, text, language_code, cache_key)
+    
+    async def _tts_remote(self, text: str, language_code: str, cache_key: str) -> Optional[bytes]:
+        try:
+            audio = await self._post('text-to-speech', json=_tts_payload(text, language_code), read=_read_tts_audio)
+            if audio and self.tts_cache is not None:
+                await asyncio.get_running_loop().run_in_executor(None, self.tts_cache.set, cache_key, audio)
+            return audio
             
-            result = response.json()
+        except Exception as e:
+            print(f"Text to speech error: {e}")
+            return None
+    
+    async def text_to_speech_chunks(self, text: str, language_code: str = "hi-IN",
+                                    concurrency: int = None) -> AsyncIterator[Tuple[str, Optional[bytes]]]:
+        """
+        Synthesize text sentence chunk by chunk, yielding (chunk, audio) in
+        order as soon as each is ready. Up to concurrency chunks are
+        synthesized ahead of the consumer.
+        """
+        concurrency = concurrency or Config.TTS_STREAM_CONCURRENCY
+        chunks = _speech_chunks(text)
+        window = deque()
+        try:
+            for chunk in chunks:
+                window.append((chunk, asyncio.ensure_future(self.text_to_speech(chunk, language_code))))
+                if len(window) >= concurrency:
+                    break
+            while window:
+                chunk, task = window.popleft()
+                audio = await task
+                next_chunk = next(chunks, None)
+                if next_chunk is not None:
+                    window.append((next_chunk, asyncio.ensure_future(self.text_to_speech(next_chunk, language_code))))
+                yield chunk, audio
+        finally:
+            for _, task in window:
+                task.cancel()
+    
+    async def speech_to_text_translate(self, audio: AudioSource, target_language: str = "en",
+                                       filename: Optional[str] = None,
+                                       content_type: Optional[str] = None) -> Optional[str]:
+        """
+        Convert speech to text and translate to target language. Streams are
+        piped into the upload chunk by chunk without being buffered.
+        """
+        try:
+            form_factory = _audio_form_factory(audio, _stt_translate_form(target_language),
+                                               filename, content_type)
+            result = await self._post('speech-to-text-translate', form_factory=form_factory)
             return result.get('translated_text', '')
             
         except Exception as e:
             print(f"Speech to text translate error: {e}")
             return None
-        finally:
-            if 'files' in locals():
-                files['file'].close() 
\ No newline at end of file
+
+def _audio_form_factory(audio: AudioSource, fields: Dict[str, str], filename: Optional[str],
+                        content_type: Optional[str]):
+    """
+    Return a callable building a fresh multipart body per attempt. Seekable
+    streams are rewound for retries; other streams can only be sent once.
+    """
+    start = None
+    if hasattr(audio, 'read') and audio.seekable():
+        start = audio.tell()
+    attempts = []
+    
+    def build() -> aiohttp.FormData:
+        form = aiohttp.FormData()
+        for name, value in fields.items():
+            form.add_field(name, value)
+        
+        if isinstance(audio, str):
+            form.add_field('file', open(audio, 'rb'), filename=filename or os.path.basename(audio),
+                           content_type=content_type)
+        elif isinstance(audio, (bytes, bytearray, memoryview)):
+            form.add_field('file', audio, filename=filename or 'audio.wav',
+                           content_type=content_type)
+        else:
+            if attempts:
+                if start is None:
+                    raise RuntimeError("Audio stream was already sent and cannot be replayed")
+                audio.seek(start)
+            form.add_field('file', _iter_stream(audio), filename=filename or 'audio.wav',
+                           content_type=content_type)
+        attempts.append(True)
+        return form
+    
+    return build
+
+async def _iter_stream(stream: BinaryIO, chunk_size: int = 64 * 1024):
+    """Read a blocking stream in the executor and yield its chunks"""
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, stream.read, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def _close_form_files(form: aiohttp.FormData):
+    for _, _, value in form._fields:
+        if hasattr(value, 'close'):
+            value.close()
@@ -0,0 +1,248 @@
+import json
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+try:
+    import redis
+except ImportError:  # sessions stay in process without the redis package
+    redis = None
+
+# Client-supplied session IDs are used as store keys, so only plain tokens are accepted
+SESSION_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+# Symptoms remembered per session, most recently mentioned first
+MAX_SYMPTOMS = 8
+
+class Session:
+    """What a conversation has established so far: language, preferences, symptoms and recent turns"""
+    
+    __slots__ = ('id', 'language', 'response_language', 'symptoms', 'turns', 'created', 'updated')
+    
+    def __init__(self, session_id: str, language: Optional[str] = None, response_language: Optional[str] = None,
+                 symptoms: Optional[List[str]] = None, turns: Optional[List[List[str]]] = None,
+                 created: Optional[float] = None, updated: Optional[float] = None):
+        self.id = session_id
+        self.language = language
+        self.response_language = response_language
+        self.symptoms = symptoms or []
+        self.turns = turns or []  # [query, response] pairs, oldest first
+        self.created = created or time.time()
+        self.updated = updated or self.created
+    
+    def encode(self, max_bytes: int) -> Optional[bytes]:
+        """
+        Compact JSON of the session, dropping the oldest turns and then the
+        least recent symptoms until it fits in max_bytes; None if even the
+        bare session does not fit
+        """
+        while True:
+            data = json.dumps({
+                'language': self.language,
+                'response_language': self.response_language,
+                'symptoms': self.symptoms,
+                'turns': self.turns,
+                'created': round(self.created, 3),
+                'updated': round(self.updated, 3)
+            }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            if len(data) <= max_bytes:
+                return data
+            if self.turns:
+                del self.turns[0]
+            elif self.symptoms:
+                del self.symptoms[-1]
+            else:
+                return None
+    
+    @classmethod
+    def decode(cls, session_id: str, data: bytes) -> 'Session':
+        fields = json.loads(data)
+        return cls(session_id, fields.get('language'), fields.get('response_language'),
+                   fields.get('symptoms'), fields.get('turns'), fields.get('created'),
+                   fields.get('updated'))
+
+class MemorySessionBackend:
+    """
+    In-process sessions: an LRU of encoded sessions bounded by count and by
+    bytes, each expiring ttl seconds after it was last saved
+    """
+    
+    name = 'memory'
+    
+    def __init__(self, max_sessions: int = 10000, max_bytes: int = 32 * 1024 * 1024):
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # session id -> (data, expires_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+    
+    def get(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                self._remove(session_id)
+                return None
+            self._entries.move_to_end(session_id)
+            return entry[0]
+    
+    def set(self, session_id: str, data: bytes, ttl: float):
+        with self._lock:
+            if session_id in self._entries:
+                self._remove(session_id)
+            self._entries[session_id] = (data, time.time() + ttl)
+            self._bytes += len(data)
+            while len(self._entries) > self.max_sessions or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def delete(self, session_id: str):
+        with self._lock:
+            if session_id in self._entries:
+                self._remove(session_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'sessions': len(self._entries), 'bytes': self._bytes, 'evictions': self.evictions}
+    
+    def _remove(self, session_id: str):
+        self._bytes -= len(self._entries.pop(session_id)[0])
+
+class RedisSessionBackend:
+    """
+    Sessions in Redis, or any server speaking its protocol, so every worker
+    process sees the same conversations; expiry is left to the server
+    """
+    
+    name = 'redis'
+    
+    def __init__(self, url: str, prefix: str = 'doctor:session:', timeout: float = 0.5):
+        if redis is None:
+            raise RuntimeError('redis package not installed')
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+    
+    def get(self, session_id: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + session_id)
+    
+    def set(self, session_id: str, data: bytes, ttl: float):
+        self.client.set(self.prefix + session_id, data, px=max(1, int(ttl * 1000)))
+    
+    def delete(self, session_id: str):
+        self.client.delete(self.prefix + session_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+class SessionStore:
+    """
+    Conversation sessions keyed by session ID on a pluggable backend. Each
+    session is capped at max_session_bytes encoded, trimming its oldest
+    turns to fit. Backend failures never fail a request: the turn goes on
+    with a fresh session.
+    """
+    
+    def __init__(self, backend, ttl: float = 1800, max_session_bytes: int = 8192, max_turns: int = 10,
+                 max_turn_chars: int = 300):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_session_bytes = max(256, max_session_bytes)
+        self.max_turns = max_turns
+        self.max_turn_chars = max_turn_chars
+        
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saves = 0
+        self.trimmed = 0
+        self.errors = 0
+        self.detections_skipped = 0
+    
+    @staticmethod
+    def new_id() -> str:
+        return secrets.token_urlsafe(16)
+    
+    def load(self, session_id: Optional[str]) -> Session:
+        """
+        The stored session, or a new one when the ID is unknown, expired or
+        missing. A new session always gets a server-chosen ID, so a client
+        cannot plant an ID of its own for someone else to use.
+        """
+        if not session_id or not SESSION_ID_PATTERN.fullmatch(session_id):
+            return Session(self.new_id())
+            
+        try:
+            data = self.backend.get(session_id)
+            session = Session.decode(session_id, data) if data is not None else None
+        except Exception as e:
+            print(f"Session store error: {e}")
+            self._count('errors')
+            session = None
+        self._count('hits' if session else 'misses')
+        return session or Session(self.new_id())
+    
+    def language_for(self, session: Session, detected_locally: Optional[str]) -> Optional[str]:
+        """
+        The session's language for a new turn, so detection can be skipped;
+        None before it is known or when offline detection is sure the patient
+        has switched to another language
+        """
+        if not session.language or (detected_locally and detected_locally != session.language):
+            return None
+        self._count('detections_skipped')
+        return session.language
+    
+    def record_turn(self, session: Session, query: str, response: str, language: str, symptoms: List[str]):
+        """Add a finished turn to the session and save it"""
+        session.language = language
+        for symptom in reversed(symptoms):
+            if symptom in session.symptoms:
+                session.symptoms.remove(symptom)
+            session.symptoms.insert(0, symptom)
+        del session.symptoms[MAX_SYMPTOMS:]
+        session.turns.append([query[:self.max_turn_chars], response[:self.max_turn_chars]])
+        del session.turns[:-self.max_turns]
+        session.updated = time.time()
+        self.save(session)
+    
+    def save(self, session: Session) -> bool:
+        turns = len(session.turns)
+        data = session.encode(self.max_session_bytes)
+        if len(session.turns) < turns:
+            self._count('trimmed')
+        if data is None:
+            return False
+        try:
+            self.backend.set(session.id, data, self.ttl)
+        except Exception as e:
+            print(f"Session store error: {e}")
+            self._count('errors')
+            return False
+        self._count('saves')
+        return True
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'backend': self.backend.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'saves': self.saves,
+                'trimmed': self.trimmed,
+                'errors': self.errors,
+                'detections_skipped': self.detections_skipped,
+                'max_session_bytes': self.max_session_bytes
+            }
+        stats.update(self.backend.stats())
+        return stats
+    
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
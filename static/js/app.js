@@ -21,6 +21,15 @@ class AIDoctor {
         this.lastSpeechTime = 0;
         this.conversationActive = false;
         
+        // Streaming voice socket; the server endpoints utterances when it is open
+        this.voiceSocket = null;
+        this.voiceProcessor = null;
+        this.voicePaused = false;
+        this.voiceSampleRate = 16000;
+        
+        // Conversation session; the server remembers language and symptoms across turns
+        this.sessionId = sessionStorage.getItem('sessionId');
+        
         this.initializeElements();
         this.setupEventListeners();
         this.checkPermissions();
@@ -97,29 +106,50 @@ class AIDoctor {
         this.showLoading('Processing your consultation...');
         
         try {
-            const response = await fetch('/api/consult', {
+            const response = await fetch('/api/consult/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({
                     query: query,
-                    language: this.responseLanguage.value === 'auto' ? null : this.responseLanguage.value
+                    language: this.responseLanguage.value === 'auto' ? null : this.responseLanguage.value,
+                    session_id: this.sessionId
                 })
             });
             
-            const data = await response.json();
+            if (!response.ok || !response.body) {
+                const data = await response.json();
+                throw new Error(data.error || 'Failed to get response');
+            }
             
-            if (data.success) {
-                this.addMessage(data.response, 'bot', data.detected_language);
-                this.updateDetectedLanguage(data.detected_language, data.language_name);
-                
-                // Check if emergency response
-                if (data.response.includes('🚨') || data.response.includes('EMERGENCY')) {
-                    this.handleEmergencyResponse();
+            // Render each stage as soon as the server finishes it
+            let botMessage = null;
+            let paragraphs = null;
+            await this.readEventStream(response, (event, data) => {
+                if (event === 'language') {
+                    this.updateDetectedLanguage(data.detected_language, data.language_name);
+                } else if (event === 'response') {
+                    this.hideLoading();
+                    botMessage = this.addMessage(data.response, 'bot', data.language);
+                    paragraphs = data.paragraphs;
+                    
+                    // Check if emergency response
+                    if (data.response.includes('🚨') || data.response.includes('EMERGENCY')) {
+                        this.handleEmergencyResponse();
+                    }
+                } else if (event === 'translation' && botMessage && paragraphs) {
+                    paragraphs[data.index] = data.text;
+                    this.setMessageContent(botMessage, paragraphs.join('\n\n'), 'bot', data.language);
+                } else if (event === 'done') {
+                    this.rememberSession(data.session_id);
+                } else if (event === 'error') {
+                    throw new Error(data.error);
                 }
-            } else {
-                throw new Error(data.error || 'Failed to get response');
+            });
+            
+            if (!botMessage) {
+                throw new Error('Failed to get response');
             }
         } catch (error) {
             console.error('Error:', error);
@@ -129,6 +159,38 @@ class AIDoctor {
         }
     }
     
+    rememberSession(sessionId) {
+        if (!sessionId) return;
+        this.sessionId = sessionId;
+        sessionStorage.setItem('sessionId', sessionId);
+    }
+    
+    async readEventStream(response, onEvent) {
+        // Parse server-sent events from a fetch response body
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const message = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                let data = '';
+                for (const line of message.split('\n')) {
+                    if (line.startsWith('event: ')) event = line.slice(7);
+                    else if (line.startsWith('data: ')) data += line.slice(6);
+                }
+                onEvent(event, data ? JSON.parse(data) : {});
+            }
+        }
+    }
+    
     // Audio Recording
     async startRecording() {
         try {
@@ -193,6 +255,15 @@ class AIDoctor {
         
         try {
             const formData = new FormData();
+            // Fields must precede the audio part; the server streams the upload
+            if (this.sessionId) {
+                formData.append('session_id', this.sessionId);
+            }
+            // Always sent, empty for auto, so the session forgets an earlier choice
+            formData.append('response_language',
+                this.responseLanguage.value === 'auto' ? '' : this.responseLanguage.value);
+            // Speech is streamed sentence by sentence from /api/tts/stream instead
+            formData.append('stream_audio', 'true');
             formData.append('audio', this.audioBlob, 'recording.webm');
             
             const response = await fetch('/api/audio-consult', {
@@ -203,6 +274,8 @@ class AIDoctor {
             const data = await response.json();
             
             if (data.success) {
+                this.rememberSession(data.session_id);
+                
                 // Add user message (transcript)
                 this.addMessage(`🎤 ${data.transcript}`, 'user');
                 
@@ -213,6 +286,18 @@ class AIDoctor {
                 // Add audio response if available
                 if (data.has_audio_response && data.audio_response_url) {
                     await this.addAudioResponse(data.audio_response_url);
+                } else {
+                    await this.streamSpeech(data.response, data.detected_language);
+                }
+                
+                // Add the response in the selected language, synthesized alongside the original
+                if (data.translated_response) {
+                    this.addMessage(data.translated_response, 'bot', data.response_language);
+                    if (data.translated_audio_url) {
+                        await this.addAudioResponse(data.translated_audio_url);
+                    } else {
+                        await this.streamSpeech(data.translated_response, data.response_language);
+                    }
                 }
                 
                 // Check for emergency
@@ -302,7 +387,16 @@ class AIDoctor {
         
         const messageContent = document.createElement('div');
         messageContent.className = 'message-content';
+        messageDiv.appendChild(messageContent);
+        this.setMessageContent(messageDiv, content, type, language);
         
+        this.chatMessages.appendChild(messageDiv);
+        this.scrollToBottom();
+        return messageDiv;
+    }
+    
+    setMessageContent(messageDiv, content, type, language = null) {
+        const messageContent = messageDiv.querySelector('.message-content');
         if (type === 'user') {
             messageContent.innerHTML = `<i class="fas fa-user"></i><strong>You:</strong><br>${content}`;
         } else {
@@ -311,10 +405,6 @@ class AIDoctor {
                 messageContent.innerHTML += `<span class="language-detected">${this.getLanguageName(language)}</span>`;
             }
         }
-        
-        messageDiv.appendChild(messageContent);
-        this.chatMessages.appendChild(messageDiv);
-        this.scrollToBottom();
     }
     
     async addAudioResponse(audioUrl) {
@@ -349,6 +439,69 @@ class AIDoctor {
         }
     }
     
+    async streamSpeech(text, language) {
+        // Play each sentence chunk as soon as it arrives rather than waiting for the whole reply
+        let response;
+        try {
+            response = await fetch('/api/tts/stream', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ text: text, language: language })
+            });
+        } catch (error) {
+            console.error('Speech stream error:', error);
+            return;
+        }
+        if (!response.ok || !response.body) return;
+        
+        const player = this.createSpeechPlayer();
+        await this.readEventStream(response, (event, data) => {
+            if (event === 'audio' && data.audio) {
+                const bytes = Uint8Array.from(atob(data.audio), (c) => c.charCodeAt(0));
+                player.enqueue(new Blob([bytes], { type: 'audio/wav' }));
+            }
+        });
+        
+        // In conversation mode, wait for playback to finish before continuing
+        if (this.conversationMode) {
+            await player.finished();
+        }
+    }
+    
+    createSpeechPlayer() {
+        // An audio player that plays WAV chunks back to back as they arrive
+        const audioDiv = document.createElement('div');
+        audioDiv.className = 'audio-player';
+        audioDiv.innerHTML = `
+            <div class="d-flex align-items-center">
+                <i class="fas fa-volume-up me-2"></i>
+                <span class="me-3">Audio Response:</span>
+                <audio controls></audio>
+            </div>
+        `;
+        this.chatMessages.appendChild(audioDiv);
+        this.scrollToBottom();
+        
+        const audio = audioDiv.querySelector('audio');
+        let playback = Promise.resolve();
+        return {
+            enqueue: (blob) => {
+                const url = URL.createObjectURL(blob);
+                playback = playback.then(() => new Promise((resolve) => {
+                    const done = () => {
+                        URL.revokeObjectURL(url);
+                        resolve();
+                    };
+                    audio.src = url;
+                    audio.onended = done;
+                    audio.onerror = done;
+                    audio.play().catch(done);
+                }));
+            },
+            finished: () => playback
+        };
+    }
+    
     updateRecordingUI(isRecording) {
         if (isRecording) {
             this.recordBtn.disabled = true;
@@ -500,6 +653,12 @@ class AIDoctor {
             const source = this.audioContext.createMediaStreamSource(this.currentStream);
             source.connect(this.analyser);
             
+            // Prefer streaming to the server, which endpoints each utterance and answers at once;
+            // without the socket, utterances are recorded here and uploaded one by one
+            if (await this.openVoiceStream()) {
+                this.streamMicrophone(source);
+            }
+            
             this.updateConversationStatus('Listening...');
             this.startAudioVisualization();
             
@@ -550,6 +709,119 @@ class AIDoctor {
         }
     }
     
+    openVoiceStream() {
+        return new Promise((resolve) => {
+            if (!('WebSocket' in window)) {
+                resolve(false);
+                return;
+            }
+            const scheme = window.location.protocol === 'https:' ? 'wss' : 'ws';
+            const params = new URLSearchParams({
+                response_language: this.responseLanguage.value === 'auto' ? '' : this.responseLanguage.value
+            });
+            if (this.sessionId) params.set('session_id', this.sessionId);
+            const query = `?${params}`;
+            const socket = new WebSocket(`${scheme}://${window.location.host}/api/voice/stream${query}`);
+            socket.binaryType = 'arraybuffer';
+            let ready = false;
+            let player = null;
+            
+            socket.onmessage = (message) => {
+                // Binary messages are WAV chunks of the spoken reply, in order
+                if (message.data instanceof ArrayBuffer) {
+                    this.updateConversationStatus('Speaking...');
+                    if (!player) player = this.createSpeechPlayer();
+                    player.enqueue(new Blob([message.data], { type: 'audio/wav' }));
+                    return;
+                }
+                
+                const event = JSON.parse(message.data);
+                switch (event.type) {
+                    case 'ready':
+                        ready = true;
+                        this.voiceSocket = socket;
+                        this.voiceSampleRate = event.sample_rate;
+                        this.rememberSession(event.session_id);
+                        resolve(true);
+                        break;
+                    case 'utterance':
+                        // Half duplex: stop sending audio until the reply has played
+                        this.voicePaused = true;
+                        this.updateConversationStatus('Processing...');
+                        break;
+                    case 'transcript':
+                        this.addMessage(`🎤 ${event.text}`, 'user');
+                        this.updateDetectedLanguage(event.detected_language, event.language_name);
+                        break;
+                    case 'response':
+                        this.addMessage(event.text, 'bot', event.language);
+                        if (event.emergency) {
+                            this.handleEmergencyResponse();
+                        }
+                        break;
+                    case 'turn_end': {
+                        const playback = player ? player.finished() : Promise.resolve();
+                        player = null;
+                        playback.then(() => {
+                            this.voicePaused = false;
+                            this.continueConversation();
+                        });
+                        break;
+                    }
+                    case 'error':
+                        console.error('Voice stream error:', event.error);
+                        if (!ready) {
+                            resolve(false);
+                        } else {
+                            this.voicePaused = false;
+                            this.continueConversation();
+                        }
+                        break;
+                }
+            };
+            
+            socket.onclose = () => {
+                // Conversation mode carries on by recording and uploading utterances
+                if (this.voiceSocket === socket) {
+                    this.voiceSocket = null;
+                    this.voicePaused = false;
+                }
+                if (!ready) resolve(false);
+            };
+        });
+    }
+    
+    streamMicrophone(source) {
+        // ScriptProcessor needs no separate worklet module; 4096 frames is under 100 ms at 48 kHz
+        const processor = this.audioContext.createScriptProcessor(4096, 1, 1);
+        const ratio = this.audioContext.sampleRate / this.voiceSampleRate;
+        
+        processor.onaudioprocess = (event) => {
+            const socket = this.voiceSocket;
+            if (!socket || socket.readyState !== WebSocket.OPEN || this.voicePaused) return;
+            
+            // Downsample by averaging the input each output sample covers, then convert to 16-bit PCM
+            const input = event.inputBuffer.getChannelData(0);
+            const pcm = new Int16Array(Math.floor(input.length / ratio));
+            for (let i = 0; i < pcm.length; i++) {
+                const start = Math.floor(i * ratio);
+                const end = Math.max(start + 1, Math.floor((i + 1) * ratio));
+                let sum = 0;
+                for (let j = start; j < end; j++) {
+                    sum += input[j];
+                }
+                const sample = Math.max(-1, Math.min(1, sum / (end - start)));
+                pcm[i] = sample < 0 ? sample * 0x8000 : sample * 0x7fff;
+            }
+            socket.send(pcm.buffer);
+        };
+        
+        source.connect(processor);
+        // Processors only run while connected to the output; this one outputs silence
+        processor.connect(this.audioContext.destination);
+        this.voiceProcessor = processor;
+    }
+    
     stopListening() {
         console.log('Stopping conversation mode listening...');
         this.isListening = false;
@@ -560,6 +832,17 @@ class AIDoctor {
             this.stopRecording();
         }
         
+        // Close the voice stream
+        if (this.voiceSocket) {
+            this.voiceSocket.close();
+            this.voiceSocket = null;
+        }
+        if (this.voiceProcessor) {
+            this.voiceProcessor.disconnect();
+            this.voiceProcessor = null;
+        }
+        this.voicePaused = false;
+        
         // Clear voice activity detector
         if (this.voiceActivityDetector) {
             clearInterval(this.voiceActivityDetector);
@@ -607,6 +890,9 @@ class AIDoctor {
         // Update voice level indicator
         this.updateVoiceLevelIndicator(average, max, voiceDetected);
         
+        // Streamed audio is endpointed by the server
+        if (this.voiceSocket) return;
+        
         console.log(`Voice Detection - Avg: ${average.toFixed(2)}, Max: ${max}, Detected: ${voiceDetected}, Recording: ${this.isRecording}`);
         
         if (voiceDetected) {
@@ -0,0 +1,86 @@
+import re
+from typing import List
+
+# Sentence terminators, including the Devanagari danda and double danda
+SENTENCE_BREAK = re.compile(r'(?<=[.!?।॥])\s+')
+PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+
+def split_paragraphs(text: str) -> List[str]:
+    """Split text on blank lines, dropping empty paragraphs"""
+    return [paragraph.strip() for paragraph in PARAGRAPH_BREAK.split(text) if paragraph.strip()]
+
+def split_sentences(paragraph: str) -> List[str]:
+    """Split a paragraph into sentences and lines (bullets and list items end at a newline)"""
+    sentences = []
+    for line in paragraph.splitlines():
+        sentences.extend(sentence for sentence in SENTENCE_BREAK.split(line.strip()) if sentence)
+    return sentences
+
+def _split_long(sentence: str, max_chars: int) -> List[str]:
+    """Break a sentence longer than max_chars at word boundaries"""
+    pieces, current = [], ''
+    for word in sentence.split():
+        while len(word) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ''
+            pieces.append(word[:max_chars])
+            word = word[max_chars:]
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_for_speech(text: str, max_chars: int = 300, first_chunk_chars: int = 120) -> List[str]:
+    """
+    Split text into chunks for synthesis. Sentences are packed into chunks of
+    up to max_chars without crossing paragraph boundaries, so every chunk
+    ends at a natural pause. The first chunk is kept short so playback can
+    start as early as possible.
+    """
+    chunks = []
+    for paragraph in split_paragraphs(text):
+        current = ''
+        for sentence in split_sentences(paragraph):
+            limit = min(first_chunk_chars, max_chars) if not chunks else max_chars
+            if len(sentence) > limit:
+                if current:
+                    chunks.append(current)
+                    current = ''
+                chunks.extend(_split_long(sentence, limit))
+            elif current and len(current) + 1 + len(sentence) > limit:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        if current:
+            chunks.append(current)
+    return chunks
+
+# Punctuation ignored when comparing words across a segment overlap
+WORD_PUNCTUATION = '.,!?;:"\'()[]-–—…।॥“”‘’'
+
+def _overlap_words(previous: List[str], following: List[str], max_words: int) -> int:
+    """Length of the longest run of words ending previous that also starts following"""
+    normalized_previous = [word.strip(WORD_PUNCTUATION).lower() for word in previous[-max_words:]]
+    normalized_following = [word.strip(WORD_PUNCTUATION).lower() for word in following[:max_words]]
+    for size in range(min(len(normalized_previous), len(normalized_following)), 0, -1):
+        if normalized_previous[-size:] == normalized_following[:size]:
+            return size
+    return 0
+
+def stitch_transcripts(parts: List[str], max_overlap_words: int = 8) -> str:
+    """
+    Join the transcripts of overlapping audio segments in order. Words
+    heard twice in the overlap end one part and start the next, so the
+    longest such run (up to max_overlap_words) is dropped from the later part.
+    """
+    words = []
+    for part in parts:
+        following = part.split()
+        words.extend(following[_overlap_words(words, following, max_overlap_words):])
+    return ' '.join(words)
@@ -0,0 +1,98 @@
+import io
+from typing import BinaryIO
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import MultipartDecoder, Field, File, Data, Epilogue, NeedData
+
+class UploadTooLarge(Exception):
+    """Raised while streaming once an upload exceeds its size limit"""
+
+class UploadStreamError(Exception):
+    """Raised when a multipart body does not contain the expected file part"""
+
+class MultipartFileStream(io.RawIOBase):
+    """
+    Readable stream over one file part of a multipart/form-data request
+    body, decoded incrementally from the raw request stream so the upload
+    can be piped upstream without being buffered to disk or memory. Form
+    fields that precede the file part are collected in fields; fields sent
+    after it are not available.
+    """
+    
+    def __init__(self, source: BinaryIO, content_type: str, field_name: str,
+                 max_bytes: int, chunk_size: int = 64 * 1024):
+        mimetype, options = parse_options_header(content_type)
+        if mimetype != 'multipart/form-data' or 'boundary' not in options:
+            raise UploadStreamError('Expected a multipart/form-data body')
+            
+        self.source = source
+        self.field_name = field_name
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.fields = {}
+        self.filename = None
+        self.content_type = None
+        self.bytes_read = 0
+        self.too_large = False
+        
+        # The decoder holds back file data after the last line break it saw, so its
+        # buffer can reach a chunk of leftover plus the next chunk read
+        self._decoder = MultipartDecoder(options['boundary'].encode('ascii'),
+                                         max_form_memory_size=2 * chunk_size + 64 * 1024)
+        self._pending = b''
+        self._finished = False
+        self._source_exhausted = False
+        self._open_file_part()
+    
+    def _next_event(self):
+        event = self._decoder.next_event()
+        while isinstance(event, NeedData):
+            if self._source_exhausted:
+                raise UploadStreamError('Upload ended before the multipart body was complete')
+            chunk = self.source.read(self.chunk_size)
+            self._source_exhausted = not chunk
+            self._decoder.receive_data(chunk or None)
+            event = self._decoder.next_event()
+        return event
+    
+    def _open_file_part(self):
+        """Consume events up to the start of the wanted file part"""
+        current_field = None
+        value = []
+        while True:
+            event = self._next_event()
+            if isinstance(event, File) and event.name == self.field_name:
+                self.filename = event.filename
+                self.content_type = event.headers.get('Content-Type', 'application/octet-stream')
+                return
+            if isinstance(event, Field):
+                current_field, value = event.name, []
+            elif isinstance(event, Data) and current_field is not None:
+                value.append(event.data)
+                if not event.more_data:
+                    self.fields[current_field] = b''.join(value).decode('utf-8', 'replace')
+                    current_field = None
+            elif isinstance(event, Epilogue):
+                raise UploadStreamError(f"No '{self.field_name}' file in upload")
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        while not self._pending and not self._finished:
+            event = self._next_event()
+            if not isinstance(event, Data):
+                self._finished = True
+                break
+            self._pending = event.data
+            if not event.more_data:
+                self._finished = True
+                
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        
+        self.bytes_read += size
+        if self.bytes_read > self.max_bytes:
+            self.too_large = True
+            raise UploadTooLarge(f"Upload exceeds {self.max_bytes} bytes")
+        return size
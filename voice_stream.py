@@ -0,0 +1,181 @@
+import io
+import math
+import os
+import subprocess
+import sys
+import threading
+import wave
+from array import array
+from collections import deque
+from typing import Callable, List, Optional
+
+def pcm_to_wav(pcm: bytes, sample_rate: int = 16000) -> bytes:
+    """Wrap mono 16-bit little-endian PCM in a WAV header"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+def frame_energy_db(frame: bytes) -> float:
+    """Energy of one frame of 16-bit little-endian PCM in dBFS"""
+    samples = array('h', frame)
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    if not samples:
+        return -100.0
+    power = sum(sample * sample for sample in samples) / (len(samples) * 1073741824.0)
+    return 10 * math.log10(power + 1e-10)
+
+class Endpointer:
+    """
+    Streaming voice-activity endpointer for mono 16-bit PCM. Audio is fed
+    in pieces of any size and cut into frame_ms frames; a frame is voiced
+    when its energy clears both threshold_db and 10 dB over a running noise
+    floor. An utterance ends once silence_ms of unvoiced
+    frames follow speech, and is returned with padding_ms of audio either
+    side. Bursts shorter than min_speech_ms are dropped as clicks, and
+    utterances longer than max_seconds are cut so each fits one STT call.
+    Per-frame energy is a few hundred multiplies, so no NumPy is needed.
+    """
+    
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30, threshold_db: float = -45.0,
+                 silence_ms: int = 600, padding_ms: int = 200, min_speech_ms: int = 200,
+                 max_seconds: float = 30.0):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_bytes = 2 * max(1, sample_rate * frame_ms // 1000)
+        self.threshold_db = threshold_db
+        self.silence_frames = max(1, -(-silence_ms // frame_ms))
+        self.padding_frames = -(-padding_ms // frame_ms)
+        self.min_speech_frames = max(1, -(-min_speech_ms // frame_ms))
+        self.max_frames = max(1, int(max_seconds * 1000 / frame_ms))
+        
+        self.noise_db = threshold_db - 10
+        self._pending = b''
+        self._preroll = deque(maxlen=max(1, self.padding_frames))
+        self._frames: List[bytes] = []
+        self._voiced = 0
+        self._silent_run = 0
+        self.in_speech = False
+    
+    def feed(self, pcm: bytes) -> List[bytes]:
+        """Add audio and return the PCM of every utterance it completed"""
+        data = self._pending + pcm if self._pending else pcm
+        whole = len(data) - len(data) % self.frame_bytes
+        self._pending = bytes(data[whole:])
+        utterances = []
+        for offset in range(0, whole, self.frame_bytes):
+            utterance = self._frame(bytes(data[offset:offset + self.frame_bytes]))
+            if utterance:
+                utterances.append(utterance)
+        return utterances
+    
+    def flush(self) -> Optional[bytes]:
+        """End the stream: the utterance in progress, if it had enough speech"""
+        self._pending = b''
+        utterance = self._finish(self._frames) if self.in_speech else None
+        self._reset()
+        return utterance
+    
+    def _frame(self, frame: bytes) -> Optional[bytes]:
+        energy_db = frame_energy_db(frame)
+        voiced = energy_db > max(self.threshold_db, self.noise_db + 10)
+        # The floor falls at once to quieter frames and rises slowly, very slowly
+        # during speech, so steady background noise stops counting as speech
+        rate = 0.005 if voiced else 0.05
+        self.noise_db = min(energy_db, (1 - rate) * self.noise_db + rate * energy_db)
+            
+        if not self.in_speech:
+            if not voiced:
+                if self.padding_frames:
+                    self._preroll.append(frame)
+                return None
+            self.in_speech = True
+            self._frames = list(self._preroll) + [frame]
+            self._preroll.clear()
+            self._voiced, self._silent_run = 1, 0
+            return None
+            
+        self._frames.append(frame)
+        if voiced:
+            self._voiced += 1
+            self._silent_run = 0
+        else:
+            self._silent_run += 1
+            
+        if self._silent_run >= self.silence_frames:
+            # Keep padding_frames of the trailing silence, drop the rest
+            frames = self._frames[:len(self._frames) - self._silent_run + self.padding_frames]
+            utterance = self._finish(frames)
+            self._reset()
+            return utterance
+        if len(self._frames) >= self.max_frames:
+            # Too long for one transcription; cut here and carry on in the same utterance
+            utterance = self._finish(self._frames)
+            self._frames, self._voiced = [], 0
+            return utterance
+        return None
+    
+    def _finish(self, frames: List[bytes]) -> Optional[bytes]:
+        return b''.join(frames) if self._voiced >= self.min_speech_frames else None
+    
+    def _reset(self):
+        self.in_speech = False
+        self._frames = []
+        self._voiced = self._silent_run = 0
+
+class FfmpegStreamDecoder:
+    """
+    Decodes a compressed stream that arrives in pieces, such as the WebM/Opus
+    chunks of a browser MediaRecorder, into mono 16-bit PCM at sample_rate
+    through one long-lived ffmpeg process. Decoded PCM is handed to on_pcm
+    from a reader thread as soon as ffmpeg produces it.
+    """
+    
+    def __init__(self, ffmpeg_path: str, on_pcm: Callable[[bytes], None], sample_rate: int = 16000):
+        command = [ffmpeg_path, '-nostdin', '-hide_banner', '-loglevel', 'error',
+                   '-fflags', 'nobuffer', '-probesize', '4096', '-analyzeduration', '0', '-i', 'pipe:0',
+                   '-ac', '1', '-ar', str(sample_rate), '-f', 's16le', '-flush_packets', '1', 'pipe:1']
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL)
+        self.on_pcm = on_pcm
+        self._reader = threading.Thread(target=self._read, name='ffmpeg-stream', daemon=True)
+        self._reader.start()
+    
+    def _read(self):
+        stdout = self.process.stdout.fileno()
+        while True:
+            try:
+                pcm = os.read(stdout, 64 * 1024)
+            except OSError:
+                return
+            if not pcm:
+                return
+            try:
+                self.on_pcm(pcm)
+            except Exception as e:
+                print(f"Error handling decoded audio: {e}")
+    
+    def write(self, data: bytes) -> bool:
+        """Feed encoded bytes; False once ffmpeg has exited"""
+        try:
+            self.process.stdin.write(data)
+            self.process.stdin.flush()
+            return True
+        except (BrokenPipeError, ValueError, OSError):
+            return False
+    
+    def close(self, timeout: float = 5):
+        """Finish decoding what was written, then stop ffmpeg"""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self._reader.join(timeout)
+        if self.process.poll() is None:
+            self.process.kill()
+        self.process.wait()
+        self.process.stdout.close()